@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""JSON 後端比較：以同一份合成存檔量測各個可用後端（json_backend）的解碼與編碼速度。
+
+    python benchmarks/json_backends.py                     # 10,000 與 100,000 NPC
+    python benchmarks/json_backends.py --sizes 1000000 --out json.json
+
+每個後端量測：
+  parse_document   整份存檔一次解析（json_backend.loads）
+  decode_npcs      延遲載入後逐一完整解碼每個 NPC（LazyNpc.load）
+  encode_document  整份文件重新編碼（iter_document_chunks，即非增量存檔）
+  encode_npcs      逐一編碼每個 NPC（增量存檔中被修改的 NPC 走這條路）
+並確認各後端的編碼結果讀回後與標準函式庫相同。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, HERE)
+
+import json_backend  # noqa: E402
+from run_benchmarks import REPEAT, save_path, timed  # noqa: E402
+
+DEFAULT_SIZES = (10000, 100000)
+
+
+def available_backends() -> List[str]:
+    return [name for name in json_backend.PREFERRED + ("json",) if json_backend.load_backend(name) is not None]
+
+
+def run_backend(path: str, name: str) -> Dict[str, float]:
+    from save_model import SaveModel
+    from save_spans import encode_value, iter_document_chunks
+
+    json_backend.use_backend(name)
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    phases: Dict[str, float] = {}
+    phases["parse_document"], data = timed(lambda: json_backend.loads(raw), REPEAT)
+
+    model = SaveModel(lazy=True)
+    model.load(path)
+    # LazyNpc 只會解碼一次，這一項只量一輪
+    phases["decode_npcs"], _ = timed(lambda: [npc.load() for npc in model.npcs])
+    phases["encode_document"], encoded = timed(lambda: b"".join(iter_document_chunks(data)), REPEAT)
+    phases["encode_npcs"], _ = timed(lambda: [encode_value(npc) for npc in data["npcs"]], REPEAT)
+    model.close()
+    if json.loads(encoded) != json.loads(raw):
+        raise AssertionError(f"{name}: encoded document differs from the source")
+    return phases
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="NPC counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    backends = available_backends()
+    print(f"backends: {', '.join(backends)} (default: {json_backend.describe()})")
+    results = {"backends": {name: json_backend.load_backend(name).describe() for name in backends}, "runs": []}
+    for count in args.sizes:
+        path = save_path(count, args.seed)
+        print(f"\n{count:,} NPCs ({os.path.getsize(path) / (1 << 20):.1f} MB)")
+        timings = {name: run_backend(path, name) for name in backends}
+        results["runs"].append({"npcs": count, "bytes": os.path.getsize(path), "seconds": timings})
+        baseline = timings["json"]
+        for phase in baseline:
+            cells = []
+            for name in backends:
+                seconds = timings[name][phase]
+                cells.append(f"{name} {seconds * 1000:9.1f} ms (x{baseline[phase] / seconds:4.1f})")
+            print(f"  {phase:<16} " + "  ".join(cells))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nresults: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存檔修改器效能測試：對不同大小的合成存檔量測載入、清單查詢、批次套用與儲存。
+
+每個大小在獨立的子行程中執行，使峰值記憶體（ru_maxrss）彼此不受影響；
+結果以 JSON 保存，可用 --compare 與先前的結果比較。
+
+    python benchmarks/run_benchmarks.py                       # 100 ~ 100,000 NPC
+    python benchmarks/run_benchmarks.py --sizes 1000000 --out results.json
+    python benchmarks/run_benchmarks.py --compare old.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, HERE)
+
+import json_backend  # noqa: E402
+from synthetic_save import write_save  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "blackthorn-bench")
+# 快速的步驟重複量測取中位數
+REPEAT = 5
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為位元組
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def timed(func: Callable[[], object], repeat: int = 1):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def save_path(count: int, seed: int) -> str:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"sav-{count}-{seed}.dat")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        write_save(tmp, count, seed)
+        os.replace(tmp, path)
+    return path
+
+
+def run_size(path: str, lazy: bool) -> Dict[str, object]:
+    """在目前行程中量測一個存檔（由子行程呼叫）。"""
+    from save_model import SaveModel
+
+    size = os.path.getsize(path)
+    megabytes = size / (1 << 20)
+    phases: Dict[str, Dict[str, object]] = {}
+
+    def record(name: str, seconds: float, amount: float, unit: str) -> None:
+        phases[name] = {
+            "seconds": round(seconds, 6),
+            "throughput": round(amount / seconds, 1) if seconds > 0 else None,
+            "unit": unit,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    model = SaveModel(lazy=lazy)
+    seconds, _ = timed(lambda: model.load(path))
+    npcs = len(model.npcs)
+    record("load", seconds, megabytes, "MB/s")
+
+    seconds, count = timed(lambda: sum(1 for _ in model.iter_roster()), REPEAT)
+    record("iter_roster", seconds, npcs, "NPC/s")
+
+    # 與 refresh_table 相同的查詢：預設只顯示玩家隊伍、預設排序
+    queries = {
+        "refresh_default": dict(only_team=0),
+        "refresh_all_sorted_level": dict(sort_keys=[("level", True)]),
+        "refresh_multi_sort": dict(sort_keys=[("team", False), ("level", True), ("unitname", False)]),
+        "refresh_search": dict(search="dorn"),
+        "refresh_filtered": dict(min_level=10, only_underscore=True),
+    }
+    for name, kwargs in queries.items():
+        model.query_roster(**kwargs)  # 第一次會建立排序快取，另外記錄
+        seconds, _ = timed(lambda: model.query_roster(**kwargs), REPEAT)
+        record(name, seconds, npcs, "NPC/s")
+
+    selected = list(model.query_roster())
+    fields = [("level", "1"), ("skillPoint", "2"), ("BSstrength", "1")]
+    seconds, _ = timed(lambda: model.apply_bulk(selected, fields, mode="add"))
+    record("bulk_apply", seconds, len(selected), "NPC/s")
+
+    out_dir = tempfile.mkdtemp(prefix="blackthorn-bench-")
+    try:
+        target = os.path.join(out_dir, "sav.dat")
+        shutil.copyfile(path, target)
+        model.path = target
+        seconds, _ = timed(lambda: model.save(make_backup=False))
+        record("save", seconds, model.last_write.bytes_written / (1 << 20), "MB/s")
+    finally:
+        model.close()
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    return {
+        "npcs": npcs,
+        "live": count,
+        "bytes": size,
+        "lazy": lazy,
+        "phases": phases,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_in_subprocess(path: str, lazy: bool) -> Dict[str, object]:
+    command = [sys.executable, os.path.abspath(__file__), "--worker", path]
+    if not lazy:
+        command.append("--eager")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def environment() -> Dict[str, object]:
+    try:
+        import numpy  # noqa: F401
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": has_numpy,
+        "json": json_backend.describe(),
+    }
+
+
+def print_run(run: Dict[str, object], baseline: Optional[Dict[str, object]] = None) -> None:
+    print(f"\n{run['npcs']:,} NPCs ({run['bytes'] / (1 << 20):.1f} MB, lazy={run['lazy']}), peak RSS {run['peak_rss_mb']} MB")
+    for name, phase in run["phases"].items():
+        line = f"  {name:<26} {phase['seconds'] * 1000:10.2f} ms  {phase['throughput'] or 0:>14,.1f} {phase['unit']}"
+        if baseline is not None:
+            old = baseline["phases"].get(name)
+            if old and old["seconds"]:
+                line += f"  x{old['seconds'] / phase['seconds']:.2f} vs baseline" if phase["seconds"] else ""
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="NPC counts (100 to 1000000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--eager", action="store_true", help="load without LazyNpc (SaveModel(lazy=False))")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a previous results JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_size(args.worker, lazy=not args.eager)))
+        return 0
+
+    baseline_runs = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline_runs = {(run["npcs"], run["lazy"]): run for run in json.load(fh)["runs"]}
+
+    results = {"environment": environment(), "runs": []}
+    for count in args.sizes:
+        path = save_path(count, args.seed)
+        run = run_in_subprocess(path, lazy=not args.eager)
+        results["runs"].append(run)
+        print_run(run, baseline_runs.get((run["npcs"], run["lazy"])))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nresults: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
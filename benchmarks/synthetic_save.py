@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""產生 Blackthorn 形狀的合成存檔（供效能測試使用）。
+
+每個 NPC 含清單欄位（id、unitId、team、unitname、level、各種點數、BS* 能力值）、
+巢狀子樹（裝備、技能、特性、傷勢）以及 SaveModel.is_dead 會檢查的各種死亡標記。
+NPC 逐一序列化寫出，產生一百萬個 NPC 也不需要把整份文件放進記憶體。
+
+    python benchmarks/synthetic_save.py 100000 /tmp/sav.dat
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from typing import Dict, Iterator
+
+NAME_PARTS = ("Aldric", "Lyra", "Brann", "Cassia", "Dorn", "Ewin", "Fara", "Gorm", "Hild", "Ivo")
+CJK_PARTS = ("鐵拳", "赤狼", "黑棘", "疾風", "石盾", "夜鴉")
+ITEMS = ("gladius", "spatha", "scutum", "pilum", "galea", "manica", "trident", "net")
+SKILLS = ("shieldBash", "cleave", "riposte", "taunt", "sprint", "secondWind", "disarm")
+TRAITS = ("brave", "greedy", "loyal", "brutal", "cautious", "showman")
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _name(rng: random.Random, idx: int) -> str:
+    roll = rng.random()
+    if roll < 0.15:
+        return f"{rng.choice(CJK_PARTS)}_{idx}"
+    if roll < 0.35:
+        return f"{rng.choice(NAME_PARTS)}_{rng.choice(NAME_PARTS)}"
+    return f"{rng.choice(NAME_PARTS)} {idx}"
+
+
+def _mark_dead(rng: random.Random, npc: Dict[str, object]) -> None:
+    # 涵蓋 SaveModel.is_dead 的每一種判斷
+    kind = rng.randrange(6)
+    if kind == 0:
+        npc["isDead"] = True
+    elif kind == 1:
+        npc["dead"] = 1
+    elif kind == 2:
+        npc["deathDate"] = rng.randint(1, 4000)
+    elif kind == 3:
+        npc["state"] = "Dead"
+    elif kind == 4:
+        npc["gladiatorState"] = rng.randint(5, 7)
+    else:
+        npc["hp"] = 0
+
+
+def make_npc(rng: random.Random, idx: int, dead_ratio: float = 0.15) -> Dict[str, object]:
+    npc: Dict[str, object] = {
+        "id": idx,
+        "unitId": 10000 + idx,
+        "team": 0 if rng.random() < 0.1 else rng.randint(1, 12),
+        "unitname": _name(rng, idx),
+        "level": rng.randint(1, 30),
+        "potentialPoint": rng.randint(0, 20),
+        "skillPoint": rng.randint(0, 10),
+        "livingSkillPoint": rng.randint(0, 8),
+        "BSstrength": rng.randint(5, 25),
+        "BSendurance": rng.randint(5, 25),
+        "BSagility": rng.randint(5, 25),
+        "BSprecision": rng.randint(5, 25),
+        "BSintelligence": rng.randint(5, 25),
+        "BSwillpower": rng.randint(5, 25),
+        "hp": rng.randint(20, 120),
+        "gladiatorState": rng.randint(0, 4),
+        "state": "Idle",
+        "equipment": [
+            {"item": rng.choice(ITEMS), "durability": round(rng.uniform(0, 1), 3), "quality": rng.randint(0, 5)}
+            for _ in range(rng.randint(1, 5))
+        ],
+        "skills": {skill: {"rank": rng.randint(1, 5), "xp": rng.randint(0, 999)} for skill in rng.sample(SKILLS, 3)},
+        "traits": rng.sample(TRAITS, 2),
+        "injuries": [{"part": rng.randint(0, 9), "days": rng.randint(1, 30)} for _ in range(rng.randint(0, 2))],
+        "history": {"wins": rng.randint(0, 99), "losses": rng.randint(0, 99), "kills": rng.randint(0, 40)},
+    }
+    if rng.random() < dead_ratio:
+        _mark_dead(rng, npc)
+    return npc
+
+
+def iter_save_chunks(count: int, seed: int = 0, dead_ratio: float = 0.15) -> Iterator[str]:
+    rng = random.Random(seed)
+    yield '{"version":"1.0.7","wealth":%d,"reputation":%d,"day":%d,"npcs":[' % (
+        rng.randint(100, 100000),
+        rng.randint(0, 5000),
+        rng.randint(1, 4000),
+    )
+    for idx in range(count):
+        if idx:
+            yield ","
+        yield _dumps(make_npc(rng, idx, dead_ratio))
+    yield '],"flags":{"tutorial":true,"arenaRank":3},"market":{"prices":[1.5,2.25,3.0]}}'
+
+
+def write_save(path: str, count: int, seed: int = 0, dead_ratio: float = 0.15) -> int:
+    """寫出含 `count` 個 NPC 的存檔，回傳檔案大小（位元組）。"""
+    size = 0
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        buffer = []
+        for chunk in iter_save_chunks(count, seed, dead_ratio):
+            buffer.append(chunk)
+            if len(buffer) >= 4096:
+                text = "".join(buffer)
+                size += len(text.encode("utf-8"))
+                fh.write(text)
+                buffer.clear()
+        text = "".join(buffer)
+        size += len(text.encode("utf-8"))
+        fh.write(text)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Blackthorn save.")
+    parser.add_argument("npcs", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dead-ratio", type=float, default=0.15)
+    args = parser.parse_args()
+    size = write_save(args.output, args.npcs, args.seed, args.dead_ratio)
+    print(f"{args.output}: {args.npcs} NPCs, {size / (1 << 20):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""批次編輯引擎：每個欄位的輸入只解析、驗證一次，再整批套用到選取的 NPC。
+
+欄位輸入的寫法（`mode` 只決定不帶符號的純數字是加減還是設定）：
+
+    5、+5、-3    依模式加減或設定
+    =10          設為 10
+    *1.5、x1.5   乘以倍數
+    +10%、-10%   依百分比增減
+    max、min     設為選取角色中該欄的最大值／最小值
+    @123         複製索引 123 的 NPC 的值
+
+結果四捨五入為整數並限制在 [lower, upper]（預設下限 0，與原本的行為相同）。
+欄位在 RosterIndex 中有整數欄時直接以整欄計算（安裝 NumPy 時向量化），只有值真的改變的 NPC 才會寫回。
+"""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from perf_trace import span
+from roster_index import MISSING, as_column_int, np
+
+OPERATIONS = ("add", "set", "mul", "pct", "max", "min", "copy")
+_INT64_MAX = 2 ** 63 - 1
+
+_NUMBER = r"[-+]?\d+(?:\.\d+)?"
+_PATTERNS = (
+    (re.compile(rf"=\s*({_NUMBER})"), "set"),
+    (re.compile(rf"[*xX]\s*({_NUMBER})"), "mul"),
+    (re.compile(rf"({_NUMBER})\s*%"), "pct"),
+    (re.compile(r"@\s*(\d+)"), "copy"),
+)
+
+
+class BulkEditError(ValueError):
+    """欄位輸入無效；`key` 為出錯的欄位。"""
+
+    def __init__(self, key: str, message: str) -> None:
+        super().__init__(f"{key}: {message}")
+        self.key = key
+
+
+@dataclass(frozen=True)
+class FieldOp:
+    key: str
+    op: str
+    value: float = 0
+
+    def describe(self) -> str:
+        if self.op in ("max", "min"):
+            return f"{self.key} = {self.op}"
+        symbol = {"add": "+=", "set": "=", "mul": "*=", "pct": "+=%", "copy": "= @"}[self.op]
+        return f"{self.key} {symbol} {_format_number(self.value)}"
+
+
+@dataclass(frozen=True)
+class BulkEdit:
+    ops: Tuple[FieldOp, ...] = ()
+    lower: Optional[int] = 0
+    upper: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.ops)
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(op.key for op in self.ops))
+
+
+@dataclass
+class BulkResult:
+    """`touched` 為實際改變的 NPC 索引（遞增），`fields` 為實際改變的欄位，`cells` 為改變的欄位格數。"""
+
+    matched: int = 0
+    touched: List[int] = field(default_factory=list)
+    fields: Tuple[str, ...] = ()
+    cells: int = 0
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _to_number(text: str) -> float:
+    # 整數直接以 int 解析，超過 2**53 也不會因經過 float 而失去精度
+    return float(text) if "." in text else int(text)
+
+
+def parse_field_op(key: str, text: str, mode: str = "add") -> FieldOp:
+    """解析單一欄位的輸入；無法解析時拋出 BulkEditError。"""
+    text = str(text).strip()
+    if not text:
+        raise BulkEditError(key, "empty value")
+    lowered = text.lower()
+    if lowered in ("max", "min"):
+        return FieldOp(key, lowered)
+    for pattern, op in _PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            return FieldOp(key, op, _to_number(match.group(1)))
+    if re.fullmatch(_NUMBER, text):
+        return FieldOp(key, "set" if mode == "set" else "add", _to_number(text))
+    raise BulkEditError(key, f"cannot parse {text!r}")
+
+
+def parse_bulk_edit(
+    fields: Iterable[Tuple[str, str]], mode: str = "add", lower: Optional[int] = 0, upper: Optional[int] = None
+) -> BulkEdit:
+    """解析 [(欄位, 輸入字串), ...]；空字串略過，任何無效輸入都會拋出 BulkEditError。"""
+    ops = tuple(parse_field_op(key, text, mode) for key, text in fields if str(text).strip())
+    if lower is not None and upper is not None and lower > upper:
+        raise BulkEditError("range", f"lower bound {lower} is above upper bound {upper}")
+    return BulkEdit(ops, lower, upper)
+
+
+def parse_bound(text: str, name: str) -> Optional[int]:
+    """解析範圍限制輸入；空字串代表不限制。"""
+    text = str(text).strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        raise BulkEditError(name, f"cannot parse {text!r}") from None
+
+
+def _current_values(model, key: str, indices: Sequence[int]):
+    """選取 NPC 目前的整數值（缺少或無法轉換時為 0）與「欄位是否缺少」；有整數欄時直接讀欄。"""
+    roster = model.roster
+    column = roster.ints.get(key) if roster is not None else None
+    if np is not None:
+        positions = np.asarray(indices, dtype=np.int64)
+        if column is not None:
+            values = np.frombuffer(column, dtype=np.int64)[positions]
+        else:
+            npcs = model.npcs
+            values = np.fromiter((as_column_int(npcs[idx].get(key)) for idx in indices), np.int64, len(indices))
+        missing = values == MISSING
+        return np.where(missing, 0, values), missing
+    if column is not None:
+        raw = [column[idx] for idx in indices]
+    else:
+        npcs = model.npcs
+        raw = [as_column_int(npcs[idx].get(key)) for idx in indices]
+    missing = [value == MISSING for value in raw]
+    return [0 if value == MISSING else value for value in raw], missing
+
+
+def _source_value(model, key: str, source: int) -> int:
+    if not 0 <= source < len(model.npcs):
+        raise BulkEditError(key, f"no NPC with index {source}")
+    value = as_column_int(model.npcs[source].get(key))
+    return 0 if value == MISSING else value
+
+
+def _fits_int64(op: FieldOp, current) -> bool:
+    """整數的加減、設定、乘法結果是否都在 int64 範圍內（NumPy 溢位時不會報錯而是繞回）。"""
+    if op.op == "set":
+        results = (op.value,)
+    else:
+        low, high = int(current.min()), int(current.max())
+        results = (low + op.value, high + op.value) if op.op == "add" else (low * op.value, high * op.value)
+    return all(MISSING < value <= _INT64_MAX for value in results)
+
+
+def _compute(model, op: FieldOp, current, lower, upper):
+    """依運算計算新值（已四捨五入並限制範圍）。
+
+    整數運算元保持整數運算，只有運算元是小數（或百分比）時才經過浮點數，有無 NumPy 結果相同。
+    """
+    if np is not None:
+        if op.op in ("add", "set", "mul") and isinstance(op.value, int) and not _fits_int64(op, current):
+            # 結果超出 int64：改以 Python 整數計算
+            return np.array(_compute_exact(model, op, current.tolist(), lower, upper), dtype=object)
+        if op.op == "add":
+            values = current + op.value
+        elif op.op == "set":
+            values = np.full(len(current), op.value, dtype=np.int64 if isinstance(op.value, int) else np.float64)
+        elif op.op == "mul":
+            values = current * op.value
+        elif op.op == "pct":
+            values = current * (1 + op.value / 100)
+        elif op.op in ("max", "min"):
+            target = current.max() if op.op == "max" else current.min()
+            values = np.full(len(current), target, dtype=np.int64)
+        else:
+            values = np.full(len(current), _source_value(model, op.key, int(op.value)), dtype=np.int64)
+        if values.dtype != np.int64:
+            values = np.floor(values + 0.5)
+            if not np.all((values > MISSING) & (values <= _INT64_MAX)):
+                return np.array(_compute_exact(model, op, current.tolist(), lower, upper), dtype=object)
+            values = values.astype(np.int64)
+        if lower is not None or upper is not None:
+            values = np.clip(values, lower, upper)
+        return values
+    return _compute_exact(model, op, current, lower, upper)
+
+
+def _compute_exact(model, op: FieldOp, current: List[int], lower, upper) -> List[int]:
+    if op.op == "add":
+        values = [value + op.value for value in current]
+    elif op.op == "set":
+        values = [op.value] * len(current)
+    elif op.op == "mul":
+        values = [value * op.value for value in current]
+    elif op.op == "pct":
+        factor = 1 + op.value / 100
+        values = [value * factor for value in current]
+    elif op.op in ("max", "min"):
+        values = [(max if op.op == "max" else min)(current)] * len(current)
+    else:
+        values = [_source_value(model, op.key, int(op.value))] * len(current)
+    result = []
+    for value in values:
+        value = value if isinstance(value, int) else math.floor(value + 0.5)
+        if lower is not None and value < lower:
+            value = lower
+        if upper is not None and value > upper:
+            value = upper
+        result.append(value)
+    return result
+
+
+def apply_bulk_edit(model, indices: Sequence[int], edit: BulkEdit) -> BulkResult:
+    """把 `edit` 套用到 `indices`（超出範圍的索引略過），整批在復原歷程中是一個步驟。
+
+    每個運算先以整欄算出新值，只把值改變或原本缺少該欄位的 NPC 交給 SaveModel.set_npc_column。
+    同一欄位出現多次時依序套用，後面的運算讀到的是前面運算後的值。
+    """
+    size = len(model.npcs)
+    indices = [idx for idx in indices if 0 <= idx < size]
+    result = BulkResult(matched=len(indices))
+    if not indices or not edit.ops:
+        return result
+    touched = set()
+    fields = []
+    with span("bulk_apply", npcs=len(indices), ops=len(edit.ops)), model.history.group("bulk"):
+        for op in edit.ops:
+            current, missing = _current_values(model, op.key, indices)
+            values = _compute(model, op, current, edit.lower, edit.upper)
+            if np is not None:
+                positions = np.flatnonzero((values != current) | missing)
+                targets = np.asarray(indices, dtype=np.int64)[positions].tolist()
+                new_values = values[positions].tolist()
+            else:
+                keep = [i for i, value in enumerate(values) if value != current[i] or missing[i]]
+                targets = [indices[i] for i in keep]
+                new_values = [values[i] for i in keep]
+            changed = model.set_npc_column(op.key, targets, new_values)
+            if changed:
+                touched.update(changed)
+                result.cells += len(changed)
+                if op.key not in fields:
+                    fields.append(op.key)
+    result.touched = sorted(touched)
+    result.fields = tuple(fields)
+    return result
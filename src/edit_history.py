@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""復原／重做：每個步驟只記錄欄位層級的差異（NPC 索引、欄位、舊值、新值），不複製整份存檔。
+
+一次批次套用在 `group()` 內完成，整批視為一個步驟；差異總數超過上限時丟棄最舊的步驟。
+本模組只保存差異，實際寫回資料由 SaveModel 負責（見 SaveModel.undo / redo）。
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+# 頂層欄位（wealth、reputation 等）使用的 NPC 索引
+GLOBAL = -1
+
+
+class _Absent:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "ABSENT"
+
+
+# 欄位原本不存在；復原時刪除該欄位而不是寫入某個值
+ABSENT = _Absent()
+
+MAX_STEPS = 100
+MAX_DELTAS = 1_000_000
+
+Delta = Tuple[int, str, object, object]
+
+
+class EditStep:
+    """一個可復原的步驟；各差異以平行的欄位保存，索引放在 array 中。"""
+
+    __slots__ = ("label", "indices", "keys", "old", "new", "revision_before", "revision_after")
+
+    def __init__(self, label: str, revision_before: int = 0) -> None:
+        self.label = label
+        self.indices = array("q")
+        self.keys: List[str] = []
+        self.old: list = []
+        self.new: list = []
+        self.revision_before = revision_before
+        self.revision_after = revision_before
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def add(self, idx: int, key: str, old, new) -> None:
+        self.indices.append(idx)
+        self.keys.append(key)
+        self.old.append(old)
+        self.new.append(new)
+
+    def extend(self, key: str, indices: Sequence[int], old: Sequence, new: Sequence) -> None:
+        """同一欄位的多筆差異；欄位名稱只保存為同一個字串物件的多個參照。"""
+        self.indices.extend(indices)
+        self.keys.extend([key] * len(indices))
+        self.old.extend(old)
+        self.new.extend(new)
+
+    def undo_deltas(self) -> Iterator[Delta]:
+        """由後往前回傳 (索引, 欄位, 要寫回的值, 目前的值)。"""
+        for position in range(len(self.indices) - 1, -1, -1):
+            yield self.indices[position], self.keys[position], self.old[position], self.new[position]
+
+    def redo_deltas(self) -> Iterator[Delta]:
+        return zip(self.indices, self.keys, self.new, self.old)
+
+    def touched(self) -> set:
+        """被修改的 NPC 索引（不含頂層欄位）。"""
+        return {idx for idx in self.indices if idx != GLOBAL}
+
+    def __repr__(self) -> str:
+        return f"<EditStep {self.label!r} {len(self)} deltas>"
+
+
+class EditHistory:
+    def __init__(self, max_steps: int = MAX_STEPS, max_deltas: int = MAX_DELTAS) -> None:
+        self.max_steps = max_steps
+        self.max_deltas = max_deltas
+        self.undo_stack: Deque[EditStep] = deque()
+        self.redo_stack: List[EditStep] = []
+        self.delta_count = 0
+        self._open: Optional[EditStep] = None
+        self._depth = 0
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.delta_count = 0
+        self._open = None
+        self._depth = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    @contextmanager
+    def group(self, label: str):
+        """`with history.group("bulk"):` 內的所有修改合併為一個步驟；巢狀使用時併入最外層。"""
+        if self._depth == 0:
+            self._open = EditStep(label)
+        self._depth += 1
+        try:
+            yield self._open
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                step, self._open = self._open, None
+                if step:
+                    self._push(step)
+
+    def record(self, idx: int, key: str, old, new, revision_before: int, revision_after: int) -> None:
+        """記錄一筆修改；不在 group() 內時自成一個步驟。"""
+        step = self._open
+        if step is None:
+            step = EditStep(key, revision_before)
+            step.add(idx, key, old, new)
+            step.revision_after = revision_after
+            self._push(step)
+            return
+        if not step:
+            step.revision_before = revision_before
+        step.add(idx, key, old, new)
+        step.revision_after = revision_after
+
+    def record_many(
+        self, key: str, indices: Sequence[int], old: Sequence, new: Sequence, revision_before: int, revision_after: int
+    ) -> None:
+        """一次記錄同一欄位的多筆修改（批次套用）；不在 group() 內時自成一個步驟。"""
+        step = self._open
+        standalone = step is None
+        if standalone:
+            step = EditStep(key, revision_before)
+        elif not step:
+            step.revision_before = revision_before
+        step.extend(key, indices, old, new)
+        step.revision_after = revision_after
+        if standalone:
+            self._push(step)
+
+    def _push(self, step: EditStep) -> None:
+        self.undo_stack.append(step)
+        self.delta_count += len(step)
+        if self.redo_stack:
+            # 新的修改讓重做分支失效
+            self.delta_count -= sum(len(item) for item in self.redo_stack)
+            self.redo_stack.clear()
+        # 至少保留剛推入的步驟
+        while len(self.undo_stack) > 1 and (
+            len(self.undo_stack) > self.max_steps or self.delta_count > self.max_deltas
+        ):
+            self.delta_count -= len(self.undo_stack.popleft())
+
+    def pop_undo(self) -> Optional[EditStep]:
+        if not self.undo_stack:
+            return None
+        step = self.undo_stack.pop()
+        self.redo_stack.append(step)
+        return step
+
+    def pop_redo(self) -> Optional[EditStep]:
+        if not self.redo_stack:
+            return None
+        step = self.redo_stack.pop()
+        self.undo_stack.append(step)
+        return step
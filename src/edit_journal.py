@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""編輯日誌：每次修改以一行 JSON 附加到存檔旁的 <存檔>.journal，程式中止後下次開啟時可重新套用。
+
+第一行是標頭，記錄建立日誌時存檔的大小與修改時間；存檔之後被其他程式（例如遊戲）改寫時日誌視為過期。
+其後每一行是一筆修改（一次欄位編輯、一次批次套用的一個欄位、一次復原或重做）：
+
+    {"l": 標籤, "i": [NPC 索引], "u": [NPC id], "k": 欄位或[欄位], "o": [舊值], "n": [新值], "ox": [...], "nx": [...]}
+
+頂層欄位的索引為 GLOBAL（-1）、id 為 null；ox／nx 列出值為 ABSENT（欄位不存在）的位置。
+每筆紀錄只編碼該次修改的差異，寫入成本與存檔大小無關。
+
+每筆紀錄寫入後立即交給作業系統（程式當掉不會遺失）；fsync（斷電保護）則批次進行：
+距離上次 fsync 超過 SYNC_INTERVAL 秒時才同步，其餘由 sync() 補上（GUI 定時呼叫）。
+寫回原存檔後 reset() 清空日誌並重寫標頭，日誌因此只保存上次儲存之後的修改。
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import json_backend
+from edit_history import ABSENT
+
+SUFFIX = ".journal"
+# 日誌格式變更時遞增
+JOURNAL_VERSION = 1
+# 兩次 fsync 之間至少相隔的秒數
+SYNC_INTERVAL = 1.0
+
+
+def journal_path(save_path: str) -> str:
+    return save_path + SUFFIX
+
+
+def _fingerprint(save_path: str) -> Tuple[int, int]:
+    stat = os.stat(save_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _header(save_path: str) -> bytes:
+    size, mtime_ns = _fingerprint(save_path)
+    return json_backend.dumps_bytes({"journal": JOURNAL_VERSION, "size": size, "mtime_ns": mtime_ns}) + b"\n"
+
+
+@dataclass
+class JournalRecord:
+    label: str
+    indices: List[int]
+    ids: list
+    keys: List[str]
+    old: list
+    new: list
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def deltas(self) -> Iterator[Tuple[int, object, str, object, object]]:
+        """依寫入順序回傳 (索引, NPC id, 欄位, 舊值, 新值)。"""
+        return zip(self.indices, self.ids, self.keys, self.old, self.new)
+
+
+def _absent_positions(values: Sequence) -> List[int]:
+    return [position for position, value in enumerate(values) if value is ABSENT]
+
+
+def _strip_absent(values: Sequence, positions: List[int]) -> list:
+    if not positions:
+        return list(values)
+    values = list(values)
+    for position in positions:
+        values[position] = None
+    return values
+
+
+def encode_record(
+    label: str,
+    indices: Sequence[int],
+    ids: Sequence,
+    keys: Union[str, Sequence[str]],
+    old: Sequence,
+    new: Sequence,
+    nonfinite: bool = False,
+) -> bytes:
+    """一筆紀錄的 JSON 行；`keys` 為字串時代表所有差異都是同一欄位，`nonfinite` 見 json_backend。"""
+    old_absent = _absent_positions(old)
+    new_absent = _absent_positions(new)
+    entry = {
+        "l": label,
+        "i": list(indices),
+        "u": list(ids),
+        "k": keys if isinstance(keys, str) else list(keys),
+        "o": _strip_absent(old, old_absent),
+        "n": _strip_absent(new, new_absent),
+    }
+    if old_absent:
+        entry["ox"] = old_absent
+    if new_absent:
+        entry["nx"] = new_absent
+    return json_backend.dumps_bytes(entry, nonfinite) + b"\n"
+
+
+def decode_record(line: bytes) -> JournalRecord:
+    """解析一行紀錄；格式不符時拋出 ValueError。"""
+    entry = json_backend.loads(line)
+    try:
+        indices = [int(idx) for idx in entry["i"]]
+        ids, old, new, keys = list(entry["u"]), list(entry["o"]), list(entry["n"]), entry["k"]
+        keys = [keys] * len(indices) if isinstance(keys, str) else [str(key) for key in keys]
+        for position in entry.get("ox", ()):
+            old[position] = ABSENT
+        for position in entry.get("nx", ()):
+            new[position] = ABSENT
+    except (KeyError, TypeError, IndexError) as exc:
+        raise ValueError(f"invalid journal record: {exc}") from None
+    if not len(indices) == len(ids) == len(keys) == len(old) == len(new):
+        raise ValueError("invalid journal record: column lengths differ")
+    return JournalRecord(str(entry.get("l", "")), indices, ids, keys, old, new)
+
+
+@dataclass
+class PendingJournal:
+    """讀到的日誌：`ends[i]` 為第 i 筆紀錄結束處的位元組位置，`stale` 表示存檔在日誌建立後已被改寫。
+
+    `archived` 為 set_aside() 之後日誌的新路徑。
+    """
+
+    path: str
+    stale: bool = False
+    records: List[JournalRecord] = field(default_factory=list)
+    ends: List[int] = field(default_factory=list)
+    archived: Optional[str] = None
+
+    @property
+    def delta_count(self) -> int:
+        return sum(len(record) for record in self.records)
+
+    def set_aside(self) -> str:
+        """把日誌改名為 <日誌>.old 保留（不再自動套用），回傳新路徑。"""
+        target = self.path + ".old"
+        os.replace(self.path, target)
+        self.archived = target
+        return target
+
+
+def read_journal(save_path: str) -> Optional[PendingJournal]:
+    """讀取存檔旁的日誌；沒有日誌時回傳 None。
+
+    最後一行不完整或無法解析（寫到一半時中止）時忽略該行及其後的內容；標頭無法解析的日誌視為過期。
+    """
+    path = journal_path(save_path)
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+    except FileNotFoundError:
+        return None
+    pending = PendingJournal(path)
+    newline = raw.find(b"\n")
+    try:
+        header = json_backend.loads(raw[:newline]) if newline != -1 else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("journal") != JOURNAL_VERSION:
+        pending.stale = True
+        return pending
+    try:
+        pending.stale = (header.get("size"), header.get("mtime_ns")) != _fingerprint(save_path)
+    except OSError:
+        pending.stale = True
+    if pending.stale:
+        return pending
+    start = newline + 1
+    while True:
+        end = raw.find(b"\n", start)
+        if end == -1:
+            break
+        try:
+            record = decode_record(raw[start:end])
+        except ValueError:
+            break
+        pending.records.append(record)
+        pending.ends.append(end + 1)
+        start = end + 1
+    return pending
+
+
+class EditJournal:
+    """附加寫入的日誌檔；以 open() 建立。`nonfinite` 為存檔是否含 NaN／Infinity（見 json_backend）。"""
+
+    def __init__(self, save_path: str, fh, sync_interval: float = SYNC_INTERVAL, nonfinite: bool = False) -> None:
+        self.save_path = save_path
+        self.path = journal_path(save_path)
+        self.sync_interval = sync_interval
+        self.nonfinite = nonfinite
+        self.records = 0
+        self._fh = fh
+        self._unsynced = False
+        self._synced_at = time.monotonic()
+
+    @classmethod
+    def open(
+        cls, save_path: str, keep: Optional[int] = None, sync_interval: float = SYNC_INTERVAL, nonfinite: bool = False
+    ) -> "EditJournal":
+        """開啟 `save_path` 的日誌：`keep` 為 None 時以新的標頭重新建立，否則保留前 `keep` 個位元組並接著附加。"""
+        path = journal_path(save_path)
+        if keep is not None:
+            with open(path, "r+b") as fh:
+                fh.truncate(keep)
+            fh = open(path, "ab")
+        else:
+            fh = open(path, "wb")
+            try:
+                fh.write(_header(save_path))
+                fh.flush()
+                os.fsync(fh.fileno())
+            except BaseException:
+                fh.close()
+                raise
+        return cls(save_path, fh, sync_interval, nonfinite)
+
+    def append(
+        self, label: str, indices: Sequence[int], ids: Sequence, keys: Union[str, Sequence[str]], old: Sequence, new: Sequence
+    ) -> None:
+        fh = self._fh
+        fh.write(encode_record(label, indices, ids, keys, old, new, self.nonfinite))
+        fh.flush()
+        self.records += 1
+        self._unsynced = True
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> bool:
+        """把尚未 fsync 的紀錄寫入磁碟；沒有待同步的紀錄時回傳 False。"""
+        if not self._unsynced or self._fh is None:
+            return False
+        os.fsync(self._fh.fileno())
+        self._unsynced = False
+        self._synced_at = time.monotonic()
+        return True
+
+    def reset(self) -> None:
+        """存檔已包含所有修改（寫回原檔或復原到已儲存的狀態）：清空紀錄並以存檔目前的大小與時間重寫標頭。"""
+        fh = self._fh
+        # "wb" 開啟時寫入位置不會隨 truncate 移動，不先回到開頭標頭前會留下一段 NUL
+        fh.seek(0)
+        fh.truncate(0)
+        fh.write(_header(self.save_path))
+        fh.flush()
+        os.fsync(fh.fileno())
+        self.records = 0
+        self._unsynced = False
+        self._synced_at = time.monotonic()
+
+    def close(self) -> None:
+        fh, self._fh = self._fh, None
+        if fh is None:
+            return
+        try:
+            if self._unsynced:
+                os.fsync(fh.fileno())
+        finally:
+            fh.close()
+
+    def discard(self) -> None:
+        """關閉並刪除日誌。"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self) -> str:
+        return f"<EditJournal {self.path!r} {self.records} records>"
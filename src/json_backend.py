@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""JSON 編解碼後端：安裝 orjson 或 ujson 時使用加速函式庫，否則使用標準函式庫 json。
+
+預設依 orjson → ujson → json 的順序選用第一個可匯入者；環境變數 BLACKTHORN_JSON（orjson / ujson / json）可指定後端。
+不論使用哪個後端，結果都與標準函式庫相同：
+
+* 輸出等同 `json.dumps(value, ensure_ascii=False, separators=(",", ":"))`，讀回的值與原值相同
+  （浮點數的指數寫法可能不同，例如 1e16 與 1e+16）。
+* 含 NaN／Infinity 字面值或 19 位以上數字的輸入交給標準函式庫解析：加速函式庫會拒絕前者，
+  並把超出 64 位元的整數讀成浮點數。
+* 加速函式庫無法處理的值（超出 64 位元的整數、非字串鍵、孤立的代理字元…）改由標準函式庫處理。
+* 加速函式庫會把 NaN／Infinity 寫成 null：含這些字面值的文件（解析時由 parse_constant 判斷，見 loads_document，
+  字串內容中的 "NaN" 不算）編碼時傳入 nonfinite=True，改用標準函式庫。這個旗標屬於每份文件，由呼叫端保存。
+
+解析大型文件時會暫停循環垃圾回收（gc_paused）：解析結果沒有循環參照，
+但數百萬個新建的 dict／list 會反覆觸發完整回收，在 100,000 NPC 的存檔上佔了解析時間的一半以上。
+"""
+from __future__ import annotations
+
+import gc
+import importlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+ENV_VAR = "BLACKTHORN_JSON"
+# 自動選擇時的優先順序
+PREFERRED = ("orjson", "ujson")
+
+_NONFINITE = (b"NaN", b"Infinity")
+# 數字 → "1"、其他位元組 → "0"；翻譯後找連續 19 個 "1" 即可判斷是否有 19 位以上的數字
+_DIGIT_MASK = bytes(49 if 48 <= code <= 57 else 48 for code in range(256))
+_LONG_NUMBER = b"1" * 19
+# 超過這個大小的輸入在解析期間暫停垃圾回收
+GC_PAUSE_BYTES = 1 << 20
+
+
+@contextmanager
+def gc_paused():
+    """暫停循環垃圾回收；本來就停用時不做任何事。"""
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def record_constants(seen: List[str]) -> Callable[[str], float]:
+    """供標準函式庫 parse_constant 使用：把讀到的 NaN／Infinity 字面值記錄在 `seen`。"""
+
+    def parse_constant(name: str) -> float:
+        seen.append(name)
+        return float(name)
+
+    return parse_constant
+
+
+def _std_dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _as_bytes(data):
+    if isinstance(data, (bytes, bytearray)):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8", "surrogatepass")
+    return bytes(data)
+
+
+def _needs_stdlib(data) -> bool:
+    if any(data.find(token) != -1 for token in _NONFINITE):
+        return True
+    return _LONG_NUMBER in data.translate(_DIGIT_MASK)
+
+
+class JsonBackend:
+    """`loads`／`dumps`／`dumps_bytes`／`dumps_pretty` 的一組實作；`name` 為 "orjson"、"ujson" 或 "json"。"""
+
+    def __init__(
+        self,
+        name: str,
+        version: str = "",
+        fast_loads: Optional[Callable] = None,
+        fast_dumps_bytes: Optional[Callable] = None,
+        fast_dumps_pretty: Optional[Callable] = None,
+    ) -> None:
+        self.name = name
+        self.version = version
+        self._loads = fast_loads
+        self._dumps_bytes = fast_dumps_bytes
+        self._dumps_pretty = fast_dumps_pretty
+
+    @property
+    def accelerated(self) -> bool:
+        return self._loads is not None
+
+    def describe(self) -> str:
+        if not self.accelerated:
+            return "json (stdlib)"
+        return f"{self.name} {self.version}".rstrip()
+
+    def loads(self, data, parse_constant: Optional[Callable[[str], float]] = None):
+        """解析 str 或 UTF-8 位元組；`parse_constant` 只在含 NaN／Infinity 字面值時被呼叫。"""
+        if len(data) < GC_PAUSE_BYTES:
+            return self._parse(data, parse_constant)
+        with gc_paused():
+            return self._parse(data, parse_constant)
+
+    def loads_document(self, data) -> Tuple[object, bool]:
+        """解析並回傳 (值, 是否含有 NaN／Infinity 字面值)；後者即編碼這份文件時的 nonfinite。"""
+        seen: List[str] = []
+        value = self.loads(data, record_constants(seen))
+        return value, bool(seen)
+
+    def _parse(self, data, parse_constant=None):
+        # 加速函式庫不接受 NaN／Infinity，能由它解析的輸入不需要 parse_constant
+        if self._loads is not None and not _needs_stdlib(_as_bytes(data)):
+            try:
+                return self._loads(data)
+            except (TypeError, ValueError):
+                # 孤立的代理字元等加速函式庫不接受的輸入；錯誤訊息以標準函式庫為準
+                pass
+        if not isinstance(data, (bytes, bytearray, str)):
+            data = bytes(data)
+        if parse_constant is None:
+            return json.loads(data)
+        return json.loads(data, parse_constant=parse_constant)
+
+    def dumps_bytes(self, value, nonfinite: bool = False) -> bytes:
+        """緊湊格式的 UTF-8 位元組；`nonfinite` 為 True（值可能含 NaN／Infinity）時使用標準函式庫。"""
+        if self._dumps_bytes is not None and not nonfinite:
+            try:
+                return self._dumps_bytes(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return _std_dumps(value).encode("utf-8")
+
+    def dumps(self, value, nonfinite: bool = False) -> str:
+        if self._dumps_bytes is not None and not nonfinite:
+            try:
+                return self._dumps_bytes(value).decode("utf-8")
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return _std_dumps(value)
+
+    def dumps_pretty(self, value, indent: int = 2, nonfinite: bool = False) -> str:
+        """等同 `json.dumps(value, ensure_ascii=False, indent=indent)`。"""
+        if self._dumps_pretty is not None and indent == 2 and not nonfinite:
+            try:
+                return self._dumps_pretty(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return json.dumps(value, ensure_ascii=False, indent=indent)
+
+    def __repr__(self) -> str:
+        return f"<JsonBackend {self.describe()}>"
+
+
+def _orjson_backend(module) -> JsonBackend:
+    dumps = module.dumps
+    indent = module.OPT_INDENT_2
+    return JsonBackend(
+        "orjson",
+        getattr(module, "__version__", ""),
+        fast_loads=module.loads,
+        fast_dumps_bytes=dumps,
+        fast_dumps_pretty=lambda value: dumps(value, option=indent).decode("utf-8"),
+    )
+
+
+def _ujson_backend(module) -> JsonBackend:
+    dumps = module.dumps
+
+    def dumps_bytes(value) -> bytes:
+        return dumps(value, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    # ujson 的縮排格式與標準函式庫不同，dumps_pretty 使用標準函式庫
+    return JsonBackend("ujson", getattr(module, "__version__", ""), fast_loads=module.loads, fast_dumps_bytes=dumps_bytes)
+
+
+_FACTORIES = {"orjson": _orjson_backend, "ujson": _ujson_backend}
+
+
+def load_backend(name: str) -> Optional[JsonBackend]:
+    """建立指定名稱的後端；函式庫未安裝時回傳 None。"""
+    if name == "json":
+        return JsonBackend("json")
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        return None
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    return factory(module)
+
+
+def select_backend(requested: Optional[str] = None) -> JsonBackend:
+    """依 `requested`（預設讀取環境變數）選擇後端；指定的後端無法使用時改為自動選擇。"""
+    if requested is None:
+        requested = os.environ.get(ENV_VAR, "")
+    requested = requested.strip().lower()
+    if requested:
+        backend = load_backend(requested)
+        if backend is not None:
+            return backend
+    for name in PREFERRED:
+        backend = load_backend(name)
+        if backend is not None:
+            return backend
+    return JsonBackend("json")
+
+
+backend = select_backend()
+
+
+def use_backend(name: str) -> JsonBackend:
+    """切換全域後端（基準測試用）；回傳新的後端。"""
+    global backend
+    backend = select_backend(name)
+    return backend
+
+
+def describe() -> str:
+    return backend.describe()
+
+
+def loads(data, parse_constant: Optional[Callable[[str], float]] = None):
+    return backend.loads(data, parse_constant)
+
+
+def loads_document(data) -> Tuple[object, bool]:
+    return backend.loads_document(data)
+
+
+def dumps(value, nonfinite: bool = False) -> str:
+    return backend.dumps(value, nonfinite)
+
+
+def dumps_bytes(value, nonfinite: bool = False) -> bytes:
+    return backend.dumps_bytes(value, nonfinite)
+
+
+def dumps_pretty(value, indent: int = 2, nonfinite: bool = False) -> str:
+    return backend.dumps_pretty(value, indent, nonfinite)
@@ -8,7 +8,6 @@ Run:
 """
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import List, Optional
@@ -16,6 +15,8 @@ from typing import List, Optional
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 
+import json_backend
+
 
 DATA_FIELDS = ("name", "title", "faction", "notes")
 DEFAULT_DATA = [
@@ -73,6 +74,8 @@ class ModernApp(ctk.CTk):
         self._data: List[EntryData] = [EntryData.from_json(item) for item in DEFAULT_DATA]
         self._selected_index: Optional[int] = 0
         self._current_path: Optional[Path] = None
+        # 載入的檔案含 NaN／Infinity 時寫回須使用標準函式庫（見 json_backend）
+        self._nonfinite = False
         self._list_buttons: List[ctk.CTkButton] = []
 
         # configure layout
@@ -384,8 +387,7 @@ class ModernApp(ctk.CTk):
 
         path = Path(path_str)
         try:
-            with path.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
+            payload, nonfinite = json_backend.loads_document(path.read_bytes())
         except Exception as exc:
             messagebox.showerror("載入失敗", f"讀取檔案時發生錯誤：\n{exc}")
             self._set_status("載入失敗。")
@@ -398,6 +400,7 @@ class ModernApp(ctk.CTk):
 
         self._data = [EntryData.from_json(item) for item in payload]
         self._current_path = path
+        self._nonfinite = nonfinite
         self._refresh_list()
         self._select_index(0 if self._data else None)
         self._set_status(f"已載入檔案：{path.name}")
@@ -423,8 +426,11 @@ class ModernApp(ctk.CTk):
 
     def _write_file(self, path: Path) -> None:
         try:
+            text = json_backend.dumps_pretty(
+                [entry.to_json() for entry in self._data], indent=2, nonfinite=self._nonfinite
+            )
             with path.open("w", encoding="utf-8") as f:
-                json.dump([entry.to_json() for entry in self._data], f, ensure_ascii=False, indent=2)
+                f.write(text)
         except Exception as exc:
             messagebox.showerror("儲存失敗", f"寫入檔案時發生錯誤：\n{exc}")
             self._set_status("儲存失敗。")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""輕量計時：以具名區段（span）包住載入、刷新、批次套用、備份與儲存等步驟。
+
+停用時 `span()` 只回傳一個共用的空物件，幾乎沒有額外成本；
+啟用後可取得最近一次某區段（含子區段）的耗時摘要，或匯出成 Chrome trace / Perfetto 可讀的 JSON。
+設定環境變數 BLACKTHORN_TRACE=1 可在啟動時直接啟用。
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# 保留的區段數量上限，避免長時間開啟時無限制成長
+MAX_EVENTS = 100_000
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanEvent:
+    __slots__ = ("name", "start", "duration", "thread", "depth", "parent", "children", "args")
+
+    def __init__(self, name: str, start: int, thread: int, depth: int, parent: Optional["SpanEvent"], args) -> None:
+        self.name = name
+        self.start = start
+        self.duration = 0
+        self.thread = thread
+        self.depth = depth
+        self.parent = parent
+        self.children: List[SpanEvent] = []
+        self.args = args
+
+    @property
+    def milliseconds(self) -> float:
+        return self.duration / 1e6
+
+
+class _Span:
+    __slots__ = ("tracer", "event")
+
+    def __init__(self, tracer: "Tracer", name: str, args) -> None:
+        self.tracer = tracer
+        stack = tracer._stack()
+        parent = stack[-1] if stack else None
+        self.event = SpanEvent(name, 0, threading.get_ident(), len(stack), parent, args)
+
+    def __enter__(self) -> SpanEvent:
+        self.tracer._stack().append(self.event)
+        self.event.start = time.perf_counter_ns()
+        return self.event
+
+    def __exit__(self, *exc) -> bool:
+        event = self.event
+        event.duration = time.perf_counter_ns() - event.start
+        stack = self.tracer._stack()
+        if stack and stack[-1] is event:
+            stack.pop()
+        self.tracer._finish(event)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, max_events: int = MAX_EVENTS) -> None:
+        self.enabled = enabled
+        self.events: Deque[SpanEvent] = deque(maxlen=max_events)
+        self._latest: Dict[str, SpanEvent] = {}
+        self._last_root: Optional[SpanEvent] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, **args):
+        """`with tracer.span("load.parse"):` 計時一段程式；停用時不做任何事。"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events.clear()
+            self._latest.clear()
+            self._last_root = None
+
+    def record(self, name: str, start: int, end: int, **args) -> None:
+        """補記一段已經結束的區段（perf_counter_ns 時間），例如啟用計時前的模組匯入。"""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        event = SpanEvent(name, start, threading.get_ident(), len(stack), parent, args or None)
+        event.duration = end - start
+        self._finish(event)
+
+    def _stack(self) -> List[SpanEvent]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, event: SpanEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+            self._latest[event.name] = event
+            if event.parent is not None:
+                event.parent.children.append(event)
+            else:
+                self._last_root = event
+
+    def latest(self, name: str) -> Optional[SpanEvent]:
+        return self._latest.get(name)
+
+    def summary(self, name: Optional[str] = None) -> str:
+        """最近一次 `name` 區段與其直接子區段的耗時，例如 "refresh 12.3 ms (filter 3.1, sort 2.0)"。
+
+        未指定 `name` 時使用最近完成的最外層區段。
+        """
+        root = self._last_root if name is None else self._latest.get(name)
+        if root is None:
+            return ""
+        children = root.children
+        text = f"{root.name} {root.milliseconds:.1f} ms"
+        if children:
+            parts = ", ".join(f"{child.name.rsplit('.', 1)[-1]} {child.milliseconds:.1f}" for child in children)
+            text += f" ({parts})"
+        return text
+
+    def chrome_trace(self) -> dict:
+        """轉成 Chrome trace event 格式（"X" 完整事件，時間單位為微秒）。"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace_events = []
+        for event in events:
+            item = {
+                "name": event.name,
+                "cat": event.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (event.start - self._origin) / 1000,
+                "dur": event.duration / 1000,
+                "pid": pid,
+                "tid": event.thread,
+            }
+            if event.args:
+                item["args"] = {key: value if isinstance(value, (int, float, str, bool)) else str(value)
+                                for key, value in event.args.items()}
+            trace_events.append(item)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> int:
+        """寫出 Chrome trace JSON，回傳事件數。"""
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(trace, fh)
+        return len(trace["traceEvents"])
+
+
+tracer = Tracer(enabled=os.environ.get("BLACKTHORN_TRACE", "") not in ("", "0"))
+span = tracer.span
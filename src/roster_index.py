@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""角色清單的欄式索引：數值欄位以 array（或選用的 NumPy）保存，篩選與排序以整欄批次處理。"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from itertools import compress, groupby
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # NumPy 為選用加速；未安裝時改用 array 與內建排序
+    import numpy as np
+except ImportError:  # pragma: no cover - 依環境而定
+    np = None
+
+# 欄位不存在或無法轉成整數時的佔位值
+MISSING = -(2 ** 63)
+_INT_MAX = 2 ** 63 - 1
+
+# 預設排序（隊伍、等級遞減、名稱）在排序快取中的鍵
+DEFAULT_ORDER = None
+# 修改這些欄位會讓預設排序失效
+_DEFAULT_ORDER_KEYS = ("team", "level", "unitname")
+
+SortKeys = Sequence[Tuple[str, bool]]
+
+# 名稱搜尋索引的 n-gram 長度；較短的搜尋字串改為直接掃描
+NGRAM = 3
+
+
+def name_ngrams(text: str) -> set:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def as_column_int(value) -> int:
+    """與原本排序時的 int(value) 一致；轉換失敗或超出 64 位元範圍時回傳 MISSING。"""
+    if value is None:
+        return MISSING
+    try:
+        number = int(value)
+    except Exception:
+        return MISSING
+    if MISSING < number <= _INT_MAX:
+        return number
+    return MISSING
+
+
+def generic_sort_key(value):
+    """非數值欄位（ID、名稱）的排序鍵：可轉整數者在前並依數值排序，其餘依字串排序。"""
+    try:
+        return (0, int(value))
+    except Exception:
+        return (1, str(value))
+
+
+class RosterRecord:
+    """清單上一個 NPC 的顯示欄位；載入時建立一次，編輯時就地更新並遞增 `version`。
+
+    欄位值以 list 保存，位置由同一索引的所有紀錄共用的 `positions`（欄位名→位置）決定。
+    """
+
+    __slots__ = ("idx", "values", "version", "_positions")
+
+    def __init__(self, idx: int, values: list, positions: Dict[str, int]) -> None:
+        self.idx = idx
+        self.values = values
+        self.version = 0
+        self._positions = positions
+
+    def get(self, key: str, default=None):
+        position = self._positions.get(key)
+        if position is None:
+            return default
+        return self.values[position]
+
+    def __getitem__(self, key: str):
+        return self.values[self._positions[key]]
+
+    def __repr__(self) -> str:
+        return f"<RosterRecord {self.idx} v{self.version}>"
+
+
+class RosterIndex:
+    """以欄為單位保存每個 NPC 的清單欄位，於載入時建立一次並隨編輯同步更新。
+
+    `select` 與 `order` 只處理 NPC 索引，不會建立任何每列的 dict。
+    名稱以 casefold 後的三字元組（trigram）建立倒排索引，搜尋時只檢查候選 NPC。
+    每個欄位第一次排序時會快取「全部 NPC 的排序結果」與「同值共用的名次」，
+    之後排序只需依篩選結果過濾；編輯只會讓被修改的欄位快取失效。
+    `records[idx]` 為清單顯示用的 RosterRecord，重繪時直接讀取，不再為每列建立 dict。
+    """
+
+    def __init__(
+        self,
+        npcs: Sequence,
+        int_keys: Iterable[str],
+        is_alive: Callable[[object], bool],
+        record_keys: Iterable[str] = (),
+        liveness_keys: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.int_keys = tuple(int_keys)
+        # 會影響存活判斷的欄位；None 代表任何欄位都可能影響，每次修改都重新判斷
+        self.liveness_keys = frozenset(liveness_keys) if liveness_keys is not None else None
+        self.record_keys = tuple(record_keys)
+        self._record_positions = {key: position for position, key in enumerate(self.record_keys)}
+        self._is_alive = is_alive
+        self.npcs = npcs
+        self.records: List[RosterRecord] = []
+        self.ints: Dict[str, array] = {}
+        self.alive = bytearray()
+        self.names: List[str] = []
+        self.names_folded: List[str] = []
+        self._permutations: Dict[Optional[str], array] = {}
+        self._ranks: Dict[Optional[str], array] = {}
+        self._ngrams: Dict[str, array] = {}
+        self.rebuild(npcs)
+
+    def __len__(self) -> int:
+        return len(self.alive)
+
+    def rebuild(self, npcs: Sequence) -> None:
+        self.npcs = npcs
+        columns = {key: array("q") for key in self.int_keys}
+        alive = bytearray(len(npcs))
+        names: List[str] = []
+        records: List[RosterRecord] = []
+        record_keys = self.record_keys
+        positions = self._record_positions
+        for idx, npc in enumerate(npcs):
+            if not hasattr(npc, "get"):
+                for column in columns.values():
+                    column.append(MISSING)
+                names.append("")
+                records.append(RosterRecord(idx, [None] * len(record_keys), positions))
+                continue
+            for key, column in columns.items():
+                column.append(as_column_int(npc.get(key)))
+            if self._is_alive(npc):
+                alive[idx] = 1
+            names.append(str(npc.get("unitname") or ""))
+            records.append(RosterRecord(idx, [npc.get(key) for key in record_keys], positions))
+        self.records = records
+        self.ints = columns
+        self.alive = alive
+        self.names = names
+        self.names_folded = [name.casefold() for name in names]
+        self._permutations.clear()
+        self._ranks.clear()
+        self._build_ngrams()
+
+    def _build_ngrams(self) -> None:
+        postings: Dict[str, array] = {}
+        for idx, name in enumerate(self.names_folded):
+            for gram in name_ngrams(name):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("q")
+                posting.append(idx)
+        self._ngrams = postings
+
+    def _reindex_name(self, idx: int, old: str, new: str) -> None:
+        old_grams = name_ngrams(old)
+        new_grams = name_ngrams(new)
+        for gram in old_grams - new_grams:
+            posting = self._ngrams.get(gram)
+            if posting is not None:
+                position = bisect_left(posting, idx)
+                if position < len(posting) and posting[position] == idx:
+                    del posting[position]
+        for gram in new_grams - old_grams:
+            posting = self._ngrams.get(gram)
+            if posting is None:
+                posting = self._ngrams[gram] = array("q")
+            position = bisect_left(posting, idx)
+            posting.insert(position, idx)
+
+    def search_candidates(self, search: str) -> Optional[List[int]]:
+        """回傳名稱包含 `search`（不分大小寫）的 NPC 索引；字串短於 n-gram 長度時回傳 None。"""
+        folded = search.casefold()
+        if len(folded) < NGRAM:
+            return None
+        postings = []
+        for gram in name_ngrams(folded):
+            posting = self._ngrams.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # 從最短的倒排串列出發，再以實際子字串比對去除誤判
+        smallest = min(postings, key=len)
+        names = self.names_folded
+        return [idx for idx in smallest if folded in names[idx]]
+
+    def invalidate(self, key: Optional[str]) -> None:
+        """讓與 `key` 相關的排序快取失效。"""
+        self._permutations.pop(key, None)
+        self._ranks.pop(key, None)
+        if key in _DEFAULT_ORDER_KEYS:
+            self._permutations.pop(DEFAULT_ORDER, None)
+            self._ranks.pop(DEFAULT_ORDER, None)
+
+    def update(self, idx: int, key: str, npc) -> None:
+        """NPC 欄位被修改後同步對應的欄位。"""
+        column = self.ints.get(key)
+        if column is not None:
+            column[idx] = as_column_int(npc.get(key))
+        position = self._record_positions.get(key)
+        if position is not None:
+            record = self.records[idx]
+            record.values[position] = npc.get(key)
+            record.version += 1
+        self.invalidate(key)
+        if key == "unitname":
+            name = str(npc.get("unitname") or "")
+            folded = name.casefold()
+            self._reindex_name(idx, self.names_folded[idx], folded)
+            self.names[idx] = name
+            self.names_folded[idx] = folded
+        if self.liveness_keys is None or key in self.liveness_keys:
+            self.alive[idx] = 1 if self._is_alive(npc) else 0
+
+    def update_many(self, key: str, indices: Sequence[int], values: Sequence) -> None:
+        """批次版 update：`indices[i]` 的 `key` 已被設為 `values[i]`；排序快取只失效一次。"""
+        column = self.ints.get(key)
+        position = self._record_positions.get(key)
+        records = self.records
+        if column is not None:
+            for idx, value in zip(indices, values):
+                # 大多數情況已是整數，省去轉換
+                column[idx] = value if type(value) is int and MISSING < value <= _INT_MAX else as_column_int(value)
+        if position is not None:
+            for idx, value in zip(indices, values):
+                record = records[idx]
+                record.values[position] = value
+                record.version += 1
+        self.invalidate(key)
+        if key == "unitname":
+            for idx, value in zip(indices, values):
+                name = str(value or "")
+                folded = name.casefold()
+                self._reindex_name(idx, self.names_folded[idx], folded)
+                self.names[idx] = name
+                self.names_folded[idx] = folded
+        if self.liveness_keys is None or key in self.liveness_keys:
+            npcs = self.npcs
+            for idx in indices:
+                self.alive[idx] = 1 if self._is_alive(npcs[idx]) else 0
+
+    # ------------------------------------------------------------------
+    # filtering
+    def select(
+        self,
+        only_team: Optional[int] = None,
+        min_level: Optional[int] = None,
+        only_underscore: bool = False,
+        search: str = "",
+        include_dead: bool = False,
+    ) -> List[int]:
+        """回傳符合條件的 NPC 索引（依索引遞增）；預設只包含存活者。"""
+        candidates = self.search_candidates(search) if search else None
+        if candidates is not None:
+            indices = self._select_candidates(candidates, only_team, min_level, include_dead)
+        elif np is not None:
+            indices = self._select_numpy(only_team, min_level, include_dead)
+        else:
+            indices = self._select_array(only_team, min_level, include_dead)
+        names = self.names
+        if only_underscore:
+            indices = [idx for idx in indices if "_" in names[idx]]
+        if search and candidates is None:
+            folded = self.names_folded
+            search = search.casefold()
+            indices = [idx for idx in indices if search in folded[idx]]
+        return indices
+
+    def _select_candidates(self, candidates: List[int], only_team, min_level, include_dead=False) -> List[int]:
+        # 候選數量通常很少，逐一檢查即可
+        alive = self.alive
+        indices = candidates if include_dead else [idx for idx in candidates if alive[idx]]
+        if only_team is not None:
+            team = self.ints["team"]
+            indices = [idx for idx in indices if team[idx] == only_team]
+        if min_level:
+            level = self.ints["level"]
+            indices = [
+                idx for idx in indices
+                if level[idx] >= min_level or (level[idx] == MISSING and min_level <= 0)
+            ]
+        return indices
+
+    def _select_array(self, only_team, min_level, include_dead=False) -> List[int]:
+        alive = self.alive
+        indices = list(range(len(alive))) if include_dead else list(compress(range(len(alive)), alive))
+        if only_team is not None:
+            team = self.ints["team"]
+            indices = [idx for idx in indices if team[idx] == only_team]
+        if min_level:
+            level = self.ints["level"]
+            # 原本的判斷是 (level or 0) < min_level；缺少等級視為 0
+            if min_level > 0:
+                indices = [idx for idx in indices if level[idx] >= min_level]
+            else:
+                indices = [idx for idx in indices if level[idx] >= min_level or level[idx] == MISSING]
+        return indices
+
+    def _select_numpy(self, only_team, min_level, include_dead=False) -> List[int]:
+        if include_dead:
+            mask = np.ones(len(self.alive), dtype=bool)
+        else:
+            mask = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        if only_team is not None:
+            mask &= np.frombuffer(self.ints["team"], dtype=np.int64) == only_team
+        if min_level:
+            level = np.frombuffer(self.ints["level"], dtype=np.int64)
+            level_ok = level >= min_level
+            if min_level <= 0:
+                level_ok |= level == MISSING
+            mask &= level_ok
+        return np.flatnonzero(mask).tolist()
+
+    # ------------------------------------------------------------------
+    # sorting
+    def order(self, indices: List[int], sort_keys: Optional[SortKeys] = None) -> array:
+        """依 `sort_keys`（[(欄位, 是否遞減), ...]）排序 NPC 索引；空值使用預設排序。
+
+        單一欄位直接以快取的排序結果過濾（反向時把名次相同的群組倒過來，群組內仍依原順序）；
+        多欄位則以各欄名次由次要到主要做穩定排序。
+        結果為 array('q')，保留結果時不會為每個 NPC 留下 int 物件。
+        """
+        if not sort_keys:
+            return self._filter_permutation(DEFAULT_ORDER, indices, False)
+        if len(sort_keys) == 1:
+            column, reverse = sort_keys[0]
+            if column == "idx":
+                return array("q", sorted(indices, reverse=reverse))
+            return self._filter_permutation(column, indices, reverse)
+        result = sorted(indices)
+        for column, reverse in reversed(sort_keys):
+            if column == "idx":
+                result.sort(reverse=reverse)
+            else:
+                result.sort(key=self.sort_ranks(column).__getitem__, reverse=reverse)
+        return array("q", result)
+
+    def sort_permutation(self, column: Optional[str]) -> array:
+        """全部 NPC 依 `column` 遞增排序的索引（同值依索引遞增），結果會被快取。"""
+        permutation = self._permutations.get(column)
+        if permutation is None:
+            permutation = self._build_permutation(column)
+            self._permutations[column] = permutation
+        return permutation
+
+    def sort_ranks(self, column: Optional[str]) -> array:
+        """每個 NPC 在 `column` 上的名次；排序鍵相同者名次相同。"""
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            permutation = self.sort_permutation(column)
+            key = self._sort_key_func(column)
+            ranks = array("q", bytes(8 * len(permutation)))
+            rank = -1
+            previous = object()
+            for idx in permutation:
+                current = key(idx)
+                if current != previous:
+                    rank += 1
+                    previous = current
+                ranks[idx] = rank
+            self._ranks[column] = ranks
+        return ranks
+
+    def _filter_permutation(self, column: Optional[str], indices: List[int], reverse: bool) -> array:
+        permutation = self.sort_permutation(column)
+        if np is not None:
+            mask = np.zeros(len(permutation), dtype=bool)
+            mask[np.asarray(indices, dtype=np.int64)] = True
+            ordered = np.frombuffer(permutation, dtype=np.int64)
+            selected = ordered[mask[ordered]]
+            if reverse:
+                selected = self._reverse_groups_numpy(column, selected)
+            return array("q", selected.tobytes())
+        mask = bytearray(len(permutation))
+        for idx in indices:
+            mask[idx] = 1
+        result = array("q", compress(permutation, map(mask.__getitem__, permutation)))
+        if reverse:
+            # 與 sorted(..., reverse=True) 相同：名次相同者維持原本（索引遞增）的順序
+            ranks = self.sort_ranks(column)
+            groups = [list(group) for _, group in groupby(result, ranks.__getitem__)]
+            result = array("q")
+            for group in reversed(groups):
+                result.extend(group)
+        return result
+
+    def _reverse_groups_numpy(self, column: Optional[str], selected):
+        """遞增排列的 `selected` 改為遞減，名次相同的群組內維持原順序（線性時間）。"""
+        size = len(selected)
+        if size < 2:
+            return selected
+        ranks = np.frombuffer(self.sort_ranks(column), dtype=np.int64)[selected]
+        starts = np.flatnonzero(np.concatenate(([True], ranks[1:] != ranks[:-1])))
+        ends = np.append(starts[1:], size)
+        group = np.repeat(np.arange(len(starts)), ends - starts)
+        # 位置 p 所在群組為 [s, e)：遞減排列中該群組從 size - e 開始
+        positions = size - ends[group] + (np.arange(size) - starts[group])
+        result = np.empty_like(selected)
+        result[positions] = selected
+        return result
+
+    def _sort_key_func(self, column: Optional[str]) -> Callable[[int], object]:
+        """與原本 refresh_table 相同語意的排序鍵（僅在建立快取時使用）。"""
+        if column is DEFAULT_ORDER:
+            team = self.ints["team"]
+            level = self.ints["level"]
+            names = self.names
+            return lambda idx: (
+                0 if team[idx] == MISSING else team[idx],
+                -(0 if level[idx] == MISSING else level[idx]),
+                names[idx],
+            )
+        values = self.ints.get(column)
+        npcs = self.npcs
+        if values is not None:
+            return lambda idx: (0, values[idx]) if values[idx] != MISSING else (1, str(npcs[idx].get(column)))
+        if column == "unitname":
+            names = self.names
+            return lambda idx: generic_sort_key(names[idx])
+        return lambda idx: generic_sort_key(npcs[idx].get(column) if hasattr(npcs[idx], "get") else None)
+
+    def _build_permutation(self, column: Optional[str]) -> array:
+        size = len(self.alive)
+        if column == "idx":
+            return array("q", range(size))
+        values = self.ints.get(column)
+        if values is not None:
+            # 數值在前（以 C 層級的 array 取值排序），無法轉換者依字串排在後面
+            present = [idx for idx in range(size) if values[idx] != MISSING]
+            missing = [idx for idx in range(size) if values[idx] == MISSING]
+            if np is not None and present:
+                keys = np.frombuffer(values, dtype=np.int64)[present]
+                present = np.asarray(present)[np.argsort(keys, kind="stable")].tolist()
+            else:
+                present.sort(key=values.__getitem__)
+            if missing:
+                key = self._sort_key_func(column)
+                missing.sort(key=key)
+            return array("q", present + missing)
+        key = self._sort_key_func(column)
+        keys = [key(idx) for idx in range(size)]
+        ordered = sorted(range(size), key=keys.__getitem__)
+        return array("q", ordered)
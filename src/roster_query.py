@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""角色篩選運算式：例如 `level >= 10 and team in (0, 1) and name ~ "_"`，解析一次後重複使用。
+
+支援比較運算 `== != < <= > >=`、子字串 `~`／`!~`（不分大小寫）、`in (...)`／`not in (...)`、
+`and`／`or`／`not` 與括號；字串以單或雙引號包住。`name` 為 `unitname` 的別名，`idx` 為 NPC 索引。
+
+`compile_filter()` 快取編譯結果；套用時最外層 `and` 的各條件若能對應 RosterIndex 的整數欄或名稱欄，
+就以整欄運算（NumPy 或位元組遮罩）一次算出，其餘條件才逐一以 NPC 索引判斷。
+"""
+from __future__ import annotations
+
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, List, Sequence, Tuple
+
+from roster_index import MISSING, np
+
+FIELD_ALIASES = {"name": "unitname"}
+# 快取的已編譯運算式數量
+QUERY_CACHE_SIZE = 64
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|<=|>=|!~|<|>|~|\(|\)|,)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+    )""",
+    re.VERBOSE,
+)
+
+
+def _contains(a, b) -> bool:
+    return str(b).casefold() in str(a).casefold()
+
+
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "~": _contains,
+    "!~": lambda a, b: not _contains(a, b),
+}
+# 缺少欄位時仍視為符合的運算
+_NEGATED = ("!=", "!~")
+_KEYWORDS = ("and", "or", "not", "in")
+
+Token = Tuple[str, object, int]
+Predicate = Callable[[int], bool]
+
+
+class QueryError(ValueError):
+    """篩選運算式有語法錯誤；`position` 為出錯的字元位置。"""
+
+    def __init__(self, message: str, position: int) -> None:
+        super().__init__(f"{message} (at {position})")
+        self.position = position
+
+
+def tokenize(text: str) -> List[Token]:
+    tokens: List[Token] = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        if text[pos:].isspace():
+            break
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            start = len(text) - len(text[pos:].lstrip())
+            raise QueryError(f"unexpected character {text[start]!r}", start)
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == "number":
+            value = float(value) if "." in value else int(value)
+        elif kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "name" and value in _KEYWORDS:
+            kind = "keyword"
+        tokens.append((kind, value, start))
+        pos = match.end()
+    tokens.append(("end", None, length))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self) -> Token:
+        return self.tokens[self.position]
+
+    def take(self) -> Token:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def accept(self, kind: str, value: object) -> bool:
+        token = self.peek()
+        if token[0] == kind and token[1] == value:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self):
+        node = self.parse_or()
+        kind, value, start = self.peek()
+        if kind != "end":
+            raise QueryError(f"unexpected {value!r}", start)
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept("keyword", "or"):
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept("keyword", "and"):
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.accept("keyword", "not"):
+            return ("not", self.parse_not())
+        if self.accept("op", "("):
+            node = self.parse_or()
+            if not self.accept("op", ")"):
+                kind, value, start = self.peek()
+                raise QueryError("expected ')'", start)
+            return node
+        return self.parse_compare()
+
+    def parse_compare(self):
+        left = self.parse_operand()
+        if self.accept("keyword", "in"):
+            return ("in", left, self.parse_list())
+        if self.accept("keyword", "not"):
+            kind, value, start = self.peek()
+            if not self.accept("keyword", "in"):
+                raise QueryError("expected 'in' after 'not'", start)
+            return ("not", ("in", left, self.parse_list()))
+        kind, value, start = self.take()
+        if kind != "op" or value not in _COMPARE:
+            raise QueryError("expected comparison operator", start)
+        right = self.parse_operand()
+        return ("cmp", value, left, right)
+
+    def parse_list(self) -> tuple:
+        kind, value, start = self.peek()
+        if not self.accept("op", "("):
+            raise QueryError("expected '(' after 'in'", start)
+        values = []
+        while True:
+            kind, value, start = self.take()
+            if kind not in ("number", "string"):
+                raise QueryError("expected value in list", start)
+            values.append(value)
+            if self.accept("op", ")"):
+                return tuple(values)
+            kind, value, start = self.peek()
+            if not self.accept("op", ","):
+                raise QueryError("expected ',' or ')'", start)
+
+    def parse_operand(self):
+        kind, value, start = self.take()
+        if kind == "name":
+            return ("field", FIELD_ALIASES.get(value, value))
+        if kind in ("number", "string"):
+            return ("literal", value)
+        if kind == "end":
+            raise QueryError("unexpected end of query", start)
+        raise QueryError(f"expected field or value, got {value!r}", start)
+
+
+def parse_query(text: str):
+    """解析運算式並回傳語法樹；空字串回傳 None（不篩選）。"""
+    if not text or not text.strip():
+        return None
+    return _Parser(text).parse()
+
+
+def _compile_operand(node, roster) -> Callable[[int], object]:
+    kind, value = node
+    if kind == "literal":
+        return lambda idx: value
+    if value == "idx":
+        return lambda idx: idx
+    column = roster.ints.get(value)
+    if column is not None:
+        return lambda idx: None if column[idx] == MISSING else column[idx]
+    if value == "unitname":
+        names = roster.names
+        return names.__getitem__
+    npcs = roster.npcs
+    return lambda idx: npcs[idx].get(value) if hasattr(npcs[idx], "get") else None
+
+
+def _compile(node, roster) -> Predicate:
+    kind = node[0]
+    if kind == "and":
+        left, right = _compile(node[1], roster), _compile(node[2], roster)
+        return lambda idx: left(idx) and right(idx)
+    if kind == "or":
+        left, right = _compile(node[1], roster), _compile(node[2], roster)
+        return lambda idx: left(idx) or right(idx)
+    if kind == "not":
+        inner = _compile(node[1], roster)
+        return lambda idx: not inner(idx)
+    if kind == "in":
+        operand = _compile_operand(node[1], roster)
+        values = node[2]
+
+        def member(idx: int) -> bool:
+            value = operand(idx)
+            return value is not None and value in values
+        return member
+    compare = _COMPARE[node[1]]
+    negated = node[1] in _NEGATED
+    left, right = _compile_operand(node[2], roster), _compile_operand(node[3], roster)
+
+    def predicate(idx: int) -> bool:
+        a = left(idx)
+        b = right(idx)
+        if a is None or b is None:
+            # 缺少欄位只會符合 != 與 !~
+            return negated and a is not b
+        try:
+            return bool(compare(a, b))
+        except TypeError:
+            return negated
+    return predicate
+
+
+# ----------------------------------------------------------------------
+# 整欄運算：遮罩為 NumPy bool 陣列，未安裝 NumPy 時為每個 NPC 一個位元組（0/1）的 bytes
+
+_FLIPPED = {"==": "==", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+
+def _as_mask(flags) -> object:
+    if np is not None:
+        return np.frombuffer(bytes(flags), dtype=np.uint8).astype(bool)
+    return bytes(flags)
+
+
+def _mask_and(a, b):
+    if np is not None:
+        return a & b
+    return (int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _mask_or(a, b):
+    if np is not None:
+        return a | b
+    return (int.from_bytes(a, "little") | int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _mask_not(a):
+    if np is not None:
+        return ~a
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b"\x01" * len(a), "little")).to_bytes(len(a), "little")
+
+
+def _int_column_mask(column, op: str, value):
+    if np is not None:
+        values = np.frombuffer(column, dtype=np.int64)
+        present = values != MISSING
+        if op == "!=":
+            return (values != value) | ~present
+        return _COMPARE[op](values, value) & present
+    compare = _COMPARE[op]
+    if op == "!=":
+        return bytes(1 if v == MISSING or v != value else 0 for v in column)
+    return bytes(1 if v != MISSING and compare(v, value) else 0 for v in column)
+
+
+def _int_member_mask(column, values: tuple):
+    if np is not None:
+        return np.isin(np.frombuffer(column, dtype=np.int64), np.asarray(values))
+    # 欄位值都是整數；1.0 與 1 在集合中視為相同，與逐筆判斷一致
+    members = set(values)
+    return bytes(1 if v != MISSING and v in members else 0 for v in column)
+
+
+def _name_mask(roster, op: str, value: str):
+    if op in ("~", "!~"):
+        folded = value.casefold()
+        candidates = roster.search_candidates(folded)
+        if candidates is not None:
+            flags = bytearray(len(roster))
+            for idx in candidates:
+                flags[idx] = 1
+        else:
+            flags = bytearray(1 if folded in name else 0 for name in roster.names_folded)
+        mask = _as_mask(flags)
+        return _mask_not(mask) if op == "!~" else mask
+    if op in ("==", "!="):
+        mask = _as_mask(1 if name == value else 0 for name in roster.names)
+        return _mask_not(mask) if op == "!=" else mask
+    return None
+
+
+def _column_mask(node, roster):
+    """能以整欄運算求值的條件回傳遮罩，否則回傳 None。"""
+    kind = node[0]
+    if kind in ("and", "or"):
+        left = _column_mask(node[1], roster)
+        right = _column_mask(node[2], roster) if left is not None else None
+        if right is None:
+            return None
+        return _mask_and(left, right) if kind == "and" else _mask_or(left, right)
+    if kind == "not":
+        inner = _column_mask(node[1], roster)
+        return None if inner is None else _mask_not(inner)
+    if kind == "in":
+        operand, values = node[1], node[2]
+        column = roster.ints.get(operand[1]) if operand[0] == "field" else None
+        if column is None or not all(type(value) in (int, float) for value in values):
+            return None
+        return _int_member_mask(column, values)
+    op, left, right = node[1], node[2], node[3]
+    if left[0] == "literal" and right[0] == "field" and op in _FLIPPED:
+        op, left, right = _FLIPPED[op], right, left
+    if left[0] != "field" or right[0] != "literal":
+        return None
+    field, value = left[1], right[1]
+    column = roster.ints.get(field)
+    if column is not None and op in _FLIPPED and type(value) in (int, float):
+        return _int_column_mask(column, op, value)
+    if field == "unitname" and isinstance(value, str):
+        return _name_mask(roster, op, value)
+    return None
+
+
+def _conjuncts(node) -> List[tuple]:
+    if node[0] == "and":
+        return _conjuncts(node[1]) + _conjuncts(node[2])
+    return [node]
+
+
+class RosterFilter:
+    """已解析的篩選運算式；可跨多次刷新重複使用，每次套用時讀取 RosterIndex 目前的欄位。"""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tree = parse_query(text)
+        self.conjuncts = _conjuncts(self.tree) if self.tree is not None else []
+
+    def __bool__(self) -> bool:
+        return self.tree is not None
+
+    @property
+    def fields(self) -> frozenset:
+        """運算式用到的欄位名稱（別名已換成實際欄位）。"""
+        found = set()
+
+        def visit(node) -> None:
+            if node[0] == "field":
+                found.add(node[1])
+            elif node[0] != "literal":
+                for child in node[1:]:
+                    if isinstance(child, tuple):
+                        visit(child)
+        if self.tree is not None:
+            visit(self.tree)
+        return frozenset(found)
+
+    def predicate(self, roster) -> Predicate:
+        if self.tree is None:
+            return lambda idx: True
+        return _compile(self.tree, roster)
+
+    def select(self, roster, indices: Sequence[int]) -> List[int]:
+        """回傳 `indices` 中符合條件者，保留原本順序。"""
+        if self.tree is None:
+            return list(indices)
+        mask = None
+        residual = []
+        for node in self.conjuncts:
+            node_mask = _column_mask(node, roster)
+            if node_mask is None:
+                residual.append(node)
+            else:
+                mask = node_mask if mask is None else _mask_and(mask, node_mask)
+        if mask is None:
+            result = list(indices)
+        elif np is not None:
+            positions = np.asarray(indices, dtype=np.int64)
+            result = positions[mask[positions]].tolist()
+        else:
+            result = [idx for idx in indices if mask[idx]]
+        for node in residual:
+            predicate = _compile(node, roster)
+            result = [idx for idx in result if predicate(idx)]
+        return result
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_filter(text: str) -> RosterFilter:
+    """解析並快取運算式；語法錯誤時拋出 QueryError（錯誤不會被快取）。"""
+    return RosterFilter(text)
+
+
+def compile_query(text: str, roster) -> Predicate:
+    """把運算式編譯成 `predicate(idx) -> bool`；語法錯誤時拋出 QueryError。"""
+    return compile_filter(text).predicate(roster)
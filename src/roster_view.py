@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""虛擬化角色清單：只建立可視範圍（加少量預留列）的列元件，捲動時回收重用。"""
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import customtkinter as ctk
+
+EVEN_ROW_COLOR = "#23283a"
+ODD_ROW_COLOR = "#1c2133"
+MATCH_ROW_COLOR = "#34405f"
+ROW_TEXT_COLOR = "#e5e7ff"
+DIMMED_TEXT_COLOR = "#6b7391"
+SELECTED_BORDER_COLOR = "#4f83ff"
+
+# 每列高度（未縮放單位），列與列之間保留 ROW_GAP 的間距
+ROW_HEIGHT = 44
+ROW_GAP = 8
+ROW_PITCH = ROW_HEIGHT + ROW_GAP
+# 可視範圍上下各多建立幾列，避免快速捲動時露出空白
+ROW_OVERSCAN = 4
+# 滑鼠滾輪每格捲動的列數
+WHEEL_ROWS = 3
+
+# 資料列即 NPC 索引；顯示內容由 records[idx]（具 get() 與 version 的紀錄）提供
+Row = int
+
+
+class _RowSlot:
+    """一組可重複使用的列元件（外框、勾選框與各欄位標籤）。"""
+
+    __slots__ = (
+        "frame", "var", "checkbox", "labels", "texts", "idx", "position", "bg", "selected", "stale", "placed_y", "version",
+        "dimmed",
+    )
+
+    def __init__(self) -> None:
+        self.frame = None
+        self.var = None
+        self.checkbox = None
+        self.labels: List[ctk.CTkLabel] = []
+        self.texts: List[str] = []
+        self.idx: Optional[int] = None
+        self.position: Optional[int] = None
+        self.bg: Optional[str] = None
+        self.selected = False
+        self.stale = True
+        self.placed_y: Optional[float] = None
+        self.version = -1
+        self.dimmed = False
+
+
+class VirtualRoster(ctk.CTkFrame):
+    """固定數量列元件的捲動表格。
+
+    `set_rows` 只記錄資料；實際畫面只會為可視範圍內的列綁定元件，
+    因此重繪成本與角色總數無關。列元件以 NPC 索引為鍵保留，
+    資料更新時只重設真正變動的欄位。
+    """
+
+    def __init__(
+        self,
+        master,
+        columns: Sequence[Tuple[str, str, int]],
+        on_toggle: Callable[[int, bool], None],
+        is_selected: Callable[[int], bool],
+        **kwargs,
+    ) -> None:
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self._columns = list(columns)
+        self._on_toggle = on_toggle
+        self._is_selected = is_selected
+
+        self._rows: Sequence[Row] = []
+        self._records: Sequence = []
+        self._highlight: Callable[[int], bool] = lambda idx: False
+        self._dimmed: Callable[[int], bool] = lambda idx: False
+        self._slots: List[_RowSlot] = []
+        self._slot_by_idx: Dict[int, _RowSlot] = {}
+        self._restyle = False
+        self._offset = 0.0
+        self._viewport_height = 0.0
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._viewport.bind("<Configure>", self._on_viewport_configure)
+        self._bind_wheel(self._viewport)
+
+    # ------------------------------------------------------------------
+    # public API
+    @property
+    def rows(self) -> Sequence[Row]:
+        return self._rows
+
+    def set_rows(
+        self,
+        rows: Sequence[Row],
+        records: Optional[Sequence] = None,
+        highlight: Optional[Callable[[int], bool]] = None,
+        dimmed: Optional[Callable[[int], bool]] = None,
+    ) -> bool:
+        """替換資料列並回傳順序是否改變；盡量讓原本在最上方的角色維持在相同位置。
+
+        `rows` 為 NPC 索引序列（list 或 array），`records[idx]` 提供該列的欄位（`get(key)`）與 `version`。
+        `dimmed(idx)` 為真的列（例如已死亡的 NPC）以較暗的文字顯示。
+        紀錄就地更新，欄位是否變動由 version 判斷，因此重繪只處理可視列，不會為每個 NPC 配置物件。
+        """
+        anchor_idx, anchor_delta = self._top_anchor()
+        reordered = type(rows) is not type(self._rows) or rows != self._rows
+        if records is not None and records is not self._records:
+            self._records = records
+            for slot in self._slots:
+                slot.stale = True
+        self._rows = rows
+        if highlight is not None:
+            self._highlight = highlight
+            self._restyle = True
+        if dimmed is not None:
+            self._dimmed = dimmed
+            self._restyle = True
+        elif reordered:
+            self._restyle = True
+
+        offset = self._offset
+        if anchor_idx is not None and reordered:
+            try:
+                offset = rows.index(anchor_idx) * ROW_PITCH + anchor_delta
+            except ValueError:
+                pass
+        self._offset = self._clamp_offset(offset)
+        self._render()
+        return reordered
+
+    def update_rows(self) -> None:
+        """紀錄就地修改後（順序不變時）重繪可視列；只有 version 變動的列會更新欄位。"""
+        self._render()
+
+    def refresh_selection(self) -> None:
+        """重新套用可視列的勾選狀態（例如清除選取後）。"""
+        for slot in self._slots:
+            if slot.idx is not None:
+                self._apply_selection(slot, self._is_selected(slot.idx))
+
+    def scroll_to_top(self) -> None:
+        self._offset = 0.0
+        self._render()
+
+    # ------------------------------------------------------------------
+    # scrolling
+    def _content_height(self) -> float:
+        return len(self._rows) * ROW_PITCH
+
+    def _clamp_offset(self, offset: float) -> float:
+        max_offset = max(0.0, self._content_height() - self._viewport_height)
+        return min(max(0.0, offset), max_offset)
+
+    def _top_anchor(self) -> Tuple[Optional[int], float]:
+        if not self._rows:
+            return None, 0.0
+        first = min(int(self._offset // ROW_PITCH), len(self._rows) - 1)
+        return self._rows[first], self._offset - first * ROW_PITCH
+
+    def _scroll_to(self, offset: float) -> None:
+        offset = self._clamp_offset(offset)
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action: str, *args) -> None:
+        if action == "moveto" and args:
+            self._scroll_to(float(args[0]) * self._content_height())
+        elif action == "scroll" and len(args) >= 2:
+            amount = int(args[0])
+            step = self._viewport_height if args[1] == "pages" else ROW_PITCH
+            self._scroll_to(self._offset + amount * step)
+
+    def _on_mouse_wheel(self, event) -> str:
+        if getattr(event, "num", None) == 4:
+            direction = -1
+        elif getattr(event, "num", None) == 5:
+            direction = 1
+        elif event.delta:
+            direction = -1 if event.delta > 0 else 1
+        else:
+            return "break"
+        self._scroll_to(self._offset + direction * WHEEL_ROWS * ROW_PITCH)
+        return "break"
+
+    def _bind_wheel(self, widget) -> None:
+        widget.bind("<MouseWheel>", self._on_mouse_wheel)
+        widget.bind("<Button-4>", self._on_mouse_wheel)
+        widget.bind("<Button-5>", self._on_mouse_wheel)
+
+    def _on_viewport_configure(self, event) -> None:
+        height = float(self._reverse_widget_scaling(event.height))
+        if height == self._viewport_height:
+            return
+        self._viewport_height = height
+        self._offset = self._clamp_offset(self._offset)
+        self._render()
+
+    # ------------------------------------------------------------------
+    # row pool
+    def _ensure_pool(self, size: int) -> None:
+        while len(self._slots) < size:
+            self._slots.append(self._create_slot())
+
+    def _create_slot(self) -> _RowSlot:
+        slot = _RowSlot()
+        frame = ctk.CTkFrame(
+            self._viewport,
+            height=ROW_HEIGHT,
+            fg_color=EVEN_ROW_COLOR,
+            corner_radius=10,
+            border_width=0,
+            border_color=SELECTED_BORDER_COLOR,
+        )
+        frame.grid_propagate(False)
+        frame.grid_rowconfigure(0, weight=1)
+        for column in range(len(self._columns) + 1):
+            frame.grid_columnconfigure(column, weight=1 if column == 5 else 0)
+
+        var = ctk.BooleanVar(value=False)
+        checkbox = ctk.CTkCheckBox(
+            frame,
+            text="",
+            variable=var,
+            command=lambda s=slot: self._on_slot_toggled(s),
+            fg_color="#3b82f6",
+            hover_color="#2563eb",
+        )
+        checkbox.grid(row=0, column=0, padx=(12, 8))
+        self._bind_wheel(frame)
+        self._bind_wheel(checkbox)
+
+        labels = []
+        for column_index, (_, _, width) in enumerate(self._columns, start=1):
+            label = ctk.CTkLabel(frame, text="", width=width, anchor="w", text_color=ROW_TEXT_COLOR)
+            label.grid(row=0, column=column_index, padx=(0, 12), sticky="w")
+            self._bind_wheel(label)
+            labels.append(label)
+
+        slot.frame = frame
+        slot.var = var
+        slot.checkbox = checkbox
+        slot.labels = labels
+        slot.texts = [""] * len(labels)
+        return slot
+
+    def _render(self) -> None:
+        total = len(self._rows)
+        visible = max(1, math.ceil(self._viewport_height / ROW_PITCH) + 1)
+        pool_size = visible + 2 * ROW_OVERSCAN
+        self._ensure_pool(min(pool_size, total))
+
+        first = int(self._offset // ROW_PITCH)
+        start = max(0, first - ROW_OVERSCAN)
+        end = min(total, first + visible + ROW_OVERSCAN)
+        rows = self._rows
+        wanted = {rows[position] for position in range(start, end)}
+
+        free = []
+        for slot in self._slots:
+            if slot.idx is not None and slot.idx not in wanted:
+                del self._slot_by_idx[slot.idx]
+                slot.idx = None
+                slot.position = None
+            if slot.idx is None:
+                free.append(slot)
+
+        records = self._records
+        for position in range(start, end):
+            idx = rows[position]
+            slot = self._slot_by_idx.get(idx)
+            if slot is None:
+                slot = free.pop()
+                slot.idx = idx
+                slot.stale = True
+                self._slot_by_idx[idx] = slot
+            self._sync_slot(slot, position, records[idx])
+            y = position * ROW_PITCH - self._offset
+            if slot.placed_y != y:
+                slot.frame.place(x=0, y=y, relwidth=1.0)
+                slot.placed_y = y
+
+        for slot in free:
+            if slot.placed_y is not None:
+                slot.frame.place_forget()
+                slot.placed_y = None
+
+        self._restyle = False
+        self._update_scrollbar()
+
+    def _sync_slot(self, slot: _RowSlot, position: int, record) -> None:
+        idx = slot.idx
+        if slot.version != record.version:
+            slot.stale = True
+        if slot.stale or self._restyle or slot.position != position:
+            highlight = self._highlight(idx)
+            bg = MATCH_ROW_COLOR if highlight else (EVEN_ROW_COLOR if position % 2 == 0 else ODD_ROW_COLOR)
+            if bg != slot.bg:
+                slot.frame.configure(fg_color=bg)
+                slot.bg = bg
+            dimmed = bool(self._dimmed(idx))
+            if dimmed != slot.dimmed:
+                color = DIMMED_TEXT_COLOR if dimmed else ROW_TEXT_COLOR
+                for label in slot.labels:
+                    label.configure(text_color=color)
+                slot.dimmed = dimmed
+        slot.position = position
+        self._apply_selection(slot, self._is_selected(idx))
+
+        if not slot.stale:
+            return
+        slot.stale = False
+        slot.version = record.version
+        values = [idx] + [record.get(key) for key, _, _ in self._columns[1:]]
+        for column, value in enumerate(values):
+            text = "" if value is None else str(value)
+            if slot.texts[column] != text:
+                slot.labels[column].configure(text=text)
+                slot.texts[column] = text
+
+    def _apply_selection(self, slot: _RowSlot, selected: bool) -> None:
+        if slot.var.get() != selected:
+            slot.var.set(selected)
+        if slot.selected != selected:
+            slot.frame.configure(border_width=2 if selected else 0)
+            slot.selected = selected
+
+    def _on_slot_toggled(self, slot: _RowSlot) -> None:
+        if slot.idx is None:
+            return
+        selected = bool(slot.var.get())
+        self._apply_selection(slot, selected)
+        self._on_toggle(slot.idx, selected)
+
+    def _update_scrollbar(self) -> None:
+        content = self._content_height()
+        if content <= 0 or content <= self._viewport_height:
+            self._scrollbar.set(0.0, 1.0)
+            return
+        self._scrollbar.set(self._offset / content, (self._offset + self._viewport_height) / content)
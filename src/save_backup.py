@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存檔備份：核心層複製、內容去重、選用壓縮與保留策略。
+
+備份檔命名為 `<存檔>.bak.YYYYMMDD-HHMMSS`（壓縮時加上 `.gz`），與舊版相容；
+各備份的雜湊記錄在同目錄的 `<存檔>.bak.json`，內容與最新備份相同時不再建立新檔。
+預設保留所有備份。設定保留策略時只會刪除本程式建立（記錄在 `.bak.json` 中）的備份，
+舊版或手動建立的同名備份一律保留。
+"""
+from __future__ import annotations
+
+import datetime
+import errno
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+COPY_CHUNK_SIZE = 8 << 20
+HASH_CHUNK_SIZE = 1 << 20
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+# Linux FICLONE ioctl：在 Btrfs/XFS 等支援 reflink 的檔案系統上共用資料區塊
+_FICLONE = 0x40049409
+# 核心內複製只在 Linux 使用：macOS 的 sendfile 只能寫入 socket
+_LINUX = sys.platform.startswith("linux")
+_KERNEL_COPIES = ("copy_file_range", "sendfile") if _LINUX else ()
+
+
+@dataclass
+class BackupPolicy:
+    """保留策略：最近 `keep_last` 份、最近 `keep_daily` 天每天一份、最近 `keep_weekly` 週每週一份。
+
+    任一數值為 None 代表不依該類保留；三者皆為 None（預設）時不刪除任何備份。
+    """
+
+    keep_last: Optional[int] = None
+    keep_daily: Optional[int] = None
+    keep_weekly: Optional[int] = None
+    compress: bool = False
+    compress_level: int = 1
+
+    @property
+    def prunes(self) -> bool:
+        return not (self.keep_last is None and self.keep_daily is None and self.keep_weekly is None)
+
+
+# GUI 提供的保留策略選項
+RETENTION_PRESETS = {
+    "all": BackupPolicy(),
+    "recent": BackupPolicy(keep_last=10),
+    "rotate": BackupPolicy(keep_last=10, keep_daily=7, keep_weekly=4),
+}
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _try_reflink(src_fd: int, dst_fd: int) -> bool:
+    if not _LINUX:
+        return False
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def copy_file(src: str, dst: str) -> str:
+    """在核心內複製檔案，回傳使用的方法（reflink / copy_file_range / sendfile / copy）。"""
+    with open(src, "rb") as rf, open(dst, "wb") as wf:
+        src_fd, dst_fd = rf.fileno(), wf.fileno()
+        size = os.fstat(src_fd).st_size
+        if _try_reflink(src_fd, dst_fd):
+            return "reflink"
+        for name in _KERNEL_COPIES:
+            func = getattr(os, name, None)
+            if func is None:
+                continue
+            offset = 0
+            try:
+                while offset < size:
+                    if name == "copy_file_range":
+                        sent = func(src_fd, dst_fd, size - offset, offset, offset)
+                    else:
+                        sent = func(dst_fd, src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError as exc:
+                # 尚未寫入任何資料，或跨檔案系統／不支援時換下一種方法，從頭重寫
+                if offset and exc.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF):
+                    raise
+                wf.seek(0)
+                wf.truncate()
+                continue
+            if offset == size:
+                return name
+            wf.seek(0)
+            wf.truncate()
+        rf.seek(0)
+        shutil.copyfileobj(rf, wf, COPY_CHUNK_SIZE)
+        return "copy"
+
+
+def _compress_file(src: str, dst: str, level: int) -> None:
+    with open(src, "rb") as rf, gzip.open(dst, "wb", compresslevel=level) as wf:
+        shutil.copyfileobj(rf, wf, COPY_CHUNK_SIZE)
+
+
+class BackupManager:
+    """管理單一存檔的備份。"""
+
+    def __init__(self, save_path: str, policy: Optional[BackupPolicy] = None) -> None:
+        self.save_path = os.path.abspath(save_path)
+        self.policy = policy or BackupPolicy()
+        self.directory = os.path.dirname(self.save_path)
+        self.prefix = os.path.basename(self.save_path) + ".bak."
+        self.manifest_path = self.save_path + ".bak.json"
+        self._pattern = re.compile(re.escape(self.prefix) + r"(\d{8}-\d{6})(?:-(\d+))?(\.gz)?$")
+
+    def list_backups(self) -> List[Tuple[datetime.datetime, str]]:
+        """回傳 [(時間, 路徑), ...]，由新到舊。"""
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in names:
+            match = self._pattern.match(name)
+            if not match:
+                continue
+            try:
+                stamp = datetime.datetime.strptime(match.group(1), TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            found.append((stamp, int(match.group(2) or 0), os.path.join(self.directory, name)))
+        found.sort(reverse=True)
+        return [(stamp, path) for stamp, _, path in found]
+
+    def _load_manifest(self) -> Tuple[Dict[str, str], Set[str]]:
+        """回傳 (備份名稱 → 雜湊, 本程式建立的備份名稱)。
+
+        舊格式的記錄檔只有雜湊，其中的備份無法確定來源，視為不是本程式建立的。
+        """
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return {}, set()
+        if not isinstance(manifest, dict):
+            return {}, set()
+        if not isinstance(manifest.get("digests"), dict):
+            return {name: digest for name, digest in manifest.items() if isinstance(digest, str)}, set()
+        managed = manifest.get("managed")
+        return dict(manifest["digests"]), set(managed) if isinstance(managed, list) else set()
+
+    def _store_manifest(self, digests: Dict[str, str], managed: Set[str]) -> None:
+        # 不再存在的備份從記錄中移除
+        existing = {name for name in digests if os.path.exists(os.path.join(self.directory, name))}
+        manifest = {
+            "digests": {name: digest for name, digest in digests.items() if name in existing},
+            "managed": sorted(managed & existing),
+        }
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def _latest_digest(self, backups, digests) -> Optional[str]:
+        if not backups:
+            return None
+        path = backups[0][1]
+        name = os.path.basename(path)
+        digest = digests.get(name)
+        if digest is None and not path.endswith(".gz"):
+            # 舊版或手動放入的備份沒有記錄，補算一次
+            digest = file_digest(path)
+            digests[name] = digest
+        return digest
+
+    def _new_path(self) -> str:
+        stamp = time.strftime(TIMESTAMP_FORMAT)
+        suffix = ".gz" if self.policy.compress else ""
+        path = os.path.join(self.directory, f"{self.prefix}{stamp}{suffix}")
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.prefix}{stamp}-{counter}{suffix}")
+            counter += 1
+        return path
+
+    def backup(self) -> Optional[str]:
+        """建立備份並套用保留策略；內容與最新備份相同時回傳 None。"""
+        if not os.path.exists(self.save_path):
+            return None
+        digests, managed = self._load_manifest()
+        backups = self.list_backups()
+        digest = file_digest(self.save_path)
+        if digest == self._latest_digest(backups, digests):
+            self._store_manifest(digests, managed)
+            return None
+        path = self._new_path()
+        try:
+            if self.policy.compress:
+                _compress_file(self.save_path, path, self.policy.compress_level)
+            else:
+                copy_file(self.save_path, path)
+        except BaseException:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            raise
+        name = os.path.basename(path)
+        digests[name] = digest
+        managed.add(name)
+        self._prune(managed)
+        self._store_manifest(digests, managed)
+        return path
+
+    def select_keep(self, backups: List[Tuple[datetime.datetime, str]]) -> set:
+        """依保留策略挑出要保留的備份路徑。"""
+        policy = self.policy
+        if not policy.prunes:
+            return {path for _, path in backups}
+        keep = {path for _, path in backups[: policy.keep_last or 0]}
+        for limit, bucket in ((policy.keep_daily, lambda t: t.date()), (policy.keep_weekly, lambda t: t.isocalendar()[:2])):
+            if not limit:
+                continue
+            seen = set()
+            for stamp, path in backups:
+                key = bucket(stamp)
+                if key in seen:
+                    continue
+                seen.add(key)
+                keep.add(path)
+                if len(seen) >= limit:
+                    break
+        return keep
+
+    def prune(self) -> List[str]:
+        """刪除保留策略以外、由本程式建立的備份，回傳被刪除的路徑；其他備份一律保留。"""
+        digests, managed = self._load_manifest()
+        removed = self._prune(managed)
+        if removed:
+            self._store_manifest(digests, managed)
+        return removed
+
+    def _prune(self, managed: Set[str]) -> List[str]:
+        if not self.policy.prunes:
+            return []
+        backups = [(stamp, path) for stamp, path in self.list_backups() if os.path.basename(path) in managed]
+        keep = self.select_keep(backups)
+        removed = []
+        for _, path in backups:
+            if path in keep:
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed.append(path)
+            managed.discard(os.path.basename(path))
+        return removed
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""多存檔批次處理：對一批存檔平行執行「載入 → 修改 → 儲存」，逐檔回報結果並輸出 JSON 報告。
+
+每個存檔由行程池中的一個工作行程處理（GIL 不會限制 JSON 解析），
+工作數預設為可用的 CPU 核心數；只有一個檔案或一個工作時直接在本行程執行。
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bulk_edit import BulkEdit, apply_bulk_edit, parse_bulk_edit
+from save_backup import BackupPolicy
+from save_model import SaveModel
+
+DEFAULT_PATTERN = "*.dat"
+
+FieldList = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class EditSpec:
+    """一次修改的內容（可序列化傳給工作行程）；語意與 GUI 的批次套用相同。"""
+
+    where: str = ""
+    include_dead: bool = False
+    set_fields: FieldList = ()
+    add_fields: FieldList = ()
+    # 運算式欄位（=10、*1.5、+10%、max、@123 等，見 bulk_edit），在 set / add 之後套用
+    ops: FieldList = ()
+    lower: Optional[int] = 0
+    upper: Optional[int] = None
+    wealth: Optional[int] = None
+    reputation: Optional[int] = None
+    make_backup: bool = True
+    # 預設保留所有備份；設定時只刪除本程式建立的舊備份（見 save_backup）
+    backup_policy: BackupPolicy = field(default_factory=BackupPolicy)
+    dry_run: bool = False
+
+
+@dataclass
+class FileResult:
+    path: str
+    ok: bool = False
+    npcs: int = 0
+    matched: int = 0
+    changed: int = 0
+    bytes_written: int = 0
+    skipped: bool = False
+    backup: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    spec: EditSpec
+    workers: int
+    results: List[FileResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failures(self) -> List[FileResult]:
+        return [result for result in self.results if not result.ok]
+
+    def to_dict(self) -> dict:
+        return {
+            "spec": asdict(self.spec),
+            "workers": self.workers,
+            "files": len(self.results),
+            "failed": len(self.failures),
+            "seconds": round(self.seconds, 3),
+            "results": [asdict(result) for result in self.results],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False, indent=2)
+
+
+def bulk_edit_for(spec: EditSpec) -> BulkEdit:
+    """把 `spec` 的欄位修改解析為一個 BulkEdit；輸入無效時拋出 BulkEditError。"""
+    edit = parse_bulk_edit(spec.ops, lower=spec.lower, upper=spec.upper)
+    set_ops = parse_bulk_edit(spec.set_fields, "set").ops
+    add_ops = parse_bulk_edit(spec.add_fields, "add").ops
+    return BulkEdit(set_ops + add_ops + edit.ops, edit.lower, edit.upper)
+
+
+def apply_edits(model: SaveModel, spec: EditSpec) -> Tuple[List[int], int]:
+    """把 `spec` 套用到已載入的 `model`，回傳 (符合的 NPC 索引, 實際修改的欄位數)。"""
+    edit = bulk_edit_for(spec)
+    indices = model.select_where(spec.where, include_dead=spec.include_dead)
+    changed = apply_bulk_edit(model, indices, edit).cells
+    revision = model.revision
+    if spec.wealth is not None:
+        model.set_gold(spec.wealth)
+    if spec.reputation is not None:
+        model.set_rep(spec.reputation)
+    return indices, changed + model.revision - revision
+
+
+def process_file(path: str, spec: EditSpec) -> FileResult:
+    """處理單一存檔；任何錯誤都記錄在結果中而不拋出，以免中斷整批。"""
+    started = time.perf_counter()
+    result = FileResult(path)
+    model = SaveModel(lazy=True)
+    model.backup_policy = spec.backup_policy
+    try:
+        model.load(path)
+        indices, changed = apply_edits(model, spec)
+        result.npcs = len(model.npcs)
+        result.matched = len(indices)
+        result.changed = changed
+        if not spec.dry_run:
+            model.save(make_backup=spec.make_backup)
+            stats = model.last_write
+            if stats is not None:
+                result.bytes_written = stats.bytes_written
+                result.skipped = stats.skipped
+            result.backup = model.last_backup
+        result.ok = True
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        model.close()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def discover_saves(targets: Iterable[str], pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """展開目錄（遞迴尋找符合 `pattern` 的檔案）與萬用字元，回傳不重複的存檔路徑。"""
+    found: List[str] = []
+    seen = set()
+    for target in targets:
+        if os.path.isdir(target):
+            matches = glob.glob(os.path.join(glob.escape(target), "**", pattern), recursive=True)
+        elif glob.has_magic(target):
+            matches = glob.glob(target, recursive=True)
+        else:
+            matches = [target]
+        for path in sorted(matches):
+            key = os.path.abspath(path)
+            if key in seen or (path != target and not os.path.isfile(path)):
+                continue
+            seen.add(key)
+            found.append(path)
+    return found
+
+
+def default_workers(files: int) -> int:
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    return max(1, min(cores, files))
+
+
+def iter_batch(paths: Sequence[str], spec: EditSpec, workers: Optional[int] = None) -> Iterator[FileResult]:
+    """依完成順序產生每個存檔的結果。"""
+    workers = workers or default_workers(len(paths))
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield process_file(path, spec)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_file, path, spec): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:  # 工作行程異常結束
+                yield FileResult(futures[future], error=f"{type(exc).__name__}: {exc}")
+
+
+def run_batch(
+    paths: Sequence[str],
+    spec: EditSpec,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+) -> BatchReport:
+    workers = workers or default_workers(len(paths))
+    report = BatchReport(spec, workers)
+    started = time.perf_counter()
+    for result in iter_batch(paths, spec, workers):
+        report.results.append(result)
+        if on_result is not None:
+            on_result(result)
+    report.seconds = time.perf_counter() - started
+    return report
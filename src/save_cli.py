@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""命令列（無介面）模式：以 SaveModel 批次修改存檔，不會載入任何 Tk 相關模組。
+
+範例：
+    python -m blackthorn_arena_reforged_save_editor edit sav.dat --where "team==0 and level<10" \\
+        --add level=2 --set skillPoint=5 --wealth 5000
+    python -m blackthorn_arena_reforged_save_editor edit sav.dat --op "BSstrength=*1.2" --op level=max --max 60
+    python -m blackthorn_arena_reforged_save_editor batch saves/ "backup/*.dat" --add level=1 --report report.json
+    python -m blackthorn_arena_reforged_save_editor diff sav.dat            # 與最新的 .bak.* 備份比較
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Optional, Sequence, Tuple
+
+import json_backend
+from bulk_edit import BulkEditError
+from perf_trace import tracer
+from roster_query import QueryError, parse_query
+from save_backup import BackupPolicy
+from save_batch import DEFAULT_PATTERN, EditSpec, FileResult, apply_edits, bulk_edit_for, discover_saves, run_batch
+from save_diff import diff_files, latest_backup
+from save_model import SaveModel
+
+COMMANDS = ("edit", "batch", "diff")
+
+
+def _field_assignment(text: str) -> Tuple[str, str]:
+    key, sep, value = text.partition("=")
+    key = key.strip()
+    if not sep or not key or not value.strip():
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, got {text!r}")
+    return key, value.strip()
+
+
+def _positive_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="blackthorn_arena_reforged_save_editor",
+        description="Blackthorn Arena: Reforged save editor (headless mode).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    edit = commands.add_parser("edit", help="edit NPC fields and global values")
+    edit.add_argument("save", help="save file (sav.dat)")
+    _add_edit_arguments(edit)
+    edit.add_argument("-o", "--output", help="write to this file instead of overwriting the save")
+    edit.add_argument("--trace", metavar="PATH", help="write step timings as a Chrome trace (Perfetto) JSON file")
+
+    batch = commands.add_parser("batch", help="apply the same edit to many saves in parallel")
+    batch.add_argument("targets", nargs="+", help="save files, directories or glob patterns")
+    batch.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"file pattern inside directories (default {DEFAULT_PATTERN})")
+    batch.add_argument("-j", "--workers", type=int, help="worker processes (default: available cores)")
+    batch.add_argument("--report", help="write a JSON report to this file")
+    _add_edit_arguments(batch)
+
+    diff = commands.add_parser("diff", help="show NPC and global field changes between two saves")
+    diff.add_argument("old", help="older save or backup; with no NEW, the save compared against its latest backup")
+    diff.add_argument("new", nargs="?", help="newer save")
+    diff.add_argument("--json", dest="json_path", metavar="PATH", help="write the full diff as JSON")
+    diff.add_argument("--limit", type=int, default=100, help="list at most this many NPCs (0: all, default 100)")
+    return parser
+
+
+def _add_edit_arguments(edit: argparse.ArgumentParser) -> None:
+    edit.add_argument("--where", default="", help='NPC filter, e.g. "team==0 and level<10"; default: all live NPCs')
+    edit.add_argument("--include-dead", action="store_true", help="also match dead NPCs")
+    edit.add_argument("--set", dest="set_fields", action="append", default=[], type=_field_assignment,
+                      metavar="FIELD=VALUE", help="set a field on every matched NPC")
+    edit.add_argument("--add", dest="add_fields", action="append", default=[], type=_field_assignment,
+                      metavar="FIELD=DELTA", help="add to a field on every matched NPC; applied after --set")
+    edit.add_argument("--op", dest="op_fields", action="append", default=[], type=_field_assignment,
+                      metavar="FIELD=EXPR", help="apply an expression: =10, *1.5, +10%%, max, min or @INDEX; applied last")
+    edit.add_argument("--min", dest="lower", type=int, default=0, help="clamp results to at least this value (default 0)")
+    edit.add_argument("--max", dest="upper", type=int, help="clamp results to at most this value")
+    edit.add_argument("--wealth", type=int, help="set wealth")
+    edit.add_argument("--reputation", type=int, help="set reputation")
+    edit.add_argument("--no-backup", action="store_true", help="do not back up the original save")
+    edit.add_argument("--keep-last", type=_positive_int, metavar="N",
+                      help="prune backups made by this tool, keeping the newest N (default: keep all backups)")
+    edit.add_argument("--keep-daily", type=_positive_int, metavar="DAYS", help="when pruning, also keep one backup per day for DAYS days")
+    edit.add_argument("--keep-weekly", type=_positive_int, metavar="WEEKS",
+                      help="when pruning, also keep one backup per week for WEEKS weeks")
+    edit.add_argument("--compress-backup", action="store_true", help="gzip new backups")
+    edit.add_argument("-n", "--dry-run", action="store_true", help="report what would change without writing")
+
+
+def edit_spec(args: argparse.Namespace) -> EditSpec:
+    return EditSpec(
+        where=args.where,
+        include_dead=args.include_dead,
+        set_fields=tuple(args.set_fields),
+        add_fields=tuple(args.add_fields),
+        ops=tuple(args.op_fields),
+        lower=args.lower,
+        upper=args.upper,
+        wealth=args.wealth,
+        reputation=args.reputation,
+        make_backup=not args.no_backup,
+        backup_policy=backup_policy(args),
+        dry_run=args.dry_run,
+    )
+
+
+def backup_policy(args: argparse.Namespace) -> BackupPolicy:
+    return BackupPolicy(
+        keep_last=args.keep_last,
+        keep_daily=args.keep_daily,
+        keep_weekly=args.keep_weekly,
+        compress=args.compress_backup,
+    )
+
+
+def run_edit(args: argparse.Namespace, out=sys.stdout) -> int:
+    started = time.perf_counter()
+    model = SaveModel(lazy=True)
+    model.backup_policy = backup_policy(args)
+    try:
+        model.load(args.save)
+    except (OSError, ValueError) as exc:
+        print(f"error: cannot load {args.save}: {exc}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
+    try:
+        indices, edits = apply_edits(model, edit_spec(args))
+    except QueryError as exc:
+        print(f"error: invalid --where: {exc}", file=sys.stderr)
+        model.close()
+        return 2
+    except BulkEditError as exc:
+        print(f"error: invalid edit: {exc}", file=sys.stderr)
+        model.close()
+        return 2
+
+    print(f"{args.save}: {len(model.npcs)} NPCs, {len(indices)} matched, {edits} field(s) changed", file=out)
+    print(f"wealth={model.get_gold()} reputation={model.get_rep()}", file=out)
+    if args.dry_run:
+        print("dry run: nothing written", file=out)
+        model.close()
+        return 0
+    try:
+        target = model.save(out_path=args.output, make_backup=not args.no_backup)
+    except OSError as exc:
+        print(f"error: cannot save: {exc}", file=sys.stderr)
+        model.close()
+        return 1
+    stats = model.last_write
+    if stats is not None and stats.skipped:
+        print(f"unchanged: {target} not rewritten", file=out)
+    elif stats is not None:
+        print(f"saved {target} ({stats.megabytes:.1f} MB in {stats.seconds:.2f} s)", file=out)
+    if model.last_backup:
+        print(f"backup: {model.last_backup}", file=out)
+    model.close()
+    print(
+        f"done in {time.perf_counter() - started:.2f} s (load {loaded - started:.2f} s, json: {json_backend.describe()})",
+        file=out,
+    )
+    return 0
+
+
+def _print_result(result: FileResult, out) -> None:
+    if not result.ok:
+        print(f"FAIL {result.path}: {result.error}", file=out, flush=True)
+        return
+    state = "unchanged" if result.skipped else f"{result.bytes_written / (1 << 20):.1f} MB"
+    print(
+        f"ok   {result.path}: {result.matched}/{result.npcs} matched, {result.changed} changed, "
+        f"{state}, {result.seconds:.2f} s",
+        file=out,
+        flush=True,
+    )
+
+
+def run_batch_command(args: argparse.Namespace, out=sys.stdout) -> int:
+    spec = edit_spec(args)
+    try:
+        # 先在主行程檢查語法，避免每個工作行程各自失敗
+        parse_query(spec.where)
+        bulk_edit_for(spec)
+    except QueryError as exc:
+        print(f"error: invalid --where: {exc}", file=sys.stderr)
+        return 2
+    except BulkEditError as exc:
+        print(f"error: invalid edit: {exc}", file=sys.stderr)
+        return 2
+    paths = discover_saves(args.targets, args.pattern)
+    if not paths:
+        print("error: no save files found", file=sys.stderr)
+        return 1
+    report = run_batch(paths, spec, workers=args.workers, on_result=lambda result: _print_result(result, out))
+    failed = len(report.failures)
+    print(
+        f"{len(paths)} file(s), {failed} failed, {report.workers} worker(s), {report.seconds:.2f} s, "
+        f"json: {json_backend.describe()}",
+        file=out,
+    )
+    if args.report:
+        report.write(args.report)
+        print(f"report: {args.report}", file=out)
+    return 1 if failed else 0
+
+
+def run_diff(args: argparse.Namespace, out=sys.stdout) -> int:
+    """比較兩份存檔；與 diff(1) 相同，沒有差異回傳 0，有差異回傳 1。"""
+    old, new = args.old, args.new
+    if new is None:
+        new, old = old, latest_backup(old)
+        if old is None:
+            print(f"error: no backups found for {new}", file=sys.stderr)
+            return 2
+    try:
+        result = diff_files(old, new)
+    except (OSError, ValueError) as exc:
+        print(f"error: cannot compare: {exc}", file=sys.stderr)
+        return 2
+    print(f"--- {old}\n+++ {new}", file=out)
+    for line in result.iter_lines(limit=args.limit or None):
+        print(line, file=out)
+    if args.json_path:
+        result.write(args.json_path)
+        print(f"report: {args.json_path}", file=out)
+    return 0 if result.identical else 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "edit":
+        if not args.trace:
+            return run_edit(args)
+        tracer.enable()
+        try:
+            return run_edit(args)
+        finally:
+            events = tracer.export(args.trace)
+            print(f"trace: {args.trace} ({events} spans)")
+    if args.command == "batch":
+        return run_batch_command(args)
+    if args.command == "diff":
+        return run_diff(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
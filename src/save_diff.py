@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存檔差異比對：找出兩份存檔之間新增、移除或修改的 NPC 與頂層欄位。
+
+先以雜湊比對每個 NPC（以 `id`／`unitId` 配對）與每個頂層欄位的位元組內容，
+內容相同者一次略過；只有雜湊不同的紀錄才解碼並逐欄比較。
+未修改的 NPC 直接雜湊載入時的原始位元組區段，不需要解碼。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from save_backup import BackupManager
+from save_model import SaveModel
+
+DIGEST_SIZE = 16
+# 欄位比較遞迴進入巢狀物件的最大深度；更深的差異以整個值呈現
+MAX_DEPTH = 4
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+# 欄位只存在於其中一份存檔
+MISSING = _Missing()
+
+
+@dataclass
+class FieldChange:
+    path: str
+    old: object = MISSING
+    new: object = MISSING
+
+    @property
+    def kind(self) -> str:
+        if self.old is MISSING:
+            return "added"
+        if self.new is MISSING:
+            return "removed"
+        return "changed"
+
+    def to_dict(self) -> dict:
+        item = {"path": self.path, "kind": self.kind}
+        if self.old is not MISSING:
+            item["old"] = self.old
+        if self.new is not MISSING:
+            item["new"] = self.new
+        return item
+
+    def describe(self) -> str:
+        if self.old is MISSING:
+            return f"{self.path}: + {_short(self.new)}"
+        if self.new is MISSING:
+            return f"{self.path}: - {_short(self.old)}"
+        return f"{self.path}: {_short(self.old)} -> {_short(self.new)}"
+
+
+@dataclass
+class NpcDiff:
+    key: str
+    name: str
+    kind: str
+    old_index: Optional[int] = None
+    new_index: Optional[int] = None
+    changes: List[FieldChange] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "kind": self.kind,
+            "old_index": self.old_index,
+            "new_index": self.new_index,
+            "changes": [change.to_dict() for change in self.changes],
+        }
+
+
+@dataclass
+class SaveDiff:
+    old_path: Optional[str]
+    new_path: Optional[str]
+    fields: List[FieldChange] = field(default_factory=list)
+    npcs: List[NpcDiff] = field(default_factory=list)
+    compared: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def identical(self) -> bool:
+        return not self.fields and not self.npcs
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"changed": 0, "added": 0, "removed": 0}
+        for npc in self.npcs:
+            counts[npc.kind] += 1
+        return counts
+
+    def summary(self) -> str:
+        counts = self.counts()
+        return (
+            f"{self.compared} NPCs compared, {self.unchanged} unchanged, {counts['changed']} changed, "
+            f"{counts['added']} added, {counts['removed']} removed, {len(self.fields)} global field(s) changed "
+            f"({self.seconds:.2f} s)"
+        )
+
+    def iter_lines(self, limit: Optional[int] = None) -> Iterator[str]:
+        """逐行的文字報告；`limit` 限制列出的 NPC 數。"""
+        for change in self.fields:
+            yield f"global {change.describe()}"
+        for count, npc in enumerate(self.npcs):
+            if limit is not None and count >= limit:
+                yield f"... {len(self.npcs) - limit} more NPC(s)"
+                break
+            yield f"{npc.kind:<7} {npc.key} {npc.name}".rstrip()
+            for change in npc.changes:
+                yield f"    {change.describe()}"
+        yield self.summary()
+
+    def to_dict(self) -> dict:
+        return {
+            "old": self.old_path,
+            "new": self.new_path,
+            "compared": self.compared,
+            "unchanged": self.unchanged,
+            "seconds": round(self.seconds, 3),
+            "counts": self.counts(),
+            "fields": [change.to_dict() for change in self.fields],
+            "npcs": [npc.to_dict() for npc in self.npcs],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False, indent=2, default=repr)
+
+
+def _short(value, width: int = 60) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=repr)
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def npc_key(npc) -> Optional[str]:
+    """配對用的 NPC 鍵：優先使用 `id`，其次 `unitId`；兩者皆無時回傳 None。"""
+    if not hasattr(npc, "get"):
+        return None
+    value = npc.get("id")
+    if value is not None:
+        return f"id:{value}"
+    value = npc.get("unitId")
+    if value is not None:
+        return f"unitId:{value}"
+    return None
+
+
+def _keyed_digests(model: SaveModel) -> Dict[str, Tuple[int, bytes]]:
+    """鍵 → (NPC 索引, 內容雜湊)；重複的鍵依出現順序加上編號，沒有鍵的 NPC 以索引為鍵。"""
+    result: Dict[str, Tuple[int, bytes]] = {}
+    seen: Dict[str, int] = {}
+    for idx, npc in enumerate(model.npcs):
+        key = npc_key(npc)
+        if key is None:
+            key = f"#{idx}"
+        else:
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+            if occurrence:
+                key = f"{key}#{occurrence}"
+        result[key] = (idx, _digest(model.npc_bytes(idx)))
+    return result
+
+
+def _plain(value):
+    load = getattr(value, "load", None)
+    return load() if callable(load) else value
+
+
+def _same(a, b) -> bool:
+    # JSON 中 1、1.0 與 true 不同，型別也要一致
+    return type(a) is type(b) and a == b
+
+
+def diff_values(old, new, path: str = "", depth: int = 0, out: Optional[List[FieldChange]] = None) -> List[FieldChange]:
+    """逐欄比較兩個值；兩邊都是物件時遞迴到 MAX_DEPTH 層，其餘以整個值比較。"""
+    if out is None:
+        out = []
+    if isinstance(old, dict) and isinstance(new, dict) and depth < MAX_DEPTH:
+        for key, value in old.items():
+            sub = f"{path}.{key}" if path else str(key)
+            if key not in new:
+                out.append(FieldChange(sub, value, MISSING))
+            else:
+                diff_values(value, new[key], sub, depth + 1, out)
+        for key, value in new.items():
+            if key not in old:
+                out.append(FieldChange(f"{path}.{key}" if path else str(key), MISSING, value))
+    elif not _same(old, new):
+        out.append(FieldChange(path, old, new))
+    return out
+
+
+def diff_models(old: SaveModel, new: SaveModel) -> SaveDiff:
+    """比較兩個已載入的 SaveModel（`old` → `new`）。"""
+    started = time.perf_counter()
+    result = SaveDiff(old.path, new.path)
+
+    old_fields = {key for key in old.data if key != "npcs"}
+    new_fields = {key for key in new.data if key != "npcs"}
+    for key in sorted(old_fields | new_fields, key=str):
+        if key not in new_fields:
+            result.fields.append(FieldChange(key, old.data[key], MISSING))
+        elif key not in old_fields:
+            result.fields.append(FieldChange(key, MISSING, new.data[key]))
+        elif old.field_bytes(key) != new.field_bytes(key):
+            diff_values(old.data[key], new.data[key], key, 1, result.fields)
+
+    old_digests = _keyed_digests(old)
+    new_digests = _keyed_digests(new)
+    result.compared = len(new_digests)
+    for key, (new_idx, digest) in new_digests.items():
+        previous = old_digests.get(key)
+        new_npc = new.npcs[new_idx]
+        if previous is None:
+            result.npcs.append(NpcDiff(key, _name(new_npc), "added", new_index=new_idx))
+            continue
+        old_idx, old_digest = previous
+        if old_digest == digest:
+            result.unchanged += 1
+            continue
+        # 雜湊不同（內容或只是格式不同）才解碼逐欄比較
+        changes = diff_values(_plain(old.npcs[old_idx]), _plain(new_npc))
+        if changes:
+            result.npcs.append(NpcDiff(key, _name(new_npc), "changed", old_idx, new_idx, changes))
+        else:
+            result.unchanged += 1
+    for key, (old_idx, _) in old_digests.items():
+        if key not in new_digests:
+            result.npcs.append(NpcDiff(key, _name(old.npcs[old_idx]), "removed", old_index=old_idx))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _name(npc) -> str:
+    return str(npc.get("unitname") or "") if hasattr(npc, "get") else ""
+
+
+def diff_with_file(model: SaveModel, other_path: str) -> SaveDiff:
+    """以 `other_path`（備份或另一份存檔）為舊版本，與目前的 `model` 比較。"""
+    other = SaveModel(lazy=True)
+    other.load(other_path)
+    try:
+        return diff_models(other, model)
+    finally:
+        other.close()
+
+
+def diff_files(old_path: str, new_path: str) -> SaveDiff:
+    new = SaveModel(lazy=True)
+    new.load(new_path)
+    try:
+        return diff_with_file(new, old_path)
+    finally:
+        new.close()
+
+
+def latest_backup(save_path: str) -> Optional[str]:
+    """`save_path` 最新的 `.bak.*` 備份；沒有備份時回傳 None。"""
+    backups = BackupManager(save_path).list_backups()
+    return backups[0][1] if backups else None
@@ -0,0 +1,1239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""黑荊棘角鬥場：重鑄版 存檔修改器的 CustomTkinter 介面（深色主題，多語系）。"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Tuple
+
+try:
+    import customtkinter as ctk
+except ImportError as exc:  # pragma: no cover - 以便顯示友善訊息
+    print("CustomTkinter is required. Please install it with: pip install customtkinter>=5.2")
+    raise SystemExit(1) from exc
+
+from tkinter import filedialog, messagebox
+
+import json_backend
+from bulk_edit import BulkEditError, apply_bulk_edit, parse_bound, parse_bulk_edit
+from perf_trace import span, tracer
+from roster_query import QueryError, compile_filter
+from roster_view import VirtualRoster
+from save_backup import RETENTION_PRESETS
+from save_model import DEFAULT_FILENAME, NPC_LIVENESS_KEYS, LoadCancelled, SaveModel, SourceChanged, safe_int
+from translations import LOCALE_DIR, Translator
+
+DEFAULT_LANGUAGE = "zh"
+# 主視窗顯示多久（毫秒）後才建立編輯面板並開始自動載入，讓第一次繪製不必等它們
+DEFERRED_BUILD_MS = 30
+# --startup-profile 報告的階段（依發生順序）
+STARTUP_PHASES = (
+    "startup.import_core",
+    "startup.import_gui",
+    "startup.window",
+    "startup.first_paint",
+    "startup.editor_panel",
+)
+# 主執行緒檢查背景載入進度的間隔（毫秒）
+LOAD_POLL_MS = 50
+# 定時把編輯日誌中尚未 fsync 的紀錄寫入磁碟的間隔（毫秒）
+JOURNAL_SYNC_MS = 1000
+# 搜尋框輸入停止多久（毫秒）後才重新篩選
+SEARCH_DEBOUNCE_MS = 150
+# 篩選運算式有語法錯誤時輸入框的邊框顏色
+QUERY_ERROR_COLOR = "#ef4444"
+# 差異視窗最多列出的角色數
+DIFF_WINDOW_LIMIT = 500
+
+# 批次編輯欄位 → 介面標籤的翻譯鍵（用於錯誤訊息）
+BULK_FIELD_LABELS = {
+    "level": "stat_level",
+    "potentialPoint": "stat_potential",
+    "skillPoint": "stat_skill",
+    "livingSkillPoint": "stat_living_skill",
+    "BSstrength": "stat_strength",
+    "BSendurance": "stat_endurance",
+    "BSagility": "stat_agility",
+    "BSprecision": "stat_precision",
+    "BSintelligence": "stat_intelligence",
+    "BSwillpower": "stat_willpower",
+    "range": "clamp_upper",
+}
+
+# 語言切換時依表重設文字的元件：(屬性名稱, 選項, 翻譯鍵)
+MAIN_TEXTS = (
+    ("title_label", "text", "title_label"),
+    ("open_btn", "text", "btn_open"),
+    ("save_btn", "text", "btn_save"),
+    ("about_btn", "text", "btn_about"),
+    ("undo_btn", "text", "btn_undo"),
+    ("redo_btn", "text", "btn_redo"),
+    ("compare_btn", "text", "btn_compare"),
+    ("language_label", "text", "language_menu_label"),
+    ("list_header_label", "text", "list_header"),
+    ("show_player_chk", "text", "show_player_only"),
+    ("underscore_chk", "text", "only_underscore"),
+    ("show_dead_chk", "text", "show_dead"),
+    ("search_entry", "placeholder_text", "search_placeholder"),
+    ("level_entry", "placeholder_text", "min_level_placeholder"),
+    ("apply_filter_btn", "text", "apply_filters"),
+    ("query_entry", "placeholder_text", "query_placeholder"),
+    ("select_matching_btn", "text", "select_matching"),
+    ("cancel_load_btn", "text", "btn_cancel_load"),
+    ("select_label", "text", "column_select"),
+)
+# 延後建立的編輯面板（見 _ensure_editor_panel）
+EDITOR_TEXTS = (
+    ("meta_title", "text", "global_section_title"),
+    ("gold_label", "text", "gold_label"),
+    ("rep_label", "text", "rep_label"),
+    ("update_meta_btn", "text", "update_meta_btn"),
+    ("save_as_btn", "text", "save_as_btn"),
+    ("retention_label", "text", "backup_retention_label"),
+    ("bulk_title", "text", "bulk_section_title"),
+    ("mode_label", "text", "mode_label"),
+    ("apply_btn", "text", "apply_selected_btn"),
+    ("hint_label", "text", "hint_text"),
+)
+
+COLUMN_DEFINITIONS: List[Tuple[str, str, int]] = [
+    ("idx", "col_idx", 70),
+    ("id", "col_id", 90),
+    ("unitId", "col_unit_id", 90),
+    ("team", "col_team", 70),
+    ("unitname", "col_name", 240),
+    ("level", "col_level", 80),
+    ("potentialPoint", "col_potential", 100),
+    ("skillPoint", "col_skill", 100),
+    ("livingSkillPoint", "col_living_skill", 120),
+]
+
+
+class App(ctk.CTk):
+    def __init__(self, debug_timings: bool = False, startup_profile: bool = False) -> None:
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+        super().__init__()
+        # 除錯模式：在狀態列附上最近一次操作的各步驟耗時（需啟用 perf_trace）
+        self.debug_timings = debug_timings
+        # 啟動分析：編輯面板建立後輸出各階段耗時（需啟用 perf_trace）
+        self.startup_profile = startup_profile
+        if startup_profile:
+            tracer.enable()
+
+        # 只讀取語言索引；目錄檔在第一次使用該語言時才載入
+        self.translator = Translator(default=DEFAULT_LANGUAGE)
+        if not self.translator.languages:
+            # 沒有任何目錄檔（例如打包時漏了 locales）：介面只會顯示鍵名，直接說明原因後結束
+            messagebox.showerror(
+                "Save Editor",
+                f"找不到介面翻譯檔（locales/*.json）：\n{LOCALE_DIR}\n\nUI translation catalogs not found:\n{LOCALE_DIR}",
+            )
+            self.destroy()
+            raise SystemExit(1)
+        self.language_display_to_key = {name: code for code, name in self.translator.languages.items()}
+        self.language_key_to_display = {v: k for k, v in self.language_display_to_key.items()}
+        # (元件, 選項) → 最後設定的文字；內容不變時不重新配置元件
+        self._applied_texts: Dict[Tuple[str, str], str] = {}
+
+        self.model = SaveModel(lazy=True)
+        self.show_only_player_var = ctk.BooleanVar(value=True)
+        self.only_underscore_var = ctk.BooleanVar(value=False)
+        self.show_dead_var = ctk.BooleanVar(value=False)
+        self.search_var = ctk.StringVar(value="")
+        self._search_after_id = None
+        self._search_generation = 0
+        self.filter_min_level_var = ctk.StringVar(value="")
+        # 篩選運算式；_query_text 為最後一次通過語法檢查的內容，刷新時只使用它
+        self.query_var = ctk.StringVar(value="")
+        self._query_text = ""
+
+        self.gold_var = ctk.StringVar(value="")
+        self.rep_var = ctk.StringVar(value="")
+
+        self.level_var = ctk.StringVar(value="")
+        self.potential_var = ctk.StringVar(value="")
+        self.skill_var = ctk.StringVar(value="")
+        self.living_skill_var = ctk.StringVar(value="")
+        self.strength_var = ctk.StringVar(value="")
+        self.endurance_var = ctk.StringVar(value="")
+        self.agility_var = ctk.StringVar(value="")
+        self.precision_var = ctk.StringVar(value="")
+        self.intelligence_var = ctk.StringVar(value="")
+        self.willpower_var = ctk.StringVar(value="")
+
+        self.bulk_mode_var = ctk.StringVar(value="add")
+        # 儲存時的備份保留策略（RETENTION_PRESETS 的鍵）；預設保留所有備份
+        self.backup_retention_var = ctk.StringVar(value="all")
+        # 批次結果的範圍限制；下限預設 0（與原本「結果最低為 0」相同），空白代表不限制
+        self.clamp_lower_var = ctk.StringVar(value="0")
+        self.clamp_upper_var = ctk.StringVar(value="")
+
+        # [(欄位, 是否遞減), ...]；Shift+點擊欄位標題可加入次要排序
+        self.sort_keys: List[Tuple[str, bool]] = []
+
+        self.selected_indices: set[int] = set()
+        self.current_rows: List[int] = []
+
+        self.status_var = ctk.StringVar(value="")
+
+        self._load_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._load_cancel: threading.Event | None = None
+        self._load_token = 0
+        self._load_poll_id = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        # 編輯面板在主視窗顯示後才建立（見 _finish_startup）
+        self._editor_built = False
+        with span("startup.title_bar"):
+            self._build_title_bar()
+        with span("startup.list_panel"):
+            self._build_main_area()
+        with span("startup.status_bar"):
+            self._build_status_bar()
+
+        self.search_var.trace_add("write", self._on_search_changed)
+        self.query_var.trace_add("write", self._on_query_changed)
+
+        self.bind("<Control-o>", lambda event: self.on_open())
+        self.bind("<Control-s>", lambda event: self.on_save())
+        self.bind("<Control-z>", lambda event: self.on_undo())
+        self.bind("<Control-y>", lambda event: self.on_redo())
+        self.bind("<Control-Shift-Z>", lambda event: self.on_redo())
+
+        with span("startup.translations"):
+            self._apply_translations()
+        self.set_status(self.tr("status_ready_backend", backend=json_backend.describe()))
+
+        # 視窗先顯示，之後才建立編輯面板；存檔在背景執行緒解析完成後才填入清單
+        self._constructed_ns = time.perf_counter_ns()
+        self.after(DEFERRED_BUILD_MS, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        tracer.record("startup.first_paint", self._constructed_ns, time.perf_counter_ns())
+        self._ensure_editor_panel()
+        if self.startup_profile:
+            self._report_startup()
+        self.after(JOURNAL_SYNC_MS, self._sync_journal)
+        if os.path.exists(DEFAULT_FILENAME) and not self.model.data and self._load_cancel is None:
+            self.load_path(DEFAULT_FILENAME, auto=True)
+
+    def _ensure_editor_panel(self) -> None:
+        if self._editor_built:
+            return
+        with span("startup.editor_panel"):
+            self._build_editor_panel()
+            self._editor_built = True
+            self._translate_editor_panel()
+
+    def _sync_journal(self) -> None:
+        # 日誌每筆紀錄都已交給作業系統，這裡只補上批次的 fsync
+        self.model.sync_journal()
+        self.after(JOURNAL_SYNC_MS, self._sync_journal)
+
+    def _report_startup(self) -> None:
+        """把各啟動階段的耗時輸出到標準輸出與狀態列。"""
+        events = [(name, tracer.latest(name)) for name in STARTUP_PHASES]
+        events = [(name, event) for name, event in events if event is not None]
+        total = sum(event.milliseconds for _, event in events)
+        print(f"startup: {total:.1f} ms until the editor is ready")
+        for name, _ in events:
+            print(f"  {tracer.summary(name)}")
+        parts = ", ".join(f"{name.rsplit('.', 1)[-1]} {event.milliseconds:.0f}" for name, event in events)
+        self.status_var.set(f"startup {total:.0f} ms ({parts})")
+
+    def tr(self, key: str, **kwargs) -> str:
+        return self.translator.translate(key, **kwargs)
+
+    def _build_title_bar(self) -> None:
+        bar = ctk.CTkFrame(self, corner_radius=0, fg_color="#161b2a")
+        bar.grid(row=0, column=0, sticky="ew")
+        bar.columnconfigure(0, weight=1)
+        bar.columnconfigure(1, weight=0)
+
+        self.title_label = ctk.CTkLabel(
+            bar,
+            text="",
+            font=ctk.CTkFont(size=22, weight="bold"),
+            text_color="#f4f6ff",
+        )
+        self.title_label.grid(row=0, column=0, padx=20, pady=14, sticky="w")
+
+        btn_frame = ctk.CTkFrame(bar, fg_color="transparent")
+        btn_frame.grid(row=0, column=1, padx=16, pady=10, sticky="e")
+
+        self.open_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_open,
+            corner_radius=20,
+            fg_color="#5a67d8",
+            hover_color="#4854bd",
+            width=120,
+        )
+        self.save_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_save,
+            corner_radius=20,
+            fg_color="#3b82f6",
+            hover_color="#2563eb",
+            width=120,
+        )
+        self.undo_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_undo,
+            corner_radius=20,
+            fg_color="#374151",
+            hover_color="#4b5563",
+            width=80,
+            state="disabled",
+        )
+        self.redo_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_redo,
+            corner_radius=20,
+            fg_color="#374151",
+            hover_color="#4b5563",
+            width=80,
+            state="disabled",
+        )
+        self.compare_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_compare,
+            corner_radius=20,
+            fg_color="#374151",
+            hover_color="#4b5563",
+            width=100,
+        )
+        self.about_btn = ctk.CTkButton(
+            btn_frame,
+            text="",
+            command=self.on_about,
+            corner_radius=20,
+            fg_color="#374151",
+            hover_color="#4b5563",
+            width=80,
+        )
+        self.language_label = ctk.CTkLabel(
+            btn_frame,
+            text="",
+            text_color="#cbd5ff",
+        )
+        language_values = list(self.language_display_to_key.keys())
+        self.language_menu = ctk.CTkOptionMenu(
+            btn_frame,
+            values=language_values,
+            command=self._on_language_change,
+            width=130,
+        )
+        self.language_menu.set(self.language_key_to_display.get(self.translator.current, self.translator.current))
+
+        self.open_btn.grid(row=0, column=0, padx=(0, 8))
+        self.save_btn.grid(row=0, column=1, padx=(0, 8))
+        self.undo_btn.grid(row=0, column=2, padx=(0, 8))
+        self.redo_btn.grid(row=0, column=3, padx=(0, 8))
+        self.compare_btn.grid(row=0, column=4, padx=(0, 8))
+        self.about_btn.grid(row=0, column=5, padx=(0, 12))
+        self.language_label.grid(row=0, column=6, padx=(0, 6))
+        self.language_menu.grid(row=0, column=7)
+
+    def _build_main_area(self) -> None:
+        main = ctk.CTkFrame(self, fg_color="transparent")
+        main.grid(row=1, column=0, padx=18, pady=16, sticky="nsew")
+        main.columnconfigure(0, weight=2)
+        main.columnconfigure(1, weight=3)
+        main.rowconfigure(0, weight=1)
+
+        self._build_list_panel(main)
+        # 先放好編輯面板的外框，讓版面在內容建立前就固定
+        self.editor_panel = ctk.CTkFrame(
+            main,
+            corner_radius=18,
+            fg_color="#1b1f2d",
+            border_width=1,
+            border_color="#262d3f",
+        )
+        self.editor_panel.grid(row=0, column=1, sticky="nsew")
+        self.editor_panel.columnconfigure(0, weight=1)
+
+    def _build_list_panel(self, parent: ctk.CTkFrame) -> None:
+        panel = ctk.CTkFrame(
+            parent,
+            corner_radius=18,
+            fg_color="#1b1f2d",
+            border_width=1,
+            border_color="#262d3f",
+        )
+        panel.grid(row=0, column=0, sticky="nsew", padx=(0, 12))
+        panel.columnconfigure(0, weight=1)
+        panel.rowconfigure(3, weight=1)
+
+        self.list_header_label = ctk.CTkLabel(
+            panel,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#e0e6ff",
+        )
+        self.list_header_label.grid(row=0, column=0, padx=18, pady=(18, 6), sticky="w")
+
+        filter_frame = ctk.CTkFrame(panel, fg_color="transparent")
+        filter_frame.grid(row=1, column=0, padx=18, pady=6, sticky="ew")
+        filter_frame.columnconfigure(6, weight=1)
+
+        self.show_player_chk = ctk.CTkCheckBox(
+            filter_frame,
+            text="",
+            variable=self.show_only_player_var,
+            command=self.refresh_table,
+        )
+        self.underscore_chk = ctk.CTkCheckBox(
+            filter_frame,
+            text="",
+            variable=self.only_underscore_var,
+            command=self.refresh_table,
+        )
+        self.show_dead_chk = ctk.CTkCheckBox(
+            filter_frame,
+            text="",
+            variable=self.show_dead_var,
+            command=self.refresh_table,
+        )
+        self.search_entry = ctk.CTkEntry(
+            filter_frame,
+            textvariable=self.search_var,
+            width=160,
+        )
+        self.level_entry = ctk.CTkEntry(
+            filter_frame,
+            textvariable=self.filter_min_level_var,
+            width=100,
+        )
+        self.apply_filter_btn = ctk.CTkButton(
+            filter_frame,
+            text="",
+            command=self.refresh_table,
+            width=120,
+        )
+        self.show_player_chk.grid(row=0, column=0, padx=(0, 12), pady=4, sticky="w")
+        self.underscore_chk.grid(row=0, column=1, padx=(0, 12), pady=4, sticky="w")
+        self.show_dead_chk.grid(row=0, column=2, padx=(0, 12), pady=4, sticky="w")
+        self.search_entry.grid(row=0, column=3, padx=(0, 10), pady=4, sticky="w")
+        self.level_entry.grid(row=0, column=4, padx=(0, 12), pady=4, sticky="w")
+        self.apply_filter_btn.grid(row=0, column=5, padx=(0, 12), pady=4, sticky="e")
+
+        self.query_entry = ctk.CTkEntry(filter_frame, textvariable=self.query_var)
+        self.query_default_border = self.query_entry.cget("border_color")
+        self.select_matching_btn = ctk.CTkButton(
+            filter_frame,
+            text="",
+            command=self.on_select_matching,
+            fg_color="#3f3f46",
+            hover_color="#51525b",
+            width=120,
+        )
+        self.query_entry.grid(row=1, column=0, columnspan=5, padx=(0, 10), pady=4, sticky="ew")
+        self.select_matching_btn.grid(row=1, column=5, padx=(0, 12), pady=4, sticky="e")
+
+        header_frame = ctk.CTkFrame(panel, fg_color="#111521", corner_radius=12)
+        header_frame.grid(row=2, column=0, padx=18, pady=(10, 6), sticky="ew")
+        header_frame.columnconfigure(0, weight=0)
+        for i in range(1, len(COLUMN_DEFINITIONS) + 1):
+            header_frame.columnconfigure(i, weight=0)
+
+        self.select_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color="#9aa4d1",
+            width=60,
+        )
+        self.select_label.grid(row=0, column=0, padx=(12, 6), pady=8, sticky="w")
+
+        self.header_buttons: Dict[str, ctk.CTkButton] = {}
+        for column_index, (key, title_key, width) in enumerate(COLUMN_DEFINITIONS, start=1):
+            btn = ctk.CTkButton(
+                header_frame,
+                text="",
+                command=lambda c=key: self.on_sort_column(c),
+                corner_radius=12,
+                fg_color="#1f2537",
+                hover_color="#2c3146",
+                width=width,
+            )
+            btn.bind("<Shift-Button-1>", lambda event, c=key: self.on_sort_column(c, additive=True))
+            btn.grid(row=0, column=column_index, padx=6, pady=8, sticky="w")
+            self.header_buttons[key] = btn
+
+        self.roster_view = VirtualRoster(
+            panel,
+            columns=COLUMN_DEFINITIONS,
+            on_toggle=self.on_toggle_select,
+            is_selected=lambda idx: idx in self.selected_indices,
+        )
+        self.roster_view.grid(row=3, column=0, padx=18, pady=(0, 18), sticky="nsew")
+
+    def _build_editor_panel(self) -> None:
+        panel = self.editor_panel
+
+        meta_frame = ctk.CTkFrame(panel, fg_color="#151929", corner_radius=16)
+        meta_frame.grid(row=0, column=0, padx=18, pady=(20, 10), sticky="ew")
+        meta_frame.columnconfigure(1, weight=1)
+
+        self.meta_title = ctk.CTkLabel(
+            meta_frame,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#f1f3ff",
+        )
+        self.meta_title.grid(row=0, column=0, columnspan=2, padx=16, pady=(14, 6), sticky="w")
+
+        self.gold_label = ctk.CTkLabel(meta_frame, text="", text_color="#cbd5ff")
+        self.gold_entry = ctk.CTkEntry(meta_frame, textvariable=self.gold_var, width=140)
+        self.rep_label = ctk.CTkLabel(meta_frame, text="", text_color="#cbd5ff")
+        self.rep_entry = ctk.CTkEntry(meta_frame, textvariable=self.rep_var, width=140)
+        self.update_meta_btn = ctk.CTkButton(meta_frame, text="", command=self.on_update_meta)
+        self.save_as_btn = ctk.CTkButton(meta_frame, text="", command=self.on_save_as, fg_color="#3f3f46", hover_color="#51525b")
+
+        self.gold_label.grid(row=1, column=0, padx=(16, 4), pady=6, sticky="w")
+        self.gold_entry.grid(row=1, column=1, padx=(0, 16), pady=6, sticky="w")
+        self.rep_label.grid(row=2, column=0, padx=(16, 4), pady=6, sticky="w")
+        self.rep_entry.grid(row=2, column=1, padx=(0, 16), pady=6, sticky="w")
+        self.retention_label = ctk.CTkLabel(meta_frame, text="", text_color="#cbd5ff")
+        self.retention_menu = ctk.CTkOptionMenu(meta_frame, values=[], command=self._on_retention_change, width=220)
+
+        self.update_meta_btn.grid(row=3, column=0, padx=16, pady=(12, 6), sticky="w")
+        self.save_as_btn.grid(row=3, column=1, padx=(0, 16), pady=(12, 6), sticky="e")
+        self.retention_label.grid(row=4, column=0, padx=(16, 4), pady=(6, 14), sticky="w")
+        self.retention_menu.grid(row=4, column=1, padx=(0, 16), pady=(6, 14), sticky="w")
+
+        bulk_frame = ctk.CTkFrame(panel, fg_color="#151929", corner_radius=16)
+        bulk_frame.grid(row=1, column=0, padx=18, pady=(10, 20), sticky="nsew")
+        bulk_frame.columnconfigure(1, weight=1)
+
+        self.bulk_title = ctk.CTkLabel(
+            bulk_frame,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#f1f3ff",
+        )
+        self.bulk_title.grid(row=0, column=0, columnspan=4, padx=16, pady=(14, 10), sticky="w")
+
+        form = ctk.CTkFrame(bulk_frame, fg_color="transparent")
+        form.grid(row=1, column=0, columnspan=4, padx=16, pady=4, sticky="ew")
+        for i in range(8):
+            form.columnconfigure(i, weight=1 if i in (4, 5) else 0)
+
+        entries = [
+            ("stat_level", self.level_var),
+            ("stat_potential", self.potential_var),
+            ("stat_skill", self.skill_var),
+            ("stat_living_skill", self.living_skill_var),
+            ("stat_strength", self.strength_var),
+            ("stat_endurance", self.endurance_var),
+            ("stat_agility", self.agility_var),
+            ("stat_precision", self.precision_var),
+            ("stat_intelligence", self.intelligence_var),
+            ("stat_willpower", self.willpower_var),
+        ]
+
+        self.bulk_labels: Dict[str, ctk.CTkLabel] = {}
+        self.bulk_entries: Dict[str, ctk.CTkEntry] = {}
+
+        for idx, (name_key, var) in enumerate(entries[:4]):
+            column = idx * 2
+            label = ctk.CTkLabel(form, text="", text_color="#cbd5ff")
+            entry = ctk.CTkEntry(form, textvariable=var, width=100)
+            label.grid(row=0, column=column, padx=(0, 6), pady=6, sticky="w")
+            entry.grid(row=0, column=column + 1, padx=(0, 18), pady=6, sticky="w")
+            self.bulk_labels[name_key] = label
+            self.bulk_entries[name_key] = entry
+
+        for idx, (name_key, var) in enumerate(entries[4:]):
+            row = 1 + idx // 4
+            column = (idx % 4) * 2
+            label = ctk.CTkLabel(form, text="", text_color="#cbd5ff")
+            entry = ctk.CTkEntry(form, textvariable=var, width=100)
+            label.grid(row=row, column=column, padx=(0, 6), pady=6, sticky="w")
+            entry.grid(row=row, column=column + 1, padx=(0, 18), pady=6, sticky="w")
+            self.bulk_labels[name_key] = label
+            self.bulk_entries[name_key] = entry
+
+        for idx, (name_key, var) in enumerate((("clamp_lower", self.clamp_lower_var), ("clamp_upper", self.clamp_upper_var))):
+            column = idx * 2
+            label = ctk.CTkLabel(form, text="", text_color="#9aa4d1")
+            entry = ctk.CTkEntry(form, textvariable=var, width=100)
+            label.grid(row=3, column=column, padx=(0, 6), pady=6, sticky="w")
+            entry.grid(row=3, column=column + 1, padx=(0, 18), pady=6, sticky="w")
+            self.bulk_labels[name_key] = label
+            self.bulk_entries[name_key] = entry
+
+        self.mode_label = ctk.CTkLabel(bulk_frame, text="", text_color="#cbd5ff")
+        self.mode_menu = ctk.CTkOptionMenu(
+            bulk_frame,
+            values=[],
+            command=self._on_mode_change,
+            width=160,
+        )
+        self.apply_btn = ctk.CTkButton(
+            bulk_frame,
+            text="",
+            command=self.on_apply_selected,
+            fg_color="#10b981",
+            hover_color="#059669",
+            width=180,
+        )
+        self.hint_label = ctk.CTkLabel(
+            bulk_frame,
+            text="",
+            wraplength=360,
+            text_color="#9aa4d1",
+            anchor="w",
+            justify="left",
+        )
+
+        self.mode_label.grid(row=2, column=0, padx=16, pady=(12, 6), sticky="w")
+        self.mode_menu.grid(row=2, column=1, padx=(0, 16), pady=(12, 6), sticky="w")
+        self.apply_btn.grid(row=2, column=2, padx=(16, 16), pady=(12, 6), sticky="e")
+        self.hint_label.grid(row=3, column=0, columnspan=4, padx=16, pady=(6, 16), sticky="w")
+
+    def _build_status_bar(self) -> None:
+        bar = ctk.CTkFrame(self, corner_radius=0, fg_color="#161b2a")
+        bar.grid(row=2, column=0, sticky="ew")
+        bar.columnconfigure(0, weight=1)
+        self.status_label = ctk.CTkLabel(bar, textvariable=self.status_var, text_color="#cbd5ff")
+        self.status_label.grid(row=0, column=0, padx=18, pady=6, sticky="w")
+
+        self.load_progress = ctk.CTkProgressBar(bar, width=180)
+        self.load_progress.set(0)
+        self.cancel_load_btn = ctk.CTkButton(
+            bar,
+            text="",
+            command=self.on_cancel_load,
+            fg_color="#3f3f46",
+            hover_color="#51525b",
+            width=110,
+        )
+        self.load_progress.grid(row=0, column=1, padx=(0, 10), pady=6)
+        self.cancel_load_btn.grid(row=0, column=2, padx=(0, 18), pady=6)
+        self.load_progress.grid_remove()
+        self.cancel_load_btn.grid_remove()
+
+    def set_status(self, message: str) -> None:
+        if self.debug_timings:
+            timings = tracer.summary()
+            if timings:
+                message = f"{message}  |  {timings}"
+        self.status_var.set(message)
+
+    def _on_language_change(self, selection: str) -> None:
+        language = self.language_display_to_key.get(selection)
+        if not language:
+            return
+        if language == self.translator.current:
+            return
+        self.translator.set_language(language)
+        self._apply_translations()
+        # 清單內容沒有翻譯文字，只需更新狀態列，不必重建表格
+        if self.model.data:
+            self.set_status(self.tr("status_showing", total=len(self.current_rows), selected=len(self.selected_indices)))
+        else:
+            self.set_status(self.tr("status_ready"))
+
+    def _apply_translations(self) -> None:
+        app_title = self.tr("app_title")
+        if self.model.path:
+            title = f"{app_title} — {os.path.basename(self.model.path)}"
+        else:
+            title = app_title
+        self.title(title)
+        self._set_texts(MAIN_TEXTS)
+        # 語言清單的顯示名稱不隨介面語言改變，建立選單時已設定
+        self.language_menu.set(self.language_key_to_display.get(self.translator.current, self.translator.current))
+        self._update_sort_headers()
+        # 尚未建立的編輯面板在建立時才翻譯
+        if self._editor_built:
+            self._translate_editor_panel()
+
+    def _translate_editor_panel(self) -> None:
+        self._set_texts(EDITOR_TEXTS)
+        for key, label in self.bulk_labels.items():
+            self._set_text(("bulk_labels", key), label, "text", self.tr(key))
+        self._update_mode_menu()
+        self._update_retention_menu()
+
+    def _set_texts(self, bindings) -> None:
+        for attr, option, key in bindings:
+            self._set_text((attr, option), getattr(self, attr), option, self.tr(key))
+
+    def _set_text(self, slot, widget, option: str, text: str) -> None:
+        """與上次設定的文字相同時略過，語言切換時只重新配置內容改變的元件。"""
+        if self._applied_texts.get(slot) != text:
+            widget.configure(**{option: text})
+            self._applied_texts[slot] = text
+
+    def _update_mode_menu(self) -> None:
+        add_display = self.tr("mode_add")
+        set_display = self.tr("mode_set")
+        values = [add_display, set_display]
+        self.mode_display_to_key = {
+            add_display: "add",
+            set_display: "set",
+        }
+        self.mode_menu.configure(values=values)
+        current_mode = self.bulk_mode_var.get()
+        display = self._mode_display_for_key(current_mode)
+        if display not in values:
+            display = add_display
+            self.bulk_mode_var.set("add")
+        self.mode_menu.set(display)
+
+    def _update_retention_menu(self) -> None:
+        self.retention_display_to_key = {self.tr(f"retention_{key}"): key for key in RETENTION_PRESETS}
+        self.retention_menu.configure(values=list(self.retention_display_to_key))
+        self.retention_menu.set(self.tr(f"retention_{self.backup_retention_var.get()}"))
+
+    def _on_retention_change(self, selection: str) -> None:
+        self.backup_retention_var.set(self.retention_display_to_key.get(selection, "all"))
+
+    def _mode_display_for_key(self, key: str) -> str:
+        if key == "set":
+            return self.tr("mode_set")
+        return self.tr("mode_add")
+
+    def on_toggle_select(self, idx: int, selected: bool) -> None:
+        if selected:
+            self.selected_indices.add(idx)
+        else:
+            self.selected_indices.discard(idx)
+        self.set_status(self.tr("status_selected", count=len(self.selected_indices)))
+
+    def report_callback_exception(self, exc, val, tb):
+        # 延遲解碼 NPC 時發現存檔已被其他程式改寫：提示重新載入，而不是只在主控台留下追蹤訊息
+        if isinstance(val, SourceChanged):
+            messagebox.showerror(self.tr("app_title"), self.tr("message_source_changed", error=val))
+            return
+        super().report_callback_exception(exc, val, tb)
+
+    def on_open(self):
+        path = filedialog.askopenfilename(
+            title=self.tr("dialog_open_title"),
+            filetypes=[
+                (self.tr("dialog_open_filter"), "*.dat *.json"),
+                (self.tr("dialog_all_files"), "*.*"),
+            ],
+            initialfile=DEFAULT_FILENAME,
+        )
+        if path:
+            self.load_path(path)
+
+    def on_save(self):
+        if not self.model.data:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_load_first"))
+            return
+        self.model.backup_policy = RETENTION_PRESETS[self.backup_retention_var.get()]
+        try:
+            out_path = self.model.save(make_backup=True)
+            stats = self.model.last_write
+            if stats is not None and stats.skipped:
+                self.set_status(self.tr("status_save_unchanged"))
+                return
+            messagebox.showinfo(self.tr("app_title"), self.tr("message_saved", path=out_path))
+            self.set_status(self._saved_status("status_saved"))
+        except Exception as exc:
+            messagebox.showerror(self.tr("app_title"), self.tr("message_save_failed", error=exc))
+            self.set_status(self.tr("status_save_failed"))
+
+    def on_save_as(self):
+        if not self.model.data:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_load_first"))
+            return
+        path = filedialog.asksaveasfilename(
+            title=self.tr("dialog_save_as_title"),
+            defaultextension=".dat",
+            initialfile=self.tr("dialog_save_as_default_name"),
+            filetypes=[
+                (self.tr("dialog_save_as_dat"), "*.dat"),
+                (self.tr("dialog_save_as_json"), "*.json"),
+                (self.tr("dialog_all_files"), "*.*"),
+            ],
+        )
+        if not path:
+            return
+        self.model.backup_policy = RETENTION_PRESETS[self.backup_retention_var.get()]
+        try:
+            out_path = self.model.save(out_path=path, make_backup=True)
+            messagebox.showinfo(self.tr("app_title"), self.tr("message_saved_as", path=out_path))
+            self.set_status(self._saved_status("status_save_as_done"))
+        except Exception as exc:
+            messagebox.showerror(self.tr("app_title"), self.tr("message_save_failed", error=exc))
+            self.set_status(self.tr("status_save_failed"))
+
+    def _saved_status(self, key: str) -> str:
+        stats = self.model.last_write
+        if stats is None or stats.skipped:
+            return self.tr(key)
+        return self.tr(
+            "status_write_stats",
+            status=self.tr(key),
+            size=stats.megabytes,
+            seconds=stats.seconds,
+            speed=stats.throughput,
+        )
+
+    def on_compare(self):
+        """與備份或另一份存檔比較，列出變更的角色與欄位（比較對象為舊版本）。"""
+        if not self.model.data:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_load_first"))
+            return
+        path = filedialog.askopenfilename(
+            title=self.tr("dialog_compare_title"),
+            initialdir=os.path.dirname(os.path.abspath(self.model.path)),
+            filetypes=[
+                (self.tr("dialog_compare_filter"), "*.bak.* *.dat *.json"),
+                (self.tr("dialog_all_files"), "*.*"),
+            ],
+        )
+        if not path:
+            return
+        self.set_status(self.tr("status_comparing"))
+        self.update_idletasks()
+        # 比較功能不常用，需要時才匯入
+        from save_diff import diff_with_file
+
+        try:
+            with span("diff"):
+                result = diff_with_file(self.model, path)
+        except Exception as exc:
+            messagebox.showerror(self.tr("app_title"), self.tr("message_compare_failed", error=exc))
+            self.set_status(self.tr("status_ready"))
+            return
+        name = os.path.basename(path)
+        if result.identical:
+            self.set_status(self.tr("status_compare_identical", path=name))
+            return
+        counts = result.counts()
+        self.set_status(
+            self.tr(
+                "status_compare_done",
+                path=name,
+                changed=counts["changed"],
+                added=counts["added"],
+                removed=counts["removed"],
+                fields=len(result.fields),
+            )
+        )
+        self._show_diff_window(name, result)
+
+    def _show_diff_window(self, name, result):
+        window = ctk.CTkToplevel(self)
+        window.title(self.tr("compare_window_title", path=name))
+        window.geometry("760x520")
+        window.transient(self)
+        text = ctk.CTkTextbox(window, wrap="none", font=ctk.CTkFont(family="Consolas", size=13))
+        text.pack(fill="both", expand=True, padx=12, pady=12)
+        text.insert("1.0", "\n".join(result.iter_lines(limit=DIFF_WINDOW_LIMIT)))
+        text.configure(state="disabled")
+
+    def on_about(self):
+        messagebox.showinfo(self.tr("app_title"), self.tr("about_message"))
+
+    def load_path(self, path, auto=False):
+        """在背景執行緒載入存檔；完成後於主執行緒替換目前的 SaveModel。"""
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        self._load_token += 1
+        token = self._load_token
+        cancel = threading.Event()
+        self._load_cancel = cancel
+
+        self.load_progress.set(0)
+        self.load_progress.grid()
+        self.cancel_load_btn.grid()
+        self.set_status(self.tr("status_loading", done=0.0, total=0.0, percent=0))
+
+        worker = threading.Thread(
+            target=self._load_worker,
+            args=(token, path, cancel, auto),
+            name="save-loader",
+            daemon=True,
+        )
+        worker.start()
+        if self._load_poll_id is None:
+            self._load_poll_id = self.after(LOAD_POLL_MS, self._poll_load)
+
+    def _load_worker(self, token, path, cancel, auto):
+        # 背景執行緒：只透過佇列回報，不可直接操作 Tk 元件
+        def progress(done, total, phase="read"):
+            self._load_queue.put((token, "progress", (done, total, phase)))
+
+        model = SaveModel(lazy=True)
+        try:
+            model.load(path, progress=progress, cancel=cancel)
+        except LoadCancelled:
+            self._load_queue.put((token, "cancelled", None))
+        except Exception as exc:
+            self._load_queue.put((token, "error", (path, exc, auto)))
+        else:
+            self._load_queue.put((token, "done", (path, model)))
+
+    def _poll_load(self):
+        self._load_poll_id = None
+        finished = False
+        while True:
+            try:
+                token, kind, payload = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if token != self._load_token:
+                continue  # 已被取代或取消的載入
+            if kind == "progress":
+                self._show_load_progress(*payload)
+            else:
+                finished = True
+                self._load_cancel = None
+                self.load_progress.grid_remove()
+                self.cancel_load_btn.grid_remove()
+                if kind == "done":
+                    self._on_load_finished(*payload)
+                elif kind == "error":
+                    self._on_load_failed(*payload)
+                else:
+                    self.set_status(self.tr("status_load_cancelled"))
+        if not finished and self._load_cancel is not None:
+            self._load_poll_id = self.after(LOAD_POLL_MS, self._poll_load)
+
+    def _show_load_progress(self, done, total, phase):
+        fraction = min(1.0, done / total) if total else 0
+        self.load_progress.set(fraction)
+        if phase == "parse" or (total and done >= total):
+            self.set_status(self.tr("status_parsing", percent=int(fraction * 100) if phase == "parse" else 0))
+            return
+        self.set_status(
+            self.tr(
+                "status_loading",
+                done=done / (1 << 20),
+                total=total / (1 << 20),
+                percent=int(fraction * 100),
+            )
+        )
+
+    def on_cancel_load(self):
+        if self._load_cancel is None:
+            return
+        self._load_cancel.set()
+        self._load_cancel = None
+        self._load_token += 1
+        self.load_progress.grid_remove()
+        self.cancel_load_btn.grid_remove()
+        self.set_status(self.tr("status_load_cancelled"))
+
+    def _on_load_failed(self, path, exc, auto):
+        if auto:
+            print("自動載入失敗:", exc)
+            self.set_status(self.tr("status_auto_load_failed"))
+            return
+        messagebox.showerror(self.tr("app_title"), self.tr("message_load_failed", error=exc))
+        self.set_status(self.tr("status_load_failed"))
+
+    def _on_load_finished(self, path, model):
+        previous, self.model = self.model, model
+        if previous is not model:
+            previous.close()
+        status = self._recover_journal(path)
+        self.gold_var.set(str(self.model.get_gold()))
+        self.rep_var.set(str(self.model.get_rep()))
+        self.selected_indices.clear()
+        self.roster_view.scroll_to_top()
+        self.refresh_table()
+        self._apply_translations()
+        self._update_history_buttons()
+        self.set_status(status)
+
+    def _recover_journal(self, path) -> str:
+        """載入後檢查上次未儲存的編輯日誌，經使用者同意後重新套用，並開始記錄之後的修改；回傳狀態列文字。"""
+        model = self.model
+        try:
+            pending = model.read_journal()
+        except OSError as exc:
+            print("WARN: 無法讀取編輯日誌:", exc)
+            pending = None
+        applied = 0
+        if pending is not None and pending.records and not pending.stale:
+            question = self.tr("message_recover_journal", records=len(pending.records), deltas=pending.delta_count)
+            if messagebox.askyesno(self.tr("app_title"), question):
+                applied = model.recover_journal(pending)
+        try:
+            model.attach_journal(pending, applied)
+        except OSError as exc:
+            print("WARN: 無法建立編輯日誌:", exc)
+        if applied:
+            return self.tr("status_journal_recovered", path=path, applied=applied, records=len(pending.records))
+        if pending is not None and pending.archived:
+            return self.tr("status_journal_stale", path=path, journal=os.path.basename(pending.archived))
+        return self.tr("status_loaded", path=path)
+
+    def _on_search_changed(self, *_args) -> None:
+        # 邊打字邊篩選：每次輸入都取消尚未執行的刷新，只保留最後一次
+        self._search_generation += 1
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        generation = self._search_generation
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, lambda: self._run_live_search(generation))
+
+    def _on_query_changed(self, *_args) -> None:
+        # 語法檢查在每次輸入時立即進行（結果會被快取）；有錯誤時只更新狀態列，不刷新清單
+        text = self.query_var.get().strip()
+        try:
+            compile_filter(text)
+        except QueryError as exc:
+            self._search_generation += 1
+            if self._search_after_id is not None:
+                self.after_cancel(self._search_after_id)
+                self._search_after_id = None
+            self.query_entry.configure(border_color=QUERY_ERROR_COLOR)
+            self.set_status(self.tr("status_query_error", error=exc))
+            return
+        self.query_entry.configure(border_color=self.query_default_border)
+        if text == self._query_text:
+            return
+        self._query_text = text
+        self._on_search_changed()
+
+    def on_select_matching(self):
+        """選取目前清單中所有符合篩選條件的角色，供批次編輯使用。"""
+        if not self.model.data:
+            return
+        self.selected_indices = set(self.current_rows)
+        self.roster_view.refresh_selection()
+        self.set_status(self.tr("status_selected", count=len(self.selected_indices)))
+
+    def _run_live_search(self, generation: int) -> None:
+        self._search_after_id = None
+        if generation != self._search_generation or not self.model.data:
+            return
+        self.refresh_table()
+
+    def refresh_table(self):
+        with span("refresh"):
+            only_team = self.model.player_team if self.show_only_player_var.get() else None
+            search = self.search_var.get().strip().casefold()
+            min_level = safe_int(self.filter_min_level_var.get(), 0) or 0
+            only_underscore = self.only_underscore_var.get()
+
+            indices = self.model.query_roster(
+                only_team=only_team,
+                min_level=min_level,
+                only_underscore=only_underscore,
+                search=search,
+                sort_keys=self.sort_keys,
+                include_dead=self.show_dead_var.get(),
+                query=self._query_text,
+            )
+            roster = self.model.roster
+            # 清單直接讀取索引裡就地更新的紀錄，重繪不會為每個 NPC 配置物件
+            self.current_rows = indices
+            if self.selected_indices:
+                self.selected_indices.intersection_update(indices)
+
+            folded_names = roster.names_folded if roster is not None else []
+            alive = roster.alive if roster is not None else b""
+
+            def highlight(idx):
+                return bool(search) and search in folded_names[idx]
+
+            with span("refresh.render"):
+                self.roster_view.set_rows(
+                    indices,
+                    records=roster.records if roster is not None else [],
+                    highlight=highlight,
+                    dimmed=lambda idx: not alive[idx],
+                )
+
+        self.set_status(self.tr("status_showing", total=len(indices), selected=len(self.selected_indices)))
+
+    def on_update_meta(self):
+        if not self.model.data:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_load_first"))
+            return
+        with self.model.history.group("meta"):
+            self.model.set_gold(self.gold_var.get())
+            self.model.set_rep(self.rep_var.get())
+        self._update_history_buttons()
+        messagebox.showinfo(self.tr("app_title"), self.tr("message_update_meta_done"))
+        self.set_status(self.tr("status_meta_updated"))
+
+    def on_apply_selected(self):
+        if not self.model.data:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_load_first"))
+            return
+        if not self.selected_indices:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_select_first"))
+            return
+
+        fields = []
+        if self.level_var.get().strip():
+            fields.append(("level", self.level_var.get()))
+        if self.potential_var.get().strip():
+            fields.append(("potentialPoint", self.potential_var.get()))
+        if self.skill_var.get().strip():
+            fields.append(("skillPoint", self.skill_var.get()))
+        if self.living_skill_var.get().strip():
+            fields.append(("livingSkillPoint", self.living_skill_var.get()))
+        if self.strength_var.get().strip():
+            fields.append(("BSstrength", self.strength_var.get()))
+        if self.endurance_var.get().strip():
+            fields.append(("BSendurance", self.endurance_var.get()))
+        if self.agility_var.get().strip():
+            fields.append(("BSagility", self.agility_var.get()))
+        if self.precision_var.get().strip():
+            fields.append(("BSprecision", self.precision_var.get()))
+        if self.intelligence_var.get().strip():
+            fields.append(("BSintelligence", self.intelligence_var.get()))
+        if self.willpower_var.get().strip():
+            fields.append(("BSwillpower", self.willpower_var.get()))
+
+        if not fields:
+            messagebox.showwarning(self.tr("app_title"), self.tr("message_enter_field"))
+            return
+
+        try:
+            lower = parse_bound(self.clamp_lower_var.get(), "clamp_lower")
+            upper = parse_bound(self.clamp_upper_var.get(), "clamp_upper")
+            edit = parse_bulk_edit(fields, self.bulk_mode_var.get(), lower, upper)
+        except BulkEditError as exc:
+            self._warn_invalid_field(exc)
+            return
+
+        with span("apply"):
+            try:
+                result = apply_bulk_edit(self.model, sorted(self.selected_indices), edit)
+            except BulkEditError as exc:
+                # @索引 指向不存在的 NPC 時在套用階段才會發現
+                self._warn_invalid_field(exc)
+                return
+            finally:
+                self._update_history_buttons()
+            self._refresh_after_edit(result.fields)
+        count = result.matched
+        messagebox.showinfo(self.tr("app_title"), self.tr("message_apply_done", count=count))
+        self.set_status(self.tr("status_batch_done", count=count))
+
+    def _warn_invalid_field(self, exc: BulkEditError) -> None:
+        label = self.tr(BULK_FIELD_LABELS.get(exc.key, exc.key))
+        messagebox.showwarning(self.tr("app_title"), self.tr("message_invalid_field", field=label, error=exc))
+
+    def _view_fields(self) -> set:
+        """目前的篩選與排序會讀取的欄位；這些欄位被修改時清單順序或內容可能改變。"""
+        fields = set(NPC_LIVENESS_KEYS)
+        fields.update(key for key, _ in self.sort_keys)
+        if not self.sort_keys:
+            fields.update(("team", "level", "unitname"))
+        if self.show_only_player_var.get():
+            fields.add("team")
+        if self.filter_min_level_var.get().strip():
+            fields.add("level")
+        if self.search_var.get().strip() or self.only_underscore_var.get():
+            fields.add("unitname")
+        fields.update(compile_filter(self._query_text).fields)
+        return fields
+
+    def _refresh_after_edit(self, fields) -> None:
+        """編輯後更新清單：改到的欄位不影響篩選與排序時，只重繪版本改變的可視列。"""
+        if not fields:
+            return
+        if self._view_fields().intersection(fields):
+            self.refresh_table()
+        else:
+            with span("refresh.render"):
+                self.roster_view.update_rows()
+
+    def on_undo(self):
+        self._step_history("undo", "status_undone", "status_nothing_to_undo")
+
+    def on_redo(self):
+        self._step_history("redo", "status_redone", "status_nothing_to_redo")
+
+    def _step_history(self, action, done_key, empty_key):
+        if not self.model.data:
+            return
+        with span(action):
+            step = getattr(self.model, action)()
+            if step is not None and step.touched():
+                # 只有步驟內的紀錄版本改變，重繪時其他可視列維持原樣
+                self._refresh_after_edit(set(step.keys))
+        if step is None:
+            self.set_status(self.tr(empty_key))
+            return
+        self.gold_var.set(str(self.model.get_gold()))
+        self.rep_var.set(str(self.model.get_rep()))
+        self._update_history_buttons()
+        self.set_status(self.tr(done_key, count=len(step)))
+
+    def _update_history_buttons(self) -> None:
+        history = self.model.history
+        self.undo_btn.configure(state="normal" if history.can_undo else "disabled")
+        self.redo_btn.configure(state="normal" if history.can_redo else "disabled")
+
+    def on_sort_column(self, column, additive=False):
+        """點擊切換排序欄位／方向；additive=True 時加入或切換次要排序欄位。"""
+        keys = list(self.sort_keys)
+        position = next((i for i, (key, _) in enumerate(keys) if key == column), None)
+        if additive:
+            if position is None:
+                keys.append((column, False))
+            else:
+                keys[position] = (column, not keys[position][1])
+        elif position == 0 and len(keys) == 1:
+            keys = [(column, not keys[0][1])]
+        else:
+            keys = [(column, False)]
+        self.sort_keys = keys
+        self._update_sort_headers()
+        self.refresh_table()
+
+    def _update_sort_headers(self) -> None:
+        directions = {key: (rank, reverse) for rank, (key, reverse) in enumerate(self.sort_keys, start=1)}
+        for key, title_key, _ in COLUMN_DEFINITIONS:
+            text = self.tr(title_key)
+            if key in directions:
+                rank, reverse = directions[key]
+                arrow = "▼" if reverse else "▲"
+                text = f"{text} {arrow}{rank}" if len(self.sort_keys) > 1 else f"{text} {arrow}"
+            self._set_text(("header", key), self.header_buttons[key], "text", text)
+
+    def _on_mode_change(self, selection: str) -> None:
+        mode = self.mode_display_to_key.get(selection, "add")
+        self.bulk_mode_var.set(mode)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="blackthorn_arena_reforged_save_editor")
+    parser.add_argument("--debug", action="store_true", help="show step timings in the status bar")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace (Perfetto) JSON file on exit")
+    parser.add_argument("--startup-profile", action="store_true", help="print import and construction time per startup phase")
+    args = parser.parse_args(argv)
+    if args.debug or args.trace or args.startup_profile:
+        tracer.enable()
+    with span("startup.window"):
+        app = App(debug_timings=args.debug, startup_profile=args.startup_profile)
+    try:
+        app.mainloop()
+    finally:
+        app.model.close_journal()
+        if args.trace:
+            tracer.export(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存檔資料模型：載入、查詢、編輯與寫回，不依賴任何 GUI 套件（GUI 與命令列共用）。"""
+from __future__ import annotations
+
+import gzip
+import mmap
+import os
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+
+from bulk_edit import BulkEdit, FieldOp, apply_bulk_edit
+from edit_history import ABSENT, GLOBAL, EditHistory
+from edit_journal import EditJournal, read_journal
+from perf_trace import span
+from roster_index import RosterIndex
+from roster_query import compile_filter
+from save_backup import BackupManager, BackupPolicy
+from save_spans import (
+    build_splice_plan,
+    encode_value,
+    iter_document_chunks,
+    iter_spliced_chunks,
+    rebind_source,
+    scan_document,
+)
+from save_writer import WriteStats, write_atomic
+
+DEFAULT_FILENAME = "sav.dat"
+# 背景載入時每次讀取的位元組數
+LOAD_CHUNK_SIZE = 1 << 20
+
+# 清單摘要、存活判斷與批次編輯會用到的 NPC 欄位；延遲載入模式下只預先解碼這些欄位
+NPC_SUMMARY_KEYS = ("id", "unitId", "team", "unitname", "level", "potentialPoint", "skillPoint", "livingSkillPoint")
+NPC_LIVENESS_KEYS = ("isDead", "dead", "deathDate", "state", "gladiatorState", "hp", "HP", "currentHp", "curHp", "currentHP")
+NPC_STAT_KEYS = ("BSstrength", "BSendurance", "BSagility", "BSprecision", "BSintelligence", "BSwillpower")
+EAGER_NPC_KEYS = NPC_SUMMARY_KEYS + NPC_LIVENESS_KEYS + NPC_STAT_KEYS
+# 欄式索引中以整數欄保存的欄位
+NPC_INT_COLUMNS = ("team", "level", "potentialPoint", "skillPoint", "livingSkillPoint") + NPC_STAT_KEYS
+
+
+class LoadCancelled(Exception):
+    """背景載入被使用者取消。"""
+
+
+class SourceChanged(OSError):
+    """記憶體映射的存檔在載入後被其他程式就地改寫，映射中已不是載入時的位元組。"""
+
+
+class _MappedSource:
+    """存檔的唯讀記憶體映射；被映射的檔案保持開啟，以比對載入時的大小與修改時間。
+
+    映射直接反映其他程式對同一檔案的就地改寫（檔案被截短時讀取甚至會觸發 SIGBUS），
+    因此每次切片前先 check()，內容已改變時拋出 SourceChanged；
+    以新檔取代（改名）不影響映射，被映射的仍是原本的檔案。
+    """
+
+    __slots__ = ("mapping", "path", "_fh", "_stamp")
+
+    def __init__(self, mapping, fh, path, stat):
+        self.mapping = mapping
+        self.path = path
+        self._fh = fh
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+
+    def check(self):
+        stat = os.fstat(self._fh.fileno())
+        if (stat.st_size, stat.st_mtime_ns) != self._stamp:
+            raise SourceChanged(f"存檔在載入後已被其他程式修改，請重新載入: {self.path}")
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def __getitem__(self, index):
+        self.check()
+        return self.mapping[index]
+
+    def close(self):
+        try:
+            self.mapping.close()
+        except BufferError:
+            # 仍有 memoryview 引用映射時交給垃圾回收
+            pass
+        self._fh.close()
+
+
+def safe_int(value, default=None):
+    try:
+        return int(value)
+    except Exception:
+        return default
+
+
+class SaveModel:
+    def __init__(self, lazy=False, use_mmap=True):
+        # lazy=True 時 NPC 以 LazyNpc 保存，只有被讀取其他欄位或修改時才完整解碼
+        self.lazy = lazy
+        # use_mmap=True 時以唯讀記憶體映射載入，原始位元組留在分頁快取而非 Python 堆積；
+        # Windows 上被映射的檔案無法被其他程式（例如遊戲）改寫，因此一律讀入記憶體
+        self.use_mmap = use_mmap
+        self._source = None
+        self.path = None
+        self.data = None
+        self.npcs = []
+        self.roster = None
+        # 每次實際修改資料時換成新的編號；與上次載入／儲存時的值相同代表文件未變更
+        # 復原會回到修改前的編號，因此復原到已儲存的狀態時 is_modified() 為 False
+        self.revision = 0
+        self._saved_revision = 0
+        self._revision_counter = 0
+        # 復原／重做只記錄欄位差異（見 edit_history）
+        self.history = EditHistory()
+        # 編輯日誌（見 edit_journal）；attach_journal() 之後每次修改都附加一筆紀錄
+        self.journal: EditJournal | None = None
+        self.last_write: WriteStats | None = None
+        # 備份保留策略；last_backup 為最近一次儲存建立的備份（內容未變而略過時為 None）
+        self.backup_policy = BackupPolicy()
+        self.last_backup = None
+        # 增量存檔：載入時的位元組配置、npcs 清單位置→原始陣列位置，以及修改過的 NPC／頂層欄位
+        self._layout = None
+        self._npc_origin = array("q")
+        self._dirty_npcs = set()
+        self._dirty_fields = set()
+        # 文件含 NaN／Infinity 字面值時為 True，這份文件的編碼改用標準函式庫（見 json_backend）
+        self._nonfinite = False
+        self.gold_key = "wealth"
+        self.reputation_key = "reputation"
+        self.player_team = 0
+
+    def load(self, path, progress=None, cancel=None):
+        """載入存檔。
+
+        `progress(done, total, phase=...)` 會在每讀取一段位元組（phase="read"）
+        以及延遲模式下每掃描一批 NPC（phase="parse"）後被呼叫；
+        `cancel` 為 threading.Event，設定後會在下一段讀取前中止並拋出 LoadCancelled。
+        兩者都可在背景執行緒中使用，本方法不會碰觸任何 Tk 物件。
+
+        使用記憶體映射時直接從映射解碼，映射會保留到下次載入或 close()，
+        供未修改的 NPC 原樣寫回與增量存檔使用；讀取階段只回報一次進度。
+        存檔之後被其他程式就地改寫時，延遲解碼、取原始位元組與存檔都會拋出 SourceChanged，需重新載入。
+        `.gz` 檔（壓縮的備份）先解壓到記憶體再解析。已開啟的編輯日誌會先關閉（見 attach_journal）。
+        """
+        self.close_journal()
+        with span("load", path=path):
+            with span("load.read"):
+                if path.endswith(".gz"):
+                    with gzip.open(path, "rb") as fh:
+                        raw = bytearray(fh.read())
+                else:
+                    raw = self._map_file(path) if self.use_mmap and os.name != "nt" else None
+                if raw is None:
+                    raw = self._read_bytes(path, progress, cancel)
+                elif progress is not None:
+                    progress(len(raw), len(raw), phase="read")
+            try:
+                self._load_from(path, raw, progress, cancel)
+            except BaseException:
+                self._release(raw)
+                raise
+        return True
+
+    def _load_from(self, path, raw, progress, cancel):
+        total = len(raw)
+
+        def on_progress(done):
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled(path)
+            if progress is not None:
+                progress(done, total, phase="parse")
+
+        # 兩種模式都記錄位元組配置；非延遲模式下 npcs 仍是一般 dict
+        mapped = isinstance(raw, _MappedSource)
+        with span("load.parse", bytes=total):
+            data, layout, nonfinite = scan_document(
+                raw.mapping if mapped else raw, EAGER_NPC_KEYS, on_progress=on_progress, lazy=self.lazy
+            )
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled(path)
+        if mapped:
+            raw.check()
+            # LazyNpc 改經由 _MappedSource 切片，解碼前先確認檔案未被改寫
+            npcs = data.get("npcs")
+            if layout is not None and self.lazy and isinstance(npcs, list):
+                rebind_source(npcs, raw.mapping, raw)
+        previous = self._source
+        if layout is None:
+            # 退回 json.loads 時沒有任何物件引用原始位元組
+            self._release(raw)
+            raw = None
+        self._source = raw
+        if previous is not raw:
+            self._release(previous)
+        self.path = path
+        self.data = data
+        self._nonfinite = nonfinite
+        # 完整保留 npcs（含已死亡者）；存活與否只在建立索引時判斷一次，記錄在 roster.alive
+        npcs = self.data.get("npcs")
+        self.npcs = npcs if isinstance(npcs, list) else []
+        with span("load.index", npcs=len(self.npcs)):
+            self.roster = RosterIndex(
+                self.npcs, NPC_INT_COLUMNS, lambda npc: not self.is_dead(npc), NPC_SUMMARY_KEYS, NPC_LIVENESS_KEYS
+            )
+        self._layout = layout
+        self._npc_origin = array("q", range(len(self.npcs)))
+        self._dirty_npcs = set()
+        self._dirty_fields = set()
+        self.revision = 0
+        self._saved_revision = 0
+        self._revision_counter = 0
+        self.history.clear()
+
+    @staticmethod
+    def _map_file(path):
+        fh = open(path, "rb")
+        try:
+            stat = os.fstat(fh.fileno())
+            if stat.st_size == 0:
+                fh.close()
+                return None
+            try:
+                mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                fh.close()
+                return None
+        except BaseException:
+            fh.close()
+            raise
+        return _MappedSource(mapping, fh, path, stat)
+
+    @staticmethod
+    def _release(source):
+        if isinstance(source, _MappedSource):
+            source.close()
+
+    def _check_source(self):
+        """載入的映射仍與磁碟上的檔案一致；已被改寫時拋出 SourceChanged。"""
+        source = self._source
+        if isinstance(source, _MappedSource):
+            source.check()
+
+    def close(self):
+        """釋放載入的資料與檔案映射；之後需重新 load 才能使用。"""
+        self.close_journal()
+        source = self._source
+        self.data = None
+        self.npcs = []
+        self.roster = None
+        self._layout = None
+        self._source = None
+        self._release(source)
+
+    @staticmethod
+    def _read_bytes(path, progress=None, cancel=None):
+        total = os.path.getsize(path)
+        buf = bytearray()
+        with open(path, "rb") as fh:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise LoadCancelled(path)
+                chunk = fh.read(LOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buf += chunk
+                if progress is not None:
+                    progress(len(buf), total, phase="read")
+        return buf
+
+    def is_modified(self):
+        return self.revision != self._saved_revision
+
+    def save(self, out_path=None, make_backup=True):
+        """寫回存檔並回傳目標路徑；寫入統計（大小、耗時、速度）記錄在 last_write。
+
+        寫入先進入同目錄暫存檔並 fsync，完成後才取代目標檔。
+        目標為原檔且載入後沒有任何修改時，不備份也不寫入。
+        """
+        if self.data is None or self.path is None:
+            raise RuntimeError("尚未載入存檔")
+        src = self.path
+        dst = out_path or self.path
+        same_file = os.path.exists(dst) and os.path.abspath(dst) == os.path.abspath(src)
+        if same_file and not self.is_modified():
+            self.last_write = WriteStats(dst, skipped=True)
+            return dst
+        with span("save", path=dst):
+            # 存檔已被改寫時在備份與寫入前就拒絕，避免把過期的原始區段拼進新內容
+            self._check_source()
+            self.last_backup = None
+            if make_backup and os.path.exists(src):
+                with span("save.backup"):
+                    try:
+                        self.last_backup = BackupManager(src, self.backup_policy).backup()
+                    except Exception as exc:
+                        print("WARN: 備份失敗:", exc)
+            with span("save.write"):
+                self.last_write = write_atomic(dst, self._iter_save_chunks())
+        if same_file:
+            self._saved_revision = self.revision
+            if self.journal is not None:
+                # 存檔已包含日誌中的所有修改
+                self._journal_call(self.journal.reset)
+        return dst
+
+    def _iter_save_chunks(self):
+        """只重新編碼修改過的 NPC 與頂層欄位，其餘位元組直接沿用載入時的原始內容。
+
+        拼接基準固定為載入時的位元組，因此修改集合會跨多次儲存累積。
+        無法拼接（例如頂層欄位被刪除）時退回完整序列化；未被解碼的 LazyNpc 仍直接寫回原始位元組。
+        """
+        layout = self._layout
+        if layout is not None:
+            edits = build_splice_plan(layout, self.data, self._dirty_fields, self._dirty_npcs, self._npc_origin)
+            if edits is not None:
+                return self._checked_chunks(iter_spliced_chunks(layout.source, edits))
+        return iter_document_chunks(self.data, self._nonfinite)
+
+    def _checked_chunks(self, chunks):
+        # 拼接的區段直接切自映射：寫完後再確認一次，寫入途中被改寫時中止（write_atomic 保留原檔）
+        self._check_source()
+        yield from chunks
+        self._check_source()
+
+    def npc_bytes(self, idx):
+        """NPC 目前內容的 JSON 位元組；未修改者直接取載入時的原始區段，不需解碼。"""
+        layout = self._layout
+        if layout is not None and idx not in self._dirty_npcs and idx < layout.item_count:
+            self._check_source()
+            return bytes(layout.source[layout.item_starts[idx]:layout.item_ends[idx]])
+        return encode_value(self.npcs[idx], self._nonfinite)
+
+    def field_bytes(self, key):
+        """頂層欄位目前內容的 JSON 位元組；未修改者直接取原始區段。"""
+        layout = self._layout
+        if layout is not None and key not in self._dirty_fields and key in layout.fields:
+            start, end = layout.fields[key]
+            self._check_source()
+            return bytes(layout.source[start:end])
+        return encode_value(self.data[key], self._nonfinite)
+
+    def read_journal(self):
+        """讀取目前存檔旁的編輯日誌（PendingJournal）；沒有日誌時回傳 None。"""
+        return read_journal(self.path)
+
+    def recover_journal(self, pending):
+        """依序重新套用日誌紀錄，回傳成功套用的紀錄數；整批在復原歷程中是一個步驟。
+
+        每筆紀錄先核對 NPC 索引、id 與舊值，與目前資料不符（日誌不屬於這份存檔）時停止，其後的紀錄不套用。
+        """
+        applied = 0
+        with span("journal.replay", records=len(pending.records)), self.history.group("journal"):
+            for record in pending.records:
+                if not self._journal_matches(record):
+                    break
+                self._replay((idx, key, new, old) for idx, _id, key, old, new in record.deltas())
+                before, self.revision = self.revision, self._next_revision()
+                for idx, _id, key, old, new in record.deltas():
+                    self.history.record(idx, key, old, new, before, self.revision)
+                applied += 1
+        return applied
+
+    def _journal_matches(self, record):
+        npcs = self.npcs
+        size = len(npcs)
+        # 同一筆紀錄可能多次修改同一欄位，後面的差異以前面寫入後的值核對
+        written = {}
+        for idx, npc_id, key, old, new in record.deltas():
+            if (idx, key) in written:
+                current = written[idx, key]
+            elif idx == GLOBAL:
+                current = self.data.get(key, ABSENT)
+            elif 0 <= idx < size and npcs[idx].get("id") == npc_id:
+                current = npcs[idx].get(key, ABSENT)
+            else:
+                return False
+            if current is ABSENT or old is ABSENT:
+                if current is not old:
+                    return False
+            elif current != old:
+                return False
+            written[idx, key] = new
+        return True
+
+    def attach_journal(self, pending=None, keep=0):
+        """開始把之後的修改寫入日誌。
+
+        `pending` 為 read_journal() 的結果、`keep` 為其中已由 recover_journal 套用的紀錄數：
+        這些紀錄保留在日誌中，其餘內容清除；過期的日誌改名保留。無法寫入時拋出 OSError。
+        """
+        self.close_journal()
+        if pending is not None and pending.stale:
+            pending.set_aside()
+        offset = pending.ends[keep - 1] if pending is not None and keep else None
+        self.journal = EditJournal.open(self.path, offset, nonfinite=self._nonfinite)
+        return self.journal
+
+    def sync_journal(self):
+        """把日誌中尚未 fsync 的紀錄寫入磁碟（一般的寫入只在間隔足夠時才 fsync）。"""
+        if self.journal is not None:
+            self._journal_call(self.journal.sync)
+
+    def close_journal(self):
+        """關閉日誌；沒有未儲存的修改時一併刪除日誌檔。"""
+        journal, self.journal = self.journal, None
+        if journal is None:
+            return
+        try:
+            if self.is_modified():
+                journal.close()
+            else:
+                journal.discard()
+        except OSError as exc:
+            print("WARN: 關閉編輯日誌失敗:", exc)
+
+    def _journal_write(self, label, indices, keys, old, new):
+        """附加一筆日誌紀錄；只編碼這次修改的差異。回到已儲存的狀態時改為清空日誌。"""
+        journal = self.journal
+        if journal is None:
+            return
+        if not self.is_modified():
+            self._journal_call(journal.reset)
+            return
+        npcs = self.npcs
+        ids = [None if idx == GLOBAL else npcs[idx].get("id") for idx in indices]
+        self._journal_call(journal.append, label, indices, ids, keys, old, new)
+
+    def _journal_deltas(self, label, deltas):
+        """以 (索引, 欄位, 新值, 舊值) 序列（復原／重做寫回的順序）附加一筆紀錄。"""
+        if self.journal is None:
+            return
+        indices, keys, new, old = zip(*deltas)
+        self._journal_write(label, indices, keys, old, new)
+
+    def _journal_call(self, method, *args):
+        # 日誌只是保險：寫入失敗（磁碟已滿、權限）時停用日誌，不影響編輯本身
+        try:
+            method(*args)
+        except OSError as exc:
+            print("WARN: 編輯日誌寫入失敗，已停用:", exc)
+            journal, self.journal = self.journal, None
+            try:
+                journal.close()
+            except OSError:
+                pass
+
+    def get_gold(self):
+        return self.data.get(self.gold_key)
+
+    def set_gold(self, value):
+        v = safe_int(value, 0)
+        self._set_global(self.gold_key, max(0, v if v is not None else 0))
+
+    def get_rep(self):
+        return self.data.get(self.reputation_key)
+
+    def set_rep(self, value):
+        v = safe_int(value, 0)
+        self._set_global(self.reputation_key, max(0, v if v is not None else 0))
+
+    def _next_revision(self):
+        self._revision_counter += 1
+        return self._revision_counter
+
+    def _set_global(self, key, value):
+        old = self.data.get(key, ABSENT)
+        if old is not ABSENT and old == value:
+            return
+        self._write_field(GLOBAL, key, value)
+        before, self.revision = self.revision, self._next_revision()
+        self.history.record(GLOBAL, key, old, value, before, self.revision)
+        self._journal_write(key, (GLOBAL,), key, (old,), (value,))
+
+    def set_npc_field(self, idx, key, value):
+        """修改單一 NPC 欄位並同步欄式索引；所有 NPC 編輯都應經由此方法。"""
+        npc = self.npcs[idx]
+        old = npc.get(key, ABSENT)
+        if old is not ABSENT and old == value:
+            return
+        self._write_field(idx, key, value)
+        before, self.revision = self.revision, self._next_revision()
+        self.history.record(idx, key, old, value, before, self.revision)
+        self._journal_write(key, (idx,), key, (old,), (value,))
+
+    def set_npc_column(self, key, indices, values):
+        """批次版 set_npc_field：把 `indices[i]` 的 `key` 設為 `values[i]`，回傳實際改變的 NPC 索引（array）。
+
+        整批只產生一個新的 revision、一筆復原紀錄，欄式索引的排序快取也只失效一次。
+        """
+        npcs = self.npcs
+        changed = array("q")
+        old_values = []
+        new_values = []
+        add_changed, add_old, add_new = changed.append, old_values.append, new_values.append
+        for idx, value in zip(indices, values):
+            npc = npcs[idx]
+            old = npc.get(key, ABSENT)
+            if old is not ABSENT and old == value:
+                continue
+            npc[key] = value
+            add_changed(idx)
+            add_old(old)
+            add_new(value)
+        if not changed:
+            return changed
+        self._dirty_npcs.update(changed)
+        if self.roster is not None:
+            self.roster.update_many(key, changed, new_values)
+        before, self.revision = self.revision, self._next_revision()
+        self.history.record_many(key, changed, old_values, new_values, before, self.revision)
+        self._journal_write(key, changed, key, old_values, new_values)
+        return changed
+
+    def _write_field(self, idx, key, value):
+        """寫入（value 為 ABSENT 時刪除）一個欄位並標記為需重新編碼，不記錄到復原歷程。"""
+        if idx == GLOBAL:
+            target = self.data
+            self._dirty_fields.add(key)
+        else:
+            target = self.npcs[idx]
+            self._dirty_npcs.add(idx)
+        if value is ABSENT:
+            if key in target:
+                del target[key]
+        else:
+            target[key] = value
+        if idx != GLOBAL and self.roster is not None:
+            self.roster.update(idx, key, target)
+
+    def _replay(self, deltas):
+        """依序寫回 (索引, 欄位, 值, 目前值)；連續修改同一欄位的 NPC 整批同步欄式索引。"""
+        run_key, indices, values = None, [], []
+        for idx, key, value, _current in deltas:
+            if idx == GLOBAL or key != run_key:
+                if indices:
+                    self._write_npc_run(run_key, indices, values)
+                    indices, values = [], []
+                run_key = None if idx == GLOBAL else key
+                if idx == GLOBAL:
+                    self._write_field(GLOBAL, key, value)
+                    continue
+            indices.append(idx)
+            values.append(value)
+        if indices:
+            self._write_npc_run(run_key, indices, values)
+
+    def _write_npc_run(self, key, indices, values):
+        npcs = self.npcs
+        for idx, value in zip(indices, values):
+            npc = npcs[idx]
+            if value is ABSENT:
+                if key in npc:
+                    del npc[key]
+            else:
+                npc[key] = value
+        self._dirty_npcs.update(indices)
+        if self.roster is not None:
+            self.roster.update_many(key, indices, [npcs[idx].get(key) for idx in indices])
+
+    def undo(self):
+        """復原最近一個步驟，回傳該步驟（EditStep）；沒有可復原的步驟時回傳 None。
+
+        只把步驟內記錄的欄位寫回舊值，清單紀錄因此只有被改到的列會遞增版本。
+        """
+        step = self.history.pop_undo()
+        if step is None:
+            return None
+        with span("history.undo", deltas=len(step)):
+            self._replay(step.undo_deltas())
+        self.revision = step.revision_before
+        self._journal_deltas("undo", step.undo_deltas())
+        return step
+
+    def redo(self):
+        """重做最近一次復原的步驟，回傳該步驟；沒有可重做的步驟時回傳 None。"""
+        step = self.history.pop_redo()
+        if step is None:
+            return None
+        with span("history.redo", deltas=len(step)):
+            self._replay(step.redo_deltas())
+        self.revision = step.revision_after
+        self._journal_deltas("redo", step.redo_deltas())
+        return step
+
+    def apply_bulk(self, indices, fields, mode="add"):
+        """對 `indices` 內每個 NPC 套用 [(欄位, 數值字串), ...]，回傳處理的 NPC 數。
+
+        mode="add" 時在原值上加減，否則直接設定；結果最低為 0，無法解析的數值略過。
+        整批修改在復原歷程中是同一個步驟。其他運算與範圍限制見 bulk_edit。
+        """
+        ops = []
+        for key, value in fields:
+            value = safe_int(value, None)
+            if value is not None:
+                ops.append(FieldOp(key, "add" if mode == "add" else "set", value))
+        return apply_bulk_edit(self, indices, BulkEdit(tuple(ops))).matched
+
+    def select_where(self, query, include_dead=False):
+        """回傳符合篩選運算式（見 roster_query）的 NPC 索引，依索引遞增；語法錯誤時拋出 QueryError。"""
+        if self.roster is None:
+            return []
+        query_filter = compile_filter(query)
+        indices = self.roster.select(include_dead=include_dead)
+        return query_filter.select(self.roster, indices)
+
+    def query_roster(
+        self,
+        only_team=None,
+        min_level=None,
+        only_underscore=False,
+        search="",
+        sort_keys=None,
+        include_dead=False,
+        query="",
+    ):
+        """篩選並排序角色清單，回傳 NPC 索引列表（即 refresh_table 顯示的順序）。
+
+        預設只列出存活的 NPC；`include_dead=True` 時連同已死亡者一起列出。
+        `query` 為篩選運算式（見 roster_query），與其他條件同時成立；語法錯誤時拋出 QueryError。
+        `sort_keys` 為 [(欄位, 是否遞減), ...]，例如 [("team", False), ("level", True)]。
+        """
+        query_filter = compile_filter(query)
+        if self.roster is None:
+            return []
+        with span("roster.filter"):
+            indices = self.roster.select(
+                only_team=only_team,
+                min_level=min_level,
+                only_underscore=only_underscore,
+                search=search,
+                include_dead=include_dead,
+            )
+            if query_filter:
+                indices = query_filter.select(self.roster, indices)
+        with span("roster.sort"):
+            return self.roster.order(indices, sort_keys)
+
+    def is_alive(self, idx):
+        """以載入時建立的存活旗標判斷，不再逐一檢查 NPC 欄位。"""
+        return self.roster is not None and bool(self.roster.alive[idx])
+
+    def iter_roster(self, only_team=None):
+        if self.roster is None:
+            return
+        alive = self.roster.alive
+        team = self.roster.ints["team"]
+        for idx in compress(range(len(alive)), alive):
+            if only_team is None or team[idx] == only_team:
+                yield idx, self.npcs[idx]
+
+    @staticmethod
+    def npc_summary(npc):
+        return {key: npc.get(key) for key in NPC_SUMMARY_KEYS}
+
+    @staticmethod
+    def is_dead(npc):
+        if not isinstance(npc, Mapping):
+            return False
+        if npc.get("isDead") or npc.get("dead"):
+            return True
+        death_date = npc.get("deathDate")
+        if isinstance(death_date, (int, float)) and death_date > 0:
+            return True
+        state = npc.get("state")
+        if isinstance(state, str) and state.lower() == "dead":
+            return True
+        gladiator_state = npc.get("gladiatorState")
+        if isinstance(gladiator_state, (int, float)) and gladiator_state >= 5:
+            return True
+        for key in ("hp", "HP", "currentHp", "curHp", "currentHP"):
+            hp = npc.get(key)
+            if isinstance(hp, (int, float)) and hp <= 0:
+                return True
+        return False
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存檔的位元組區段索引：`npcs` 陣列的每個元素只記錄原始位元組範圍，需要時才完整解碼。"""
+from __future__ import annotations
+
+import json
+import re
+from array import array
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import json_backend
+
+_scanstring = json.decoder.scanstring
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# 掃描多少個 NPC 後回報一次進度／檢查取消
+PROGRESS_EVERY = 256
+
+# 預先解碼欄位缺少時的佔位值
+_MISSING = object()
+
+
+def _dumps(value, nonfinite: bool = False) -> bytes:
+    return json_backend.dumps_bytes(value, nonfinite)
+
+
+class LazyNpc(MutableMapping):
+    """以原始位元組區段表示的 NPC。
+
+    載入時只保留 `eager_keys` 內的欄位（清單摘要、存活判斷、基礎能力），
+    其餘內容（背包、技能、裝備…）在第一次讀取其他欄位或修改時才解碼。
+    尚未解碼的 NPC 在存檔時會原封不動寫回。
+
+    預先解碼的欄位以 tuple 保存，位置由所有 NPC 共用的 `eager`（欄位名→位置）決定。
+    修改預先解碼的欄位時只更新這個 tuple（`_patched`），等到真正需要完整內容時才解碼並套用。
+    """
+
+    __slots__ = ("_source", "_start", "_end", "_fields", "_full", "_eager", "_patched")
+
+    def __init__(self, source, start: int, end: int, fields: tuple, eager: Dict[str, int]) -> None:
+        self._source = source
+        self._start = start
+        self._end = end
+        self._fields = fields
+        self._full: Optional[Dict[str, object]] = None
+        self._eager = eager
+        self._patched = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._full is not None
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def raw_bytes(self) -> bytes:
+        return bytes(self._source[self._start:self._end])
+
+    def load(self) -> Dict[str, object]:
+        """完整解碼並回傳底層 dict（之後所有讀寫都直接作用在它上面）。"""
+        if self._full is None:
+            full = json_backend.loads(self._source[self._start:self._end])
+            if self._patched:
+                fields = self._fields
+                for key, position in self._eager.items():
+                    if fields[position] is not _MISSING:
+                        full[key] = fields[position]
+            self._full = full
+            self._fields = None
+        return self._full
+
+    def encode(self, nonfinite: bool = False) -> bytes:
+        if self._full is None and not self._patched:
+            return self.raw_bytes()
+        return _dumps(self.load(), nonfinite)
+
+    def __getitem__(self, key):
+        if self._full is None and key in self._eager:
+            value = self._fields[self._eager[key]]
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        return self.load()[key]
+
+    def get(self, key, default=None):
+        if self._full is None and key in self._eager:
+            value = self._fields[self._eager[key]]
+            return default if value is _MISSING else value
+        return self.load().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        if self._full is None and key in self._eager:
+            return self._fields[self._eager[key]] is not _MISSING
+        return key in self.load()
+
+    def __setitem__(self, key, value) -> None:
+        if self._full is None and key in self._eager:
+            fields = list(self._fields)
+            fields[self._eager[key]] = value
+            self._fields = tuple(fields)
+            self._patched = True
+            return
+        self.load()[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self.load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._full is not None else f"bytes {self._start}:{self._end}"
+        return f"<LazyNpc {state}>"
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _byte_len(text: str, start: int, end: int, ascii_only: bool) -> int:
+    if ascii_only:
+        return end - start
+    return len(text[start:end].encode("utf-8"))
+
+
+class DocumentLayout:
+    """載入時記錄的位元組位置，供增量存檔把修改過的區段拼接回原始位元組。
+
+    `fields` 為頂層每個值的 [start, end)；`item_starts`/`item_ends` 為 `array_key`
+    陣列每個元素的範圍；`close` 為頂層結尾 '}' 的位置；
+    `nonfinite` 表示文件含 NaN／Infinity 字面值，重新編碼時需使用標準函式庫（見 json_backend）。
+    """
+
+    __slots__ = ("source", "fields", "array_key", "item_starts", "item_ends", "close", "nonfinite")
+
+    def __init__(self, source, array_key: str) -> None:
+        self.source = source
+        self.fields: Dict[str, Tuple[int, int]] = {}
+        self.array_key = array_key
+        self.item_starts = array("q")
+        self.item_ends = array("q")
+        self.close = 0
+        self.nonfinite = False
+
+    @property
+    def item_count(self) -> int:
+        return len(self.item_starts)
+
+
+class _ByteCursor:
+    """把遞增的字元位置換算成位元組位置（純 ASCII 時兩者相同）。"""
+
+    __slots__ = ("text", "ascii_only", "char_pos", "byte_pos")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.ascii_only = text.isascii()
+        self.char_pos = 0
+        self.byte_pos = 0
+
+    def at(self, char_pos: int) -> int:
+        self.byte_pos += _byte_len(self.text, self.char_pos, char_pos, self.ascii_only)
+        self.char_pos = char_pos
+        return self.byte_pos
+
+
+def scan_document(
+    raw,
+    eager_keys: Iterable[str],
+    lazy_key: str = "npcs",
+    on_progress: Optional[Callable[[int], None]] = None,
+    lazy: bool = True,
+):
+    """解析整份存檔並回傳 (data, layout, nonfinite)。
+
+    lazy=True 時 `lazy_key` 陣列中的物件轉為 LazyNpc，否則保留一般 dict；
+    兩種模式都會記錄位元組位置（layout）。
+    `raw` 為 UTF-8 位元組（bytes/bytearray），LazyNpc 與 layout 直接引用它，不另外複製。
+    `on_progress(byte_offset)` 於掃描 NPC 期間定期呼叫，可在其中拋出例外以中止。
+    文件頂層不是物件或格式不符預期時，退回一般的完整解析（json_backend.loads_document），此時 layout 為 None。
+    `nonfinite` 表示文件含 NaN／Infinity 字面值（由掃描器的 parse_constant 判斷，字串內容不算），
+    這份文件之後的編碼都應傳入這個值，避免加速編碼器把它們寫成 null。
+    """
+    text = str(raw, "utf-8")
+    constants: List[str] = []
+    scan_once = json.JSONDecoder(parse_constant=json_backend.record_constants(constants)).scan_once
+    eager = {key: position for position, key in enumerate(dict.fromkeys(eager_keys))}
+    layout = DocumentLayout(raw, lazy_key)
+    try:
+        with json_backend.gc_paused():
+            data = _scan_object(text, layout, scan_once, eager if lazy else None, on_progress)
+    except (StopIteration, ValueError, IndexError):
+        data, nonfinite = json_backend.loads_document(text)
+        return data, None, nonfinite
+    layout.nonfinite = bool(constants)
+    return data, layout, layout.nonfinite
+
+
+def _scan_object(text: str, layout: DocumentLayout, scan_once, eager: Optional[Dict[str, int]], on_progress):
+    cursor = _ByteCursor(text)
+    pos = _skip_ws(text, 0)
+    if text[pos] != "{":
+        raise ValueError("top level is not an object")
+    pos = _skip_ws(text, pos + 1)
+    data: Dict[str, object] = {}
+    if text[pos] != "}":
+        while True:
+            if text[pos] != '"':
+                raise ValueError("expected key")
+            key, pos = _scanstring(text, pos + 1)
+            pos = _skip_ws(text, pos)
+            if text[pos] != ":":
+                raise ValueError("expected ':'")
+            pos = _skip_ws(text, pos + 1)
+            start = cursor.at(pos)
+            if key == layout.array_key and text[pos] == "[":
+                value, pos, end = _scan_array(text, layout, scan_once, pos, start, cursor.ascii_only, eager, on_progress)
+                cursor.char_pos, cursor.byte_pos = pos, end
+            else:
+                value, pos = scan_once(text, pos)
+                end = cursor.at(pos)
+            data[key] = value
+            layout.fields[key] = (start, end)
+            pos = _skip_ws(text, pos)
+            if text[pos] == ",":
+                pos = _skip_ws(text, pos + 1)
+                continue
+            if text[pos] == "}":
+                break
+            raise ValueError("expected ',' or '}'")
+    layout.close = cursor.at(pos)
+    if _skip_ws(text, pos + 1) != len(text):
+        raise ValueError("extra data")
+    return data
+
+
+def _scan_array(text, layout, scan_once, pos, byte_pos, ascii_only, eager, on_progress) -> Tuple[List[object], int, int]:
+    # pos 指向 '['，byte_pos 為其位元組位置；元素之間只會有空白與逗號（皆為 ASCII）
+    raw = layout.source
+    starts = layout.item_starts
+    ends = layout.item_ends
+    items: List[object] = []
+    pos += 1
+    byte_pos += 1
+    start = _skip_ws(text, pos)
+    byte_pos += start - pos
+    pos = start
+    if text[pos] == "]":
+        return items, pos + 1, byte_pos + 1
+    while True:
+        value, end = scan_once(text, pos)
+        length = _byte_len(text, pos, end, ascii_only)
+        if eager is not None and isinstance(value, dict):
+            fields = tuple([value.get(key, _MISSING) for key in eager])
+            items.append(LazyNpc(raw, byte_pos, byte_pos + length, fields, eager))
+        else:
+            items.append(value)
+        starts.append(byte_pos)
+        byte_pos += length
+        ends.append(byte_pos)
+        if on_progress is not None and len(items) % PROGRESS_EVERY == 0:
+            on_progress(byte_pos)
+        nxt = _skip_ws(text, end)
+        byte_pos += nxt - end
+        if text[nxt] == ",":
+            pos = _skip_ws(text, nxt + 1)
+            byte_pos += pos - nxt
+            continue
+        if text[nxt] == "]":
+            return items, nxt + 1, byte_pos + 1
+        raise ValueError("expected ',' or ']'")
+
+
+def rebind_source(items: Iterable[object], old, new) -> None:
+    """把引用 `old` 的 LazyNpc 改為引用內容相同的 `new`（例如關閉記憶體映射前）。"""
+    for item in items:
+        if isinstance(item, LazyNpc) and item._source is old:
+            item._source = new
+
+
+def encode_value(value, nonfinite: bool = False) -> bytes:
+    if isinstance(value, LazyNpc):
+        return value.encode(nonfinite)
+    return _dumps(value, nonfinite)
+
+
+def build_splice_plan(
+    layout: DocumentLayout,
+    data: Dict[str, object],
+    dirty_fields: Iterable[str],
+    dirty_items: Iterable[int],
+    origin: Sequence[int],
+) -> Optional[List[Tuple[int, int, List[bytes]]]]:
+    """計算增量存檔需要替換的區段 [(start, end, chunks), ...]（依位置排序）。
+
+    `origin[i]` 為 data[array_key][i] 在原始陣列中的位置（-1 表示新加入）。
+    頂層欄位被刪除時回傳 None，交由完整序列化處理。
+    """
+    if not isinstance(data, dict) or any(key not in data for key in layout.fields):
+        return None
+    edits: List[Tuple[int, int, List[bytes]]] = []
+    nonfinite = layout.nonfinite
+    array_key = layout.array_key
+    for key in dirty_fields:
+        if key == array_key or key not in layout.fields:
+            continue
+        start, end = layout.fields[key]
+        edits.append((start, end, [encode_value(data[key], nonfinite)]))
+
+    items = data.get(array_key)
+    if array_key in layout.fields and isinstance(items, list):
+        dirty = set(dirty_items)
+        count = layout.item_count
+        aligned = len(items) == count and len(origin) == count and all(o == i for i, o in enumerate(origin))
+        if aligned:
+            # 陣列結構未變：只替換被修改的元素
+            starts, ends = layout.item_starts, layout.item_ends
+            for idx in sorted(dirty):
+                edits.append((starts[idx], ends[idx], [encode_value(items[idx], nonfinite)]))
+        else:
+            start, end = layout.fields[array_key]
+            edits.append((start, end, list(_iter_array_runs(layout, items, origin, dirty))))
+
+    # 載入後新增的頂層欄位接在結尾 '}' 之前
+    added = [key for key in data if key not in layout.fields]
+    if added:
+        chunks = []
+        for position, key in enumerate(added):
+            separator = b"," if (layout.fields or position) else b""
+            chunks.append(separator + _dumps(key) + b":" + encode_value(data[key], nonfinite))
+        edits.append((layout.close, layout.close, chunks))
+    edits.sort(key=lambda edit: edit[0])
+    return edits
+
+
+def _iter_array_runs(layout: DocumentLayout, items, origin, dirty) -> Iterator[bytes]:
+    # 連續且未修改的原始元素合併成一段原始位元組輸出（含其間原有的逗號與空白）
+    source = memoryview(layout.source)
+    starts, ends = layout.item_starts, layout.item_ends
+    pieces: List[object] = []
+    run_first = run_last = -1
+    for position, item in enumerate(items):
+        o = origin[position] if position < len(origin) else -1
+        if o >= 0 and position not in dirty:
+            if run_first >= 0 and o == run_last + 1:
+                run_last = o
+                continue
+            if run_first >= 0:
+                pieces.append(source[starts[run_first]:ends[run_last]])
+            run_first = run_last = o
+            continue
+        if run_first >= 0:
+            pieces.append(source[starts[run_first]:ends[run_last]])
+            run_first = -1
+        pieces.append(encode_value(item, layout.nonfinite))
+    if run_first >= 0:
+        pieces.append(source[starts[run_first]:ends[run_last]])
+    yield b"["
+    for position, piece in enumerate(pieces):
+        if position:
+            yield b","
+        yield piece
+    yield b"]"
+
+
+def iter_spliced_chunks(source, edits: List[Tuple[int, int, List[bytes]]]) -> Iterator[bytes]:
+    """依 `edits` 輸出拼接後的文件：未修改的區段直接切自原始位元組。"""
+    view = memoryview(source)
+    position = 0
+    for start, end, chunks in edits:
+        if start > position:
+            yield view[position:start]
+        yield from chunks
+        position = end
+    if position < len(view):
+        yield view[position:]
+
+
+def iter_document_chunks(data, nonfinite: bool = False) -> Iterator[bytes]:
+    """以 UTF-8 位元組片段輸出整份文件（緊湊格式、ensure_ascii=False）。
+
+    每個值都交給 json_backend 一次編碼（C 編碼器），頂層陣列則逐個元素輸出，
+    避免一次產生整份字串；陣列裡未被解碼的 LazyNpc 直接輸出原始位元組。
+    `nonfinite` 見 scan_document。
+    """
+    if not isinstance(data, dict):
+        yield _dumps(data, nonfinite)
+        return
+    yield b"{"
+    first = True
+    for key, value in data.items():
+        prefix = b"" if first else b","
+        first = False
+        yield prefix + _dumps(key) + b":"
+        if isinstance(value, list):
+            yield from _iter_array_chunks(value, nonfinite)
+        else:
+            yield _dumps(value, nonfinite)
+    yield b"}"
+
+
+def _iter_array_chunks(items: List[object], nonfinite: bool) -> Iterator[bytes]:
+    yield b"["
+    for position, item in enumerate(items):
+        if position:
+            yield b","
+        yield encode_value(item, nonfinite)
+    yield b"]"
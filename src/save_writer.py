@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""原子化寫檔：先串流寫入同目錄的暫存檔並 fsync，再以 os.replace 取代目標檔。"""
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# 累積到這個大小才真正呼叫一次 write
+WRITE_CHUNK_SIZE = 4 << 20
+
+
+@dataclass
+class WriteStats:
+    path: str
+    bytes_written: int = 0
+    seconds: float = 0.0
+    skipped: bool = False
+
+    @property
+    def megabytes(self) -> float:
+        return self.bytes_written / (1 << 20)
+
+    @property
+    def throughput(self) -> float:
+        """寫入速度（MB/s）。"""
+        if self.seconds <= 0:
+            return 0.0
+        return self.megabytes / self.seconds
+
+
+def _fsync_directory(directory: str) -> None:
+    # Windows 無法開啟目錄做 fsync，略過即可
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _new_file_mode(probe: str) -> Optional[int]:
+    """與 open(path, "w") 新建檔案相同的權限：0666 扣除 umask；無法判斷時回傳 None。
+
+    umask 由整個行程共用，不能以 os.umask() 暫時改動來讀取（背景執行緒此時建立的檔案會變成 0666）：
+    Linux 從 /proc/self/status 讀取，其他系統在 `probe` 建立一個探測檔，由系統套用 umask。
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        fd = os.open(probe, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except OSError:
+        return None
+    try:
+        return stat.S_IMODE(os.fstat(fd).st_mode)
+    finally:
+        os.close(fd)
+        try:
+            os.unlink(probe)
+        except OSError:
+            pass
+
+
+def write_atomic(path: str, chunks: Iterable[bytes], chunk_size: int = WRITE_CHUNK_SIZE) -> WriteStats:
+    """把 `chunks` 寫入 `path`；途中失敗（例如磁碟已滿）時原檔保持不變。"""
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    started = time.perf_counter()
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            buffer = bytearray()
+            for chunk in chunks:
+                if len(chunk) >= chunk_size:
+                    # 大片段（例如增量存檔中未修改的原始區段）直接寫入，不再複製進緩衝
+                    if buffer:
+                        fh.write(buffer)
+                        written += len(buffer)
+                        buffer.clear()
+                    fh.write(chunk)
+                    written += len(chunk)
+                    continue
+                buffer += chunk
+                if len(buffer) >= chunk_size:
+                    fh.write(buffer)
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                fh.write(buffer)
+                written += len(buffer)
+            fh.flush()
+            os.fsync(fh.fileno())
+        # mkstemp 建立的檔案權限為 0600：沿用原檔權限，目標不存在時使用新檔的預設權限
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _new_file_mode(tmp_path + ".mode")
+        except OSError:
+            mode = None
+        if mode is not None:
+            try:
+                os.chmod(tmp_path, mode)
+            except OSError:
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+    return WriteStats(path, written, time.perf_counter() - started)
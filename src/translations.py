@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""介面翻譯：每個語言一個 locales/<語言>.json 目錄檔，選用該語言時才載入。
+
+locales/languages.json 只列出語言代碼與顯示名稱，啟動時不會讀取其他語言的目錄檔，
+因此增加語言不會拖慢啟動。目錄檔載入時預先編譯：沒有 {欄位} 的字串直接保存結果，
+有欄位的保存為 (模板,)，翻譯時才以 format_map 代入；編譯結果以 marshal 快取在 locales/__pycache__/<語言>.cache，
+以來源檔的大小與修改時間判斷是否過期。無法寫入快取時（例如唯讀安裝）只在記憶體中使用。
+"""
+from __future__ import annotations
+
+import json
+import marshal
+import os
+import string
+from typing import Dict, Optional, Tuple, Union
+
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+INDEX_FILE = "languages.json"
+CACHE_DIR = "__pycache__"
+# 快取格式變更時遞增
+CACHE_VERSION = 2
+
+# 編譯後的字串：不需格式化的結果，或 (模板,)
+# 模板不另外拆成片段：以 Python 逐段代入比 C 實作的 format_map 慢
+Compiled = Union[str, Tuple[str]]
+
+_FORMATTER = string.Formatter()
+
+
+def compile_template(text: str) -> Compiled:
+    """預先解析 str.format 模板；格式錯誤的模板原樣保存（與 format 失敗時回傳原字串相同）。"""
+    try:
+        has_fields = any(name is not None for _, name, _, _ in _FORMATTER.parse(text))
+    except ValueError:
+        return text
+    if not has_fields:
+        # 仍需 format 一次，把 {{ }} 還原為大括號
+        return text.format()
+    return (text,)
+
+
+def compile_catalog(entries: Dict[str, str]) -> Dict[str, Compiled]:
+    return {key: compile_template(text) for key, text in entries.items() if isinstance(text, str)}
+
+
+def _cache_path(locale_dir: str, language: str) -> str:
+    return os.path.join(locale_dir, CACHE_DIR, f"{language}.cache")
+
+
+def _read_cache(path: str, stat: os.stat_result) -> Optional[Dict[str, Compiled]]:
+    try:
+        with open(path, "rb") as fh:
+            version, size, mtime_ns, entries = marshal.load(fh)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+        return None
+    return entries
+
+
+def _write_cache(path: str, stat: os.stat_result, entries: Dict[str, Compiled]) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as fh:
+            marshal.dump((CACHE_VERSION, stat.st_size, stat.st_mtime_ns, entries), fh)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_catalog(language: str, locale_dir: str = LOCALE_DIR) -> Dict[str, Compiled]:
+    """載入並編譯一個語言的目錄檔（優先使用快取）；檔案不存在時拋出 OSError。"""
+    source = os.path.join(locale_dir, f"{language}.json")
+    stat = os.stat(source)
+    cache = _cache_path(locale_dir, language)
+    entries = _read_cache(cache, stat)
+    if entries is None:
+        with open(source, "r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+        entries = compile_catalog(raw if isinstance(raw, dict) else {})
+        _write_cache(cache, stat, entries)
+    return entries
+
+
+def available_languages(locale_dir: str = LOCALE_DIR) -> Dict[str, str]:
+    """語言代碼 → 顯示名稱；依 languages.json 的順序，其後是未列在索引中的目錄檔（以代碼顯示）。"""
+    try:
+        with open(os.path.join(locale_dir, INDEX_FILE), "r", encoding="utf-8") as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        index = {}
+    try:
+        files = sorted(os.listdir(locale_dir))
+    except OSError:
+        files = []
+    present = {name[:-5] for name in files if name.endswith(".json") and name != INDEX_FILE}
+    languages = {code: str(name) for code, name in index.items() if code in present}
+    for code in sorted(present - languages.keys()):
+        languages[code] = code
+    return languages
+
+
+class Translator:
+    """目前語言找不到的鍵改用預設語言，兩者都沒有時回傳鍵本身；目錄檔在第一次使用時才載入。"""
+
+    def __init__(self, default: str = "zh", locale_dir: str = LOCALE_DIR, languages: Optional[Dict[str, str]] = None) -> None:
+        self.locale_dir = locale_dir
+        self.languages = available_languages(locale_dir) if languages is None else languages
+        self.default = default if default in self.languages or not self.languages else next(iter(self.languages))
+        self.current = self.default
+        self._catalogs: Dict[str, Dict[str, Compiled]] = {}
+        # 目前語言的目錄檔（第一次翻譯時載入）
+        self._active: Optional[Dict[str, Compiled]] = None
+
+    def catalog(self, language: str) -> Dict[str, Compiled]:
+        entries = self._catalogs.get(language)
+        if entries is None:
+            try:
+                entries = load_catalog(language, self.locale_dir)
+            except (OSError, ValueError) as exc:
+                print(f"無法載入翻譯 {language}: {exc}")
+                entries = {}
+            self._catalogs[language] = entries
+        return entries
+
+    def set_language(self, language: str) -> None:
+        if language in self.languages:
+            self.current = language
+            self._active = self.catalog(language)
+
+    def translate(self, key: str, **kwargs) -> str:
+        active = self._active
+        if active is None:
+            active = self._active = self.catalog(self.current)
+        compiled = active.get(key)
+        if compiled is None:
+            compiled = self.catalog(self.default).get(key, key)
+        if compiled.__class__ is str:
+            return compiled
+        template = compiled[0]
+        try:
+            return template.format_map(kwargs)
+        except Exception:
+            return template